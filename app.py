@@ -1,14 +1,25 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 import requests
+from requests.adapters import HTTPAdapter
 import os
 from dotenv import load_dotenv
 import json
 from datetime import datetime
-import pandas as pd
-import io
+import tempfile
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
 import re
+import time
+import threading
+import atexit
+import sqlite3
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 
 import base64
 
@@ -29,37 +40,341 @@ JIRA_BASE_URL = os.getenv("JIRA_URL") or os.getenv("JIRA_BASE_URL")
 JIRA_EMAIL = os.getenv("JIRA_EMAIL")
 JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
 
-HEADERS = {
-    "Authorization": f"Basic {os.getenv('JIRA_AUTH')}",
-    "Content-Type": "application/json"
-}
+JIRA_AUTH = os.getenv("JIRA_AUTH")
+JIRA_TIMEOUT = float(os.getenv("TIMEOUT", "30"))
+JIRA_POOL_SIZE = int(os.getenv("JIRA_POOL_SIZE", "10"))
+JIRA_MAX_RETRIES = int(os.getenv("JIRA_MAX_RETRIES", "3"))
+JIRA_BATCH_CONCURRENCY = int(os.getenv("JIRA_BATCH_CONCURRENCY", "5"))
+JIRA_SEARCH_PAGE_SIZE = int(os.getenv("JIRA_SEARCH_PAGE_SIZE", "100"))
+JIRA_SEARCH_CONCURRENCY = int(os.getenv("JIRA_SEARCH_CONCURRENCY", "4"))
+# Consultas com muitas chaves são divididas em lotes (chaves e caracteres por JQL)
+JIRA_JQL_LOTE_CHAVES = int(os.getenv("JIRA_JQL_LOTE_CHAVES", "20"))
+JIRA_JQL_LOTE_CARACTERES = int(os.getenv("JIRA_JQL_LOTE_CARACTERES", "6000"))
+# Busca de casos de teste na hierarquia de uma issue: níveis descidos e issues exploradas no máximo
+CASOS_TESTE_MAX_PROFUNDIDADE = int(os.getenv("CASOS_TESTE_MAX_PROFUNDIDADE", "10"))
+CASOS_TESTE_MAX_NOS = int(os.getenv("CASOS_TESTE_MAX_NOS", "500"))
+CACHE_TTL_METADADOS = float(os.getenv("CACHE_TTL_METADADOS", "3600"))
+CACHE_TTL_ISSUES = float(os.getenv("CACHE_TTL_ISSUES", "300"))
+CACHE_MAX_ITENS = int(os.getenv("CACHE_MAX_ITENS", "512"))
+# Cada job processa no próprio workspace, então vários uploads podem rodar ao mesmo tempo
+EVIDENCIAS_WORKERS = int(os.getenv("EVIDENCIAS_WORKERS", "2"))
+EVIDENCIAS_JOBS_RETENCAO = float(os.getenv("EVIDENCIAS_JOBS_RETENCAO", "3600"))
+EVIDENCIAS_WORKSPACES_DIR = os.getenv("EVIDENCIAS_WORKSPACES_DIR", os.path.join("prints_tests", "workspaces"))
+EVIDENCIAS_WORKSPACE_TTL = float(os.getenv("EVIDENCIAS_WORKSPACE_TTL", "86400"))
+EVIDENCIAS_WORKSPACE_GC_INTERVALO = float(os.getenv("EVIDENCIAS_WORKSPACE_GC_INTERVALO", "600"))
+EVIDENCIAS_ENVIO_CONCORRENCIA = int(os.getenv("EVIDENCIAS_ENVIO_CONCORRENCIA", "4"))
+EVIDENCIAS_ENVIO_CONSOLIDADO = os.getenv("EVIDENCIAS_ENVIO_CONSOLIDADO", "false").lower() == "true"
+EVIDENCIAS_UPLOAD_LOTE_MB = float(os.getenv("EVIDENCIAS_UPLOAD_LOTE_MB", "50"))
+LOG_TEXTO_MAX_ELEMENTO = int(os.getenv("LOG_TEXTO_MAX_ELEMENTO", "65536"))
+LOG_CHUNK_LEITURA = int(os.getenv("LOG_CHUNK_LEITURA", str(1024 * 1024)))
+EVIDENCIAS_RENDER_PROCESSOS = int(os.getenv("EVIDENCIAS_RENDER_PROCESSOS", "0")) or (os.cpu_count() or 1)
+EVIDENCIAS_RENDER_MIN_PARALELO = int(os.getenv("EVIDENCIAS_RENDER_MIN_PARALELO", "16"))
+EVIDENCIAS_CACHE_IMAGENS_DIR = os.getenv("EVIDENCIAS_CACHE_IMAGENS_DIR", os.path.join("prints_tests", ".cache_simulados"))
+EVIDENCIAS_CACHE_IMAGENS_MAX = int(os.getenv("EVIDENCIAS_CACHE_IMAGENS_MAX", "5000"))
+EVIDENCIAS_MINIATURAS_DIR = os.getenv("EVIDENCIAS_MINIATURAS_DIR", os.path.join("prints_tests", ".cache_miniaturas"))
+EVIDENCIAS_MINIATURAS_MAX = int(os.getenv("EVIDENCIAS_MINIATURAS_MAX", "5000"))
+EVIDENCIAS_MINIATURA_QUALIDADE = int(os.getenv("EVIDENCIAS_MINIATURA_QUALIDADE", "75"))
+EVIDENCIAS_IMAGEM_MAX_AGE = int(os.getenv("EVIDENCIAS_IMAGEM_MAX_AGE", str(365 * 24 * 3600)))
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_POOL_MAX_USOS = int(os.getenv("BROWSER_POOL_MAX_USOS", "50"))
+BROWSER_POOL_TIMEOUT = float(os.getenv("BROWSER_POOL_TIMEOUT", "120"))
+SELENIUM_SHARDS = int(os.getenv("SELENIUM_SHARDS", str(BROWSER_POOL_SIZE)))
+SELENIUM_ESPERA_TIMEOUT = float(os.getenv("SELENIUM_ESPERA_TIMEOUT", "5"))
+ESPELHO_ATIVO = os.getenv("ESPELHO_ATIVO", "false").lower() == "true"
+ESPELHO_DB = os.getenv("ESPELHO_DB", "espelho_casos_teste.db")
+ESPELHO_PROJETOS = os.getenv("ESPELHO_PROJETOS", "")
+ESPELHO_SYNC_INTERVALO = float(os.getenv("ESPELHO_SYNC_INTERVALO", "300"))
+ESPELHO_RECONCILIAR_INTERVALO = float(os.getenv("ESPELHO_RECONCILIAR_INTERVALO", "86400"))
+ESPELHO_MARGEM_MINUTOS = int(os.getenv("ESPELHO_MARGEM_MINUTOS", "2"))
+# Fonte padrão das leituras de casos de teste: "jira" (ao vivo) ou "espelho" (SQLite local)
+ESPELHO_LEITURA_PADRAO = os.getenv("ESPELHO_LEITURA_PADRAO", "jira").lower()
+# Fatos do changelog das issues de épicos (cycle time, entrada no escopo, sprint de resolução)
+METRICAS_EPICO_DB = os.getenv("METRICAS_EPICO_DB", "metricas_epico.db")
+# Snapshots da análise de épicos: servidos na hora; mais velhos que o TTL são recalculados em segundo plano
+EPICO_SNAPSHOT_TTL = float(os.getenv("EPICO_SNAPSHOT_TTL", "300"))
+EPICO_SNAPSHOT_WORKERS = int(os.getenv("EPICO_SNAPSHOT_WORKERS", "2"))
+# Campo de sprint do Jira Software (lista de sprints da issue)
+JIRA_CAMPO_SPRINT = os.getenv("JIRA_CAMPO_SPRINT", "customfield_10020")
+# Segredo compartilhado com o webhook do Jira; vazio desativa /webhooks/jira
+JIRA_WEBHOOK_SECRET = os.getenv("JIRA_WEBHOOK_SECRET", "")
+
+
+class JiraError(Exception):
+    """Erro retornado pela API do Jira (status HTTP diferente do esperado)"""
+
+    def __init__(self, status_code, texto):
+        super().__init__(f"Erro {status_code} na API do Jira")
+        self.status_code = status_code
+        self.texto = texto
+
+
+class JiraClient:
+    """Cliente HTTP único para a API do Jira.
+
+    Mantém uma sessão com pool de conexões keep-alive (evita um novo handshake
+    TCP+TLS a cada chamada), aplica timeout em todas as requisições e concentra
+    a autenticação em um só lugar.
+    """
+
+    def __init__(self, base_url, email=None, api_token=None, auth_header=None,
+                 pool_size=JIRA_POOL_SIZE, timeout=JIRA_TIMEOUT, max_retries=JIRA_MAX_RETRIES):
+        self.base_url = (base_url or "").rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+        # Autenticação: email + token (preferencial) ou header Basic pré-calculado (JIRA_AUTH)
+        if email and api_token:
+            self.session.auth = (email, api_token)
+        elif auth_header:
+            self.session.headers["Authorization"] = f"Basic {auth_header}"
+
+    def url(self, path):
+        """Monta a URL completa a partir de um caminho da API"""
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        # Uploads multipart não podem ser reenviados (o arquivo já foi consumido)
+        tentativas = 0 if "files" in kwargs else self.max_retries
+
+        for tentativa in range(tentativas + 1):
+            response = self.session.request(method, self.url(path), **kwargs)
+            if response.status_code not in (429, 503) or tentativa == tentativas:
+                return response
+
+            # Rate limit do Jira: respeitar Retry-After ou aplicar backoff exponencial
+            try:
+                espera = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                espera = 2 ** tentativa
+            print(f"⏳ Jira respondeu {response.status_code}, aguardando {espera}s (tentativa {tentativa + 1}/{tentativas})")
+            time.sleep(min(espera, 30))
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def get_json_cached(self, cache, path, params=None):
+        """GET com cache: serve do cache enquanto fresco e revalida com If-None-Match ao expirar"""
+        chave = (path, tuple(sorted((params or {}).items())))
+        entrada = cache.obter(chave)
+        if entrada and entrada.fresca():
+            return entrada.valor
+
+        headers = {}
+        if entrada and entrada.etag:
+            headers["If-None-Match"] = entrada.etag
+        response = self.get(path, params=params, headers=headers)
+
+        if response.status_code == 304 and entrada:
+            cache.renovar(chave)
+            return entrada.valor
+        if response.status_code != 200:
+            raise JiraError(response.status_code, response.text)
+
+        valor = response.json()
+        cache.definir(chave, valor, etag=response.headers.get("ETag"))
+        return valor
+
+    def search(self, jql, fields=None, max_results=100, **extra):
+        """Executa uma busca JQL (POST /rest/api/3/search)"""
+        payload = {"jql": jql, "maxResults": max_results}
+        if fields is not None:
+            payload["fields"] = fields
+        payload.update(extra)
+        return self.post("/rest/api/3/search", json=payload)
+
+    def _search_page(self, jql, fields, page_size, **cursor):
+        response = self.search(jql, fields=fields, max_results=page_size, **cursor)
+        if response.status_code != 200:
+            raise JiraError(response.status_code, response.text)
+        return response.json()
+
+    def iter_search_pages(self, jql, fields=None, page_size=JIRA_SEARCH_PAGE_SIZE,
+                          concurrency=JIRA_SEARCH_CONCURRENCY, **extra):
+        """Percorre todas as páginas de uma busca JQL, gerando as issues de cada página em ordem.
+
+        Segue o nextPageToken quando a API o devolve; caso contrário, assim que o
+        total é conhecido as páginas restantes (startAt) são buscadas em paralelo, no máximo
+        `concurrency` à frente da página entregue (a memória não cresce com o tamanho da busca).
+        Parâmetros extras (ex.: expand) vão em todas as páginas.
+        """
+        primeira = self._search_page(jql, fields, page_size, startAt=0, **extra)
+        issues = primeira.get("issues", [])
+        yield issues
+
+        token = primeira.get("nextPageToken")
+        while token:
+            pagina = self._search_page(jql, fields, page_size, nextPageToken=token, **extra)
+            yield pagina.get("issues", [])
+            token = pagina.get("nextPageToken")
+        if "nextPageToken" in primeira:
+            return
+
+        # O Jira pode limitar o tamanho da página abaixo do solicitado
+        tamanho = primeira.get("maxResults") or len(issues)
+        total = primeira.get("total", 0)
+        if not issues or total <= len(issues):
+            return
+
+        offsets = iter(range(tamanho, total, tamanho))
+        janela = max(1, concurrency)
+        with ThreadPoolExecutor(max_workers=janela) as executor:
+            futuros = deque()
+            for offset in offsets:
+                futuros.append(executor.submit(self._search_page, jql, fields, tamanho, startAt=offset, **extra))
+                if len(futuros) >= janela:
+                    break
+            while futuros:
+                pagina = futuros.popleft().result().get("issues", [])
+                offset = next(offsets, None)
+                if offset is not None:
+                    futuros.append(executor.submit(self._search_page, jql, fields, tamanho, startAt=offset, **extra))
+                yield pagina
+
+    def search_all(self, jql, fields=None, **kwargs):
+        """Retorna todas as issues de uma busca JQL, com paginação completa"""
+        issues = []
+        for pagina in self.iter_search_pages(jql, fields=fields, **kwargs):
+            issues.extend(pagina)
+        return issues
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EntradaCache:
+    __slots__ = ("valor", "etag", "expira_em")
+
+    def __init__(self, valor, etag, expira_em):
+        self.valor = valor
+        self.etag = etag
+        self.expira_em = expira_em
+
+    def fresca(self):
+        return time.monotonic() < self.expira_em
+
+
+class CacheTTL:
+    """Cache em memória com expiração (TTL), despejo LRU e contadores de acerto/falha.
+
+    Entradas expiradas são mantidas (até serem despejadas) para permitir a
+    revalidação condicional via ETag.
+    """
+
+    def __init__(self, nome, ttl, max_itens=CACHE_MAX_ITENS):
+        self.nome = nome
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.revalidacoes = 0
+
+    def obter(self, chave):
+        """Retorna a entrada (fresca ou expirada) e contabiliza acerto/falha"""
+        with self._lock:
+            entrada = self._itens.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            if entrada.fresca():
+                self.acertos += 1
+            else:
+                self.falhas += 1
+            return entrada
+
+    def definir(self, chave, valor, etag=None):
+        with self._lock:
+            self._itens[chave] = EntradaCache(valor, etag, time.monotonic() + self.ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def renovar(self, chave):
+        """Estende o TTL de uma entrada revalidada (HTTP 304)"""
+        with self._lock:
+            entrada = self._itens.get(chave)
+            if entrada:
+                entrada.expira_em = time.monotonic() + self.ttl
+                self.revalidacoes += 1
+
+    def invalidar(self, filtro=None):
+        """Remove todas as entradas, ou apenas as cujas chaves satisfazem o filtro"""
+        with self._lock:
+            if filtro is None:
+                self._itens.clear()
+                return
+            for chave in [c for c in self._itens if filtro(c)]:
+                del self._itens[chave]
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "itens": len(self._itens),
+                "ttl_segundos": self.ttl,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "revalidacoes": self.revalidacoes,
+                "taxa_acerto": round(self.acertos / consultas, 3) if consultas else 0
+            }
+
+
+jira_client = JiraClient(JIRA_BASE_URL, JIRA_EMAIL, JIRA_API_TOKEN, auth_header=JIRA_AUTH)
+
+# Metadados que quase nunca mudam (tipos de issue do projeto, usuário autenticado)
+# e resumos de issues pai consultados a cada criação de caso de teste
+cache_projetos = CacheTTL("projetos", CACHE_TTL_METADADOS)
+cache_usuario = CacheTTL("usuario", CACHE_TTL_METADADOS, max_itens=1)
+cache_issues = CacheTTL("issues", CACHE_TTL_ISSUES)
 
 def obter_account_id():
     """Obtém o account ID do usuário autenticado"""
-    response = requests.get(
-        f"{JIRA_BASE_URL}/rest/api/3/myself",
-        headers=HEADERS,
-        auth=(JIRA_EMAIL, JIRA_API_TOKEN)
-    )
-    if response.status_code == 200:
-        return response.json()["accountId"]
-    return None
+    try:
+        return jira_client.get_json_cached(cache_usuario, "/rest/api/3/myself")["accountId"]
+    except JiraError:
+        return None
 
 def obter_informacoes_issue(issue_key):
     """Obtém informações da issue pai"""
     try:
-        url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}"
-        response = requests.get(url, headers=HEADERS, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
-        
-        if response.status_code == 200:
-            issue_data = response.json()
-            project_key = issue_data['fields']['project']['key']
-            issue_type = issue_data['fields']['issuetype']['name']
-            print(f"Issue {issue_key}: Projeto={project_key}, Tipo={issue_type}")
-            return project_key, issue_type
-        else:
-            print(f"Erro ao obter issue {issue_key}: {response.status_code}")
-            return None, None
+        issue_data = jira_client.get_json_cached(
+            cache_issues,
+            f"/rest/api/3/issue/{issue_key}",
+            params={"fields": "summary,project,issuetype"}
+        )
+        project_key = issue_data['fields']['project']['key']
+        issue_type = issue_data['fields']['issuetype']['name']
+        print(f"Issue {issue_key}: Projeto={project_key}, Tipo={issue_type}")
+        return project_key, issue_type
+    except JiraError as e:
+        print(f"Erro ao obter issue {issue_key}: {e.status_code}")
+        return None, None
     except Exception as e:
         print(f"Erro ao obter informações da issue {issue_key}: {e}")
         return None, None
@@ -75,14 +390,7 @@ def buscar_issues_similares(issue_key):
         
         # Buscar issues recentes com o mesmo prefixo
         jql = f'project = {prefixo} ORDER BY created DESC'
-        url = f"{JIRA_BASE_URL}/rest/api/3/search"
-        payload = {
-            "jql": jql,
-            "maxResults": 5,
-            "fields": ["summary"]
-        }
-        
-        response = requests.post(url, headers=HEADERS, json=payload, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        response = jira_client.search(jql, fields=["summary"], max_results=5)
         
         if response.status_code == 200:
             issues = response.json().get('issues', [])
@@ -97,22 +405,18 @@ def buscar_issues_similares(issue_key):
 def obter_tipos_issue_disponiveis(project_key):
     """Obtém os tipos de issue disponíveis para um projeto"""
     try:
-        url = f"{JIRA_BASE_URL}/rest/api/3/project/{project_key}"
-        response = requests.get(url, headers=HEADERS, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        project_data = jira_client.get_json_cached(cache_projetos, f"/rest/api/3/project/{project_key}")
+        issue_types = project_data.get('issueTypes', [])
         
-        if response.status_code == 200:
-            project_data = response.json()
-            issue_types = project_data.get('issueTypes', [])
-            
-            todos_tipos = [issue_type['name'] for issue_type in issue_types]
-            subtarefas = [issue_type['name'] for issue_type in issue_types if issue_type.get('subtask', False)]
-            issues_normais = [issue_type['name'] for issue_type in issue_types if not issue_type.get('subtask', False)]
-            
-            print(f"Tipos disponíveis no projeto {project_key}: {todos_tipos}")
-            return todos_tipos, subtarefas, issues_normais
-        else:
-            print(f"Erro ao obter tipos de issue: {response.status_code}")
-            return [], [], []
+        todos_tipos = [issue_type['name'] for issue_type in issue_types]
+        subtarefas = [issue_type['name'] for issue_type in issue_types if issue_type.get('subtask', False)]
+        issues_normais = [issue_type['name'] for issue_type in issue_types if not issue_type.get('subtask', False)]
+        
+        print(f"Tipos disponíveis no projeto {project_key}: {todos_tipos}")
+        return todos_tipos, subtarefas, issues_normais
+    except JiraError as e:
+        print(f"Erro ao obter tipos de issue: {e.status_code}")
+        return [], [], []
     except Exception as e:
         print(f"Erro ao obter tipos de issue: {e}")
         return [], [], []
@@ -126,8 +430,7 @@ def linkar_issue(issue_key, issue_pai):
             "outwardIssue": {"key": issue_key}
         }
         
-        url = f"{JIRA_BASE_URL}/rest/api/3/issueLink"
-        response = requests.post(url, headers=HEADERS, json=payload, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        response = jira_client.post("/rest/api/3/issueLink", json=payload)
         
         if response.status_code == 201:
             print(f"✅ Link criado: {issue_pai} ←→ {issue_key}")
@@ -139,6 +442,11 @@ def linkar_issue(issue_key, issue_pai):
         print(f"⚠️ Exceção ao criar link: {e}")
         return False
 
+@app.route('/api/cache/estatisticas')
+def estatisticas_cache():
+    """Contadores de acerto/falha dos caches de metadados do Jira"""
+    return jsonify({cache.nome: cache.estatisticas() for cache in (cache_projetos, cache_usuario, cache_issues, cache_analises_epico)})
+
 @app.route('/')
 def index():
     """Página principal"""
@@ -164,8 +472,7 @@ def buscar_requisito(issue_key):
         print(f"=== BUSCANDO REQUISITO {issue_key} ===")
         
         # Buscar a issue no Jira
-        url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}"
-        response = requests.get(url, headers=HEADERS, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        response = jira_client.get(f"/rest/api/3/issue/{issue_key}")
         
         if response.status_code != 200:
             print(f"❌ Requisito {issue_key} não encontrado: {response.status_code}")
@@ -175,18 +482,7 @@ def buscar_requisito(issue_key):
         
         # Extrair informações da issue
         issue_data = response.json()
-        issue_fields = issue_data.get("fields", {})
-        
-        requisito_info = {
-            "id": issue_key,
-            "titulo": issue_fields.get("summary", ""),
-            "descricao": extrair_texto_descricao(issue_fields.get("description")),
-            "status": issue_fields.get("status", {}).get("name", ""),
-            "tipo": issue_fields.get("issuetype", {}).get("name", ""),
-            "projeto": issue_fields.get("project", {}).get("key", ""),
-            "criado_em": issue_fields.get("created", ""),
-            "atualizado_em": issue_fields.get("updated", "")
-        }
+        requisito_info = montar_requisito_info(issue_key, issue_data.get("fields", {}))
         
         print(f"✅ Informações extraídas: {requisito_info['titulo']}")
         
@@ -199,123 +495,550 @@ def buscar_requisito(issue_key):
         return jsonify({"erro": f"Erro interno: {str(e)}"}), 500
 
 
+CAMPOS_CASO_TESTE = ["summary", "description", "status", "created", "updated", "components", "issuetype", "customfield_10062", "customfield_10063", "customfield_10065", "customfield_10066"]
+
+def montar_requisito_info(issue_key, issue_fields):
+    """Extrai as informações exibidas do requisito (issue pai)"""
+    return {
+        "id": issue_key,
+        "titulo": issue_fields.get("summary", ""),
+        "descricao": extrair_texto_descricao(issue_fields.get("description")),
+        "status": issue_fields.get("status", {}).get("name", ""),
+        "tipo": issue_fields.get("issuetype", {}).get("name", ""),
+        "projeto": issue_fields.get("project", {}).get("key", ""),
+        "criado_em": issue_fields.get("created", ""),
+        "atualizado_em": issue_fields.get("updated", "")
+    }
+
+def montar_caso_teste(issue):
+    """Converte uma issue da busca em caso de teste; retorna None se não for do tipo 'Caso de Teste'"""
+    fields = issue.get("fields", {})
+    issue_type = fields.get("issuetype", {}).get("name", "")
+    
+    # Filtrar apenas casos de teste (excluir subtarefas)
+    if issue_type != "Caso de Teste":
+        print(f"⚠️ Ignorado (não é caso de teste): {issue.get('key')} ({issue_type})")
+        return None
+    
+    # Extrair campos customizados com tratamento de erro
+    tipo_execucao = "N/A"
+    tipo_teste = "N/A"
+    objetivo = ""
+    pre_condicoes = ""
+    
+    try:
+        tipo_execucao = fields.get("customfield_10062", {}).get("value", "N/A")
+    except:
+        tipo_execucao = "N/A"
+    
+    try:
+        tipo_teste = fields.get("customfield_10063", {}).get("value", "N/A")
+    except:
+        tipo_teste = "N/A"
+    
+    try:
+        objetivo = extrair_texto_campo(fields.get("customfield_10066"))
+    except:
+        objetivo = ""
+    
+    try:
+        pre_condicoes = extrair_texto_campo(fields.get("customfield_10065"))
+    except:
+        pre_condicoes = ""
+    
+    return {
+        "id": issue.get("key"),
+        "titulo": fields.get("summary", ""),
+        "descricao": extrair_texto_descricao(fields.get("description")),
+        "status": fields.get("status", {}).get("name", ""),
+        "criado_em": fields.get("created", ""),
+        "atualizado_em": fields.get("updated", ""),
+        "tipo_execucao": tipo_execucao,
+        "tipo_teste": tipo_teste,
+        "componentes": [c.get("name", "") for c in fields.get("components", [])],
+        "objetivo": objetivo,
+        "pre_condicoes": pre_condicoes,
+        "tipo_issue": issue_type
+    }
+
+def jql_casos_teste(issue_pai):
+    """JQL dos casos de teste filhos (subtarefas E issues vinculadas por links)"""
+    return f'(parent = "{issue_pai}" OR issue in linkedIssues("{issue_pai}")) ORDER BY key DESC'
+
+CAMPOS_REQUISITO = ["summary", "description", "status", "issuetype", "project", "created", "updated"]
+CAMPOS_ESPELHO = CAMPOS_CASO_TESTE + ["parent", "issuelinks", "project"]
+
+class EspelhoCasosTeste:
+    """Espelho local (SQLite) das issues "Caso de Teste", dos seus vínculos com issues pai e dos requisitos.
+
+    Sincroniza em segundo plano com JQL incremental (`updated >= -Nm` desde a última sincronização,
+    com margem) e, a cada ESPELHO_RECONCILIAR_INTERVALO, faz uma carga completa que também remove
+    issues apagadas no Jira. As leituras com fonte=espelho respondem direto do banco.
+    """
+    
+    def __init__(self, caminho, projetos=""):
+        self.caminho = caminho
+        self.projetos = [p.strip().upper() for p in projetos.split(',') if p.strip()]
+        self._sync_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._inicializado = False
+        self.ultimo_resultado = None
+    
+    @contextmanager
+    def _conectar(self):
+        if not self._inicializado:
+            self._inicializar()
+        con = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+    
+    def _inicializar(self):
+        con = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            # WAL: leituras não bloqueiam durante a gravação de uma sincronização
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript("""
+                CREATE TABLE IF NOT EXISTS casos_teste (
+                    key TEXT PRIMARY KEY, projeto TEXT, numero INTEGER, atualizado_em TEXT,
+                    issue TEXT NOT NULL, sincronizado_em REAL
+                );
+                CREATE TABLE IF NOT EXISTS vinculos (
+                    pai TEXT NOT NULL, filho TEXT NOT NULL, origem TEXT NOT NULL,
+                    PRIMARY KEY (pai, filho, origem)
+                );
+                CREATE INDEX IF NOT EXISTS idx_vinculos_filho ON vinculos (filho);
+                CREATE TABLE IF NOT EXISTS requisitos (
+                    key TEXT PRIMARY KEY, issue TEXT NOT NULL, sincronizado_em REAL
+                );
+                CREATE TABLE IF NOT EXISTS metadados (chave TEXT PRIMARY KEY, valor TEXT);
+            """)
+            con.commit()
+        finally:
+            con.close()
+        self._inicializado = True
+    
+    def _metadado(self, chave):
+        with self._conectar() as con:
+            linha = con.execute("SELECT valor FROM metadados WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+    
+    def _definir_metadado(self, con, chave, valor):
+        con.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES (?, ?)", (chave, str(valor)))
+    
+    def jql_base(self):
+        jql = 'issuetype = "Caso de Teste"'
+        if self.projetos:
+            jql += f" AND project in ({', '.join(self.projetos)})"
+        return jql
+    
+    @staticmethod
+    def pais_caso_teste(fields):
+        """Issues pai de um caso de teste: a do campo parent (subtarefa) e as ligadas por links"""
+        pais = []
+        if fields.get("parent"):
+            pais.append((fields["parent"]["key"], "parent"))
+        for link in fields.get("issuelinks") or []:
+            outra = link.get("inwardIssue") or link.get("outwardIssue")
+            if outra:
+                pais.append((outra["key"], "link"))
+        return pais
+    
+    def _gravar_casos(self, con, issues, agora):
+        for issue in issues:
+            key = issue["key"]
+            projeto, _, numero = key.partition("-")
+            fields = issue.get("fields", {})
+            con.execute(
+                "INSERT OR REPLACE INTO casos_teste (key, projeto, numero, atualizado_em, issue, sincronizado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, projeto, int(numero) if numero.isdigit() else 0, fields.get("updated", ""), json.dumps(issue), agora)
+            )
+            con.execute("DELETE FROM vinculos WHERE filho = ?", (key,))
+            con.executemany(
+                "INSERT OR IGNORE INTO vinculos (pai, filho, origem) VALUES (?, ?, ?)",
+                [(pai, key, origem) for pai, origem in self.pais_caso_teste(fields)]
+            )
+    
+    def salvar_requisito(self, issue):
+        with self._conectar() as con:
+            con.execute("INSERT OR REPLACE INTO requisitos (key, issue, sincronizado_em) VALUES (?, ?, ?)",
+                        (issue["key"], json.dumps(issue), time.time()))
+    
+    def _atualizar_requisitos(self, minutos):
+        """Atualiza os requisitos já espelhados (busca `key in (...)` em lotes de até 100 chaves)"""
+        with self._conectar() as con:
+            chaves = [linha[0] for linha in con.execute("SELECT key FROM requisitos ORDER BY key")]
+        atualizados = 0
+        for inicio in range(0, len(chaves), JIRA_SEARCH_PAGE_SIZE):
+            lote = chaves[inicio:inicio + JIRA_SEARCH_PAGE_SIZE]
+            jql = f"key in ({', '.join(lote)})"
+            if minutos is not None:
+                jql += f' AND updated >= "-{minutos}m"'
+            # validateQuery=warn: um requisito apagado no Jira não invalida o lote inteiro
+            response = jira_client.search(jql, fields=CAMPOS_REQUISITO, max_results=len(lote), validateQuery="warn")
+            if response.status_code != 200:
+                print(f"⚠️ Espelho: erro ao atualizar requisitos: {response.status_code}")
+                continue
+            issues = response.json().get("issues", [])
+            with self._conectar() as con:
+                con.executemany("INSERT OR REPLACE INTO requisitos (key, issue, sincronizado_em) VALUES (?, ?, ?)",
+                                [(issue["key"], json.dumps(issue), time.time()) for issue in issues])
+            atualizados += len(issues)
+        return atualizados
+    
+    def sincronizar(self, completo=None):
+        """Sincroniza o espelho: incremental desde a última vez ou completo (primeira carga e reconciliação)"""
+        if not self._sync_lock.acquire(blocking=False):
+            return {"sucesso": False, "erro": "Sincronização já em andamento"}
+        try:
+            inicio = time.time()
+            cronometro = time.perf_counter()
+            ultima = self._metadado("ultima_sincronizacao")
+            ultima_completa = self._metadado("ultima_sincronizacao_completa")
+            if completo is None:
+                completo = not ultima or not ultima_completa or inicio - float(ultima_completa) >= ESPELHO_RECONCILIAR_INTERVALO
+            
+            jql = self.jql_base()
+            minutos = None
+            if not completo:
+                # Janela relativa (-Nm) evita depender do fuso horário do usuário da API
+                minutos = int((inicio - float(ultima)) // 60) + ESPELHO_MARGEM_MINUTOS
+                jql += f' AND updated >= "-{minutos}m"'
+            jql += " ORDER BY key ASC"
+            
+            vistos = set()
+            for pagina in jira_client.iter_search_pages(jql, fields=CAMPOS_ESPELHO):
+                with self._conectar() as con:
+                    self._gravar_casos(con, pagina, inicio)
+                vistos.update(issue["key"] for issue in pagina)
+            
+            removidos = 0
+            with self._conectar() as con:
+                if completo:
+                    # Carga completa: o que não veio foi apagado no Jira (ou mudou de tipo/projeto)
+                    ausentes = [linha[0] for linha in con.execute("SELECT key FROM casos_teste") if linha[0] not in vistos]
+                    for key in ausentes:
+                        con.execute("DELETE FROM casos_teste WHERE key = ?", (key,))
+                        con.execute("DELETE FROM vinculos WHERE filho = ?", (key,))
+                    removidos = len(ausentes)
+                    self._definir_metadado(con, "ultima_sincronizacao_completa", inicio)
+            requisitos = self._atualizar_requisitos(minutos)
+            with self._conectar() as con:
+                self._definir_metadado(con, "ultima_sincronizacao", inicio)
+            
+            self.ultimo_resultado = {
+                "sucesso": True,
+                "completa": completo,
+                "casos_atualizados": len(vistos),
+                "casos_removidos": removidos,
+                "requisitos_atualizados": requisitos,
+                "tempo_ms": int((time.perf_counter() - cronometro) * 1000),
+                "sincronizado_em": datetime.fromtimestamp(inicio).isoformat()
+            }
+            print(f"🪞 Espelho sincronizado ({'completo' if completo else 'incremental'}): "
+                  f"{len(vistos)} caso(s), {removidos} removido(s) em {self.ultimo_resultado['tempo_ms']} ms")
+            return self.ultimo_resultado
+        except Exception as e:
+            print(f"❌ Erro ao sincronizar espelho: {e}")
+            self.ultimo_resultado = {"sucesso": False, "erro": str(e)}
+            return self.ultimo_resultado
+        finally:
+            self._sync_lock.release()
+    
+    def atualizar_chaves(self, keys):
+        """Regrava no espelho as issues informadas (após criação/edição feita pelo próprio app)"""
+        keys = sorted(set(keys))
+        for inicio in range(0, len(keys), JIRA_SEARCH_PAGE_SIZE):
+            lote = keys[inicio:inicio + JIRA_SEARCH_PAGE_SIZE]
+            response = jira_client.search(f"{self.jql_base()} AND key in ({', '.join(lote)})", fields=CAMPOS_ESPELHO,
+                                          max_results=len(lote), validateQuery="warn")
+            if response.status_code == 200:
+                with self._conectar() as con:
+                    self._gravar_casos(con, response.json().get("issues", []), time.time())
+    
+    def aplicar_issue(self, issue):
+        """Aplica uma issue recebida por webhook: grava se for caso de teste; senão atualiza o requisito espelhado"""
+        key = issue["key"]
+        fields = issue.get("fields", {})
+        tipo = (fields.get("issuetype") or {}).get("name")
+        if tipo == "Caso de Teste" and (not self.projetos or key.partition("-")[0] in self.projetos):
+            if "issuelinks" not in fields:
+                # Payload parcial: buscar a issue completa para refazer os vínculos
+                self.atualizar_chaves([key])
+            else:
+                with self._conectar() as con:
+                    self._gravar_casos(con, [issue], time.time())
+            return "caso_teste"
+        
+        with self._conectar() as con:
+            # Deixou de ser caso de teste (ou nunca foi): tirar da tabela de casos
+            con.execute("DELETE FROM casos_teste WHERE key = ?", (key,))
+            con.execute("DELETE FROM vinculos WHERE filho = ?", (key,))
+            linha = con.execute("SELECT issue FROM requisitos WHERE key = ?", (key,)).fetchone()
+            if linha:
+                requisito = json.loads(linha[0])
+                requisito.setdefault("fields", {}).update({campo: fields[campo] for campo in CAMPOS_REQUISITO if campo in fields})
+                con.execute("INSERT OR REPLACE INTO requisitos (key, issue, sincronizado_em) VALUES (?, ?, ?)",
+                            (key, json.dumps(requisito), time.time()))
+                return "requisito"
+        return None
+    
+    def remover_issue(self, key):
+        """Remove do espelho uma issue apagada no Jira (caso de teste, vínculos e requisito)"""
+        with self._conectar() as con:
+            removidos = con.execute("DELETE FROM casos_teste WHERE key = ?", (key,)).rowcount
+            con.execute("DELETE FROM vinculos WHERE filho = ? OR pai = ?", (key, key))
+            removidos += con.execute("DELETE FROM requisitos WHERE key = ?", (key,)).rowcount
+        return removidos > 0
+    
+    def atualizar_ids(self, ids):
+        """Rebusca os casos de teste entre as issues informadas por id (eventos de link só trazem ids)"""
+        ids = sorted({str(i) for i in ids if i})
+        if not ids:
+            return []
+        response = jira_client.search(f"{self.jql_base()} AND issue in ({', '.join(ids)})", fields=CAMPOS_ESPELHO,
+                                      max_results=len(ids), validateQuery="warn")
+        if response.status_code != 200:
+            raise JiraError(response.status_code, response.text)
+        issues = response.json().get("issues", [])
+        with self._conectar() as con:
+            self._gravar_casos(con, issues, time.time())
+        return [issue["key"] for issue in issues]
+    
+    def iniciar(self):
+        """Sobe (uma vez por processo) a thread de sincronização periódica"""
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            
+            def executar():
+                while True:
+                    self.sincronizar()
+                    time.sleep(ESPELHO_SYNC_INTERVALO)
+            
+            self._thread = threading.Thread(target=executar, name="espelho-casos-teste", daemon=True)
+            self._thread.start()
+    
+    def disponivel(self):
+        """O espelho só responde leituras depois da primeira sincronização completa"""
+        return self._metadado("ultima_sincronizacao_completa") is not None
+    
+    def frescor(self):
+        ultima = self._metadado("ultima_sincronizacao")
+        if not ultima:
+            return {"sincronizado_em": None, "idade_segundos": None}
+        return {
+            "sincronizado_em": datetime.fromtimestamp(float(ultima)).isoformat(),
+            "idade_segundos": round(time.time() - float(ultima), 1)
+        }
+    
+    def casos_do_pai(self, issue_pai):
+        """Issues de caso de teste filhas/vinculadas ao pai, na ordem do JQL (key DESC)"""
+        with self._conectar() as con:
+            linhas = con.execute(
+                "SELECT issue FROM casos_teste WHERE key IN (SELECT filho FROM vinculos WHERE pai = ?) "
+                "ORDER BY projeto DESC, numero DESC",
+                (issue_pai,)
+            ).fetchall()
+        return [json.loads(linha[0]) for linha in linhas]
+    
+    def caso(self, issue_key):
+        with self._conectar() as con:
+            linha = con.execute("SELECT issue FROM casos_teste WHERE key = ?", (issue_key,)).fetchone()
+        return json.loads(linha[0]) if linha else None
+    
+    def requisito(self, issue_key):
+        with self._conectar() as con:
+            linha = con.execute("SELECT issue FROM requisitos WHERE key = ?", (issue_key,)).fetchone()
+        return json.loads(linha[0]) if linha else None
+    
+    def estatisticas(self):
+        with self._conectar() as con:
+            casos = con.execute("SELECT COUNT(*) FROM casos_teste").fetchone()[0]
+            vinculos = con.execute("SELECT COUNT(*) FROM vinculos").fetchone()[0]
+            requisitos = con.execute("SELECT COUNT(*) FROM requisitos").fetchone()[0]
+        completa = self._metadado("ultima_sincronizacao_completa")
+        return {
+            "ativo": ESPELHO_ATIVO,
+            "disponivel": self.disponivel(),
+            "projetos": self.projetos,
+            "casos_teste": casos,
+            "vinculos": vinculos,
+            "requisitos": requisitos,
+            "ultima_sincronizacao_completa": datetime.fromtimestamp(float(completa)).isoformat() if completa else None,
+            "ultimo_resultado": self.ultimo_resultado,
+            **self.frescor()
+        }
+
+espelho_casos_teste = EspelhoCasosTeste(ESPELHO_DB, ESPELHO_PROJETOS)
+
+def usar_espelho():
+    """Se a leitura deve vir do espelho (parâmetro fonte=espelho|jira, padrão ESPELHO_LEITURA_PADRAO)"""
+    if not ESPELHO_ATIVO or request.args.get("fonte", ESPELHO_LEITURA_PADRAO).lower() != "espelho":
+        return False
+    espelho_casos_teste.iniciar()
+    return espelho_casos_teste.disponivel()
+
+def requisito_do_espelho(issue_pai):
+    """Requisito guardado no espelho; na primeira consulta vem do Jira e passa a ser sincronizado"""
+    issue = espelho_casos_teste.requisito(issue_pai)
+    if issue is None:
+        response = jira_client.get(f"/rest/api/3/issue/{issue_pai}", params={"fields": ",".join(CAMPOS_REQUISITO)})
+        if response.status_code != 200:
+            return None, response
+        issue = response.json()
+        espelho_casos_teste.salvar_requisito(issue)
+    return montar_requisito_info(issue_pai, issue.get("fields", {})), None
+
+def atualizar_espelho_apos_escrita(issue_keys):
+    """Mantém o espelho coerente com o que o próprio app acabou de gravar no Jira"""
+    if not ESPELHO_ATIVO or not issue_keys:
+        return
+    try:
+        espelho_casos_teste.atualizar_chaves(issue_keys)
+    except Exception as e:
+        print(f"⚠️ Espelho: erro ao atualizar {issue_keys}: {e}")
+
+@app.route('/api/espelho/status')
+def status_espelho():
+    """Situação do espelho local de casos de teste"""
+    return jsonify(espelho_casos_teste.estatisticas())
+
+@app.route('/api/espelho/sincronizar', methods=['POST'])
+def sincronizar_espelho():
+    """Dispara uma sincronização do espelho (completo=true força a carga completa)"""
+    if not ESPELHO_ATIVO:
+        return jsonify({"erro": "Espelho desativado (ESPELHO_ATIVO=false)"}), 400
+    dados = request.get_json(silent=True) or {}
+    resultado = espelho_casos_teste.sincronizar(completo=True if dados.get('completo') else None)
+    return jsonify(resultado), (200 if resultado["sucesso"] else 409 if "andamento" in resultado.get("erro", "") else 500)
+
+EVENTOS_WEBHOOK_ISSUE = ("jira:issue_created", "jira:issue_updated", "jira:issue_deleted")
+EVENTOS_WEBHOOK_LINK = ("issuelink_created", "issuelink_deleted")
+ouvintes_webhook_jira = []
+
+def ouvinte_webhook_jira(funcao):
+    """Registra uma função (evento, payload) -> descrição do que foi aplicado, chamada a cada webhook aceito"""
+    ouvintes_webhook_jira.append(funcao)
+    return funcao
+
+def verificar_segredo_webhook():
+    """Aceita a assinatura HMAC-SHA256 do Jira (X-Hub-Signature) ou o segredo em header/parâmetro"""
+    import hmac
+    import hashlib
+    
+    assinatura = request.headers.get("X-Hub-Signature", "")
+    if assinatura:
+        algoritmo, _, recebido = assinatura.partition("=")
+        if algoritmo.lower() != "sha256":
+            return False
+        esperado = hmac.new(JIRA_WEBHOOK_SECRET.encode(), request.get_data(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(esperado, recebido)
+    # Webhooks sem assinatura (legados ou de automação): segredo em header ou na URL
+    segredo = request.headers.get("X-Webhook-Secret") or request.args.get("secret", "")
+    return hmac.compare_digest(segredo.encode(), JIRA_WEBHOOK_SECRET.encode())
+
+@ouvinte_webhook_jira
+def invalidar_caches_webhook(evento, payload):
+    """Descarta do cache de issues apenas as entradas da issue alterada"""
+    if evento not in EVENTOS_WEBHOOK_ISSUE:
+        return None
+    caminho = f"/rest/api/3/issue/{payload['issue']['key']}"
+    cache_issues.invalidar(lambda chave: chave[0] == caminho)
+    return {"cache_issues": payload["issue"]["key"]}
+
+@ouvinte_webhook_jira
+def aplicar_webhook_espelho(evento, payload):
+    """Atualiza o espelho só nas chaves afetadas pelo evento"""
+    if not ESPELHO_ATIVO:
+        return None
+    if evento == "jira:issue_deleted":
+        return {"espelho_removido": payload["issue"]["key"]} if espelho_casos_teste.remover_issue(payload["issue"]["key"]) else None
+    if evento in EVENTOS_WEBHOOK_ISSUE:
+        aplicado = espelho_casos_teste.aplicar_issue(payload["issue"])
+        return {"espelho": {aplicado: payload["issue"]["key"]}} if aplicado else None
+    if evento in EVENTOS_WEBHOOK_LINK:
+        link = payload.get("issueLink", {})
+        chaves = espelho_casos_teste.atualizar_ids([link.get("sourceIssueId"), link.get("destinationIssueId")])
+        return {"espelho_vinculos": chaves} if chaves else None
+    return None
+
+@app.route('/webhooks/jira', methods=['POST'])
+def receber_webhook_jira():
+    """Recebe eventos de issue (criada/alterada/apagada) e de link (criado/apagado) e os aplica localmente"""
+    if not JIRA_WEBHOOK_SECRET:
+        return jsonify({"erro": "Webhook desativado (JIRA_WEBHOOK_SECRET não configurado)"}), 403
+    if not verificar_segredo_webhook():
+        print("🚫 Webhook do Jira rejeitado: segredo inválido")
+        return jsonify({"erro": "Segredo inválido"}), 401
+    
+    payload = request.get_json(silent=True) or {}
+    evento = payload.get("webhookEvent", "")
+    if evento not in EVENTOS_WEBHOOK_ISSUE + EVENTOS_WEBHOOK_LINK:
+        return jsonify({"sucesso": True, "evento": evento, "ignorado": True})
+    if evento in EVENTOS_WEBHOOK_ISSUE and not (payload.get("issue") or {}).get("key"):
+        return jsonify({"erro": "Evento de issue sem issue.key"}), 400
+    
+    aplicado = []
+    erros = []
+    for ouvinte in ouvintes_webhook_jira:
+        try:
+            resultado = ouvinte(evento, payload)
+            if resultado:
+                aplicado.append(resultado)
+        except Exception as e:
+            print(f"⚠️ Erro ao aplicar webhook {evento} em {ouvinte.__name__}: {e}")
+            erros.append({"ouvinte": ouvinte.__name__, "erro": str(e)})
+    
+    print(f"🔔 Webhook {evento} aplicado: {aplicado}")
+    return jsonify({"sucesso": not erros, "evento": evento, "aplicado": aplicado, "erros": erros}), (200 if not erros else 500)
+
 @app.route('/api/casos-teste/<issue_pai>')
 def buscar_casos_teste(issue_pai):
-    """Busca todos os casos de teste filhos de uma issue pai"""
+    """Busca todos os casos de teste filhos de uma issue pai (todas as páginas da busca)"""
     try:
+        if usar_espelho():
+            requisito_info, response_pai = requisito_do_espelho(issue_pai)
+            if requisito_info is None:
+                return jsonify({"erro": f"Issue pai {issue_pai} não encontrada", "status_code": response_pai.status_code, "resposta": response_pai.text}), 404
+            casos_teste = [caso for caso in map(montar_caso_teste, espelho_casos_teste.casos_do_pai(issue_pai)) if caso]
+            return jsonify({
+                "issue_pai": issue_pai,
+                "requisito": requisito_info,
+                "total_casos": len(casos_teste),
+                "casos_teste": casos_teste,
+                "fonte": "espelho",
+                "espelho": espelho_casos_teste.frescor()
+            })
+        
         print(f"=== BUSCANDO CASOS DE TESTE PARA {issue_pai} ===")
         
         # Busca a issue pai primeiro
-        url_pai = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_pai}"
-        response_pai = requests.get(url_pai, headers=HEADERS, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        response_pai = jira_client.get(f"/rest/api/3/issue/{issue_pai}")
         
         if response_pai.status_code != 200:
             print(f"❌ Issue pai {issue_pai} não encontrada: {response_pai.status_code}")
             return jsonify({"erro": f"Issue pai {issue_pai} não encontrada", "status_code": response_pai.status_code, "resposta": response_pai.text}), 404
         
         print(f"✅ Issue pai {issue_pai} encontrada")
+        requisito_info = montar_requisito_info(issue_pai, response_pai.json().get("fields", {}))
         
-        # Extrair informações da issue pai
-        issue_pai_data = response_pai.json()
-        issue_pai_fields = issue_pai_data.get("fields", {})
-        requisito_info = {
-            "id": issue_pai,
-            "titulo": issue_pai_fields.get("summary", ""),
-            "descricao": extrair_texto_descricao(issue_pai_fields.get("description")),
-            "status": issue_pai_fields.get("status", {}).get("name", ""),
-            "tipo": issue_pai_fields.get("issuetype", {}).get("name", ""),
-            "projeto": issue_pai_fields.get("project", {}).get("key", ""),
-            "criado_em": issue_pai_fields.get("created", ""),
-            "atualizado_em": issue_pai_fields.get("updated", "")
-        }
-        
-        # Busca os casos de teste filhos (subtarefas E issues vinculadas por links)
-        jql = f'(parent = "{issue_pai}" OR issue in linkedIssues("{issue_pai}")) ORDER BY key DESC'
+        jql = jql_casos_teste(issue_pai)
         print(f"🔍 JQL Query: {jql}")
         
-        url_filhos = f"{JIRA_BASE_URL}/rest/api/3/search"
-        payload = {
-            "jql": jql,
-            "maxResults": 100,
-            "fields": ["summary", "description", "status", "created", "updated", "components", "issuetype", "customfield_10062", "customfield_10063", "customfield_10065", "customfield_10066"]
-        }
-        
-        print(f"📡 Fazendo requisição para: {url_filhos}")
-        print(f"📡 Payload: {payload}")
-        
-        response_filhos = requests.post(url_filhos, headers=HEADERS, json=payload, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
-        
-        print(f"📡 Status da resposta: {response_filhos.status_code}")
-        
-        if response_filhos.status_code != 200:
-            print(f"❌ Erro na resposta: {response_filhos.text}")
-            return jsonify({"erro": "Erro ao buscar casos de teste", "status_code": response_filhos.status_code, "resposta": response_filhos.text}), 500
-        
-        response_data = response_filhos.json()
-        print(f"📡 Total de issues retornadas: {response_data.get('total', 0)}")
-        print(f"📡 MaxResults: {response_data.get('maxResults', 0)}")
+        try:
+            issues = jira_client.search_all(jql, fields=CAMPOS_CASO_TESTE)
+        except JiraError as e:
+            print(f"❌ Erro na resposta: {e.texto}")
+            return jsonify({"erro": "Erro ao buscar casos de teste", "status_code": e.status_code, "resposta": e.texto}), 500
         
-        issues = response_data.get("issues", [])
         print(f"📡 Issues encontradas: {len(issues)}")
         
-        # Log de todas as issues encontradas
-        for i, issue in enumerate(issues):
-            print(f"  {i+1}. {issue.get('key')} - {issue.get('fields', {}).get('summary', 'Sem título')}")
-        
-        casos_teste = []
-        
-        for issue in issues:
-            fields = issue.get("fields", {})
-            issue_type = fields.get("issuetype", {}).get("name", "")
-            
-            print(f"🔍 Processando issue: {issue.get('key')} - Tipo: {issue_type}")
-            
-            # Filtrar apenas casos de teste (excluir subtarefas)
-            if issue_type == "Caso de Teste":
-                # Extrair campos customizados com tratamento de erro
-                tipo_execucao = "N/A"
-                tipo_teste = "N/A"
-                objetivo = ""
-                pre_condicoes = ""
-                
-                try:
-                    tipo_execucao = fields.get("customfield_10062", {}).get("value", "N/A")
-                except:
-                    tipo_execucao = "N/A"
-                
-                try:
-                    tipo_teste = fields.get("customfield_10063", {}).get("value", "N/A")
-                except:
-                    tipo_teste = "N/A"
-                
-                try:
-                    objetivo = extrair_texto_campo(fields.get("customfield_10066"))
-                except:
-                    objetivo = ""
-                
-                try:
-                    pre_condicoes = extrair_texto_campo(fields.get("customfield_10065"))
-                except:
-                    pre_condicoes = ""
-                
-                caso = {
-                    "id": issue.get("key"),
-                    "titulo": fields.get("summary", ""),
-                    "descricao": extrair_texto_descricao(fields.get("description")),
-                    "status": fields.get("status", {}).get("name", ""),
-                    "criado_em": fields.get("created", ""),
-                    "atualizado_em": fields.get("updated", ""),
-                    "tipo_execucao": tipo_execucao,
-                    "tipo_teste": tipo_teste,
-                    "componentes": [c.get("name", "") for c in fields.get("components", [])],
-                    "objetivo": objetivo,
-                    "pre_condicoes": pre_condicoes,
-                    "tipo_issue": issue_type
-                }
-                casos_teste.append(caso)
-                print(f"✅ Adicionado caso de teste: {issue.get('key')} ({issue_type})")
-            else:
-                print(f"⚠️ Ignorado (não é caso de teste): {issue.get('key')} ({issue_type})")
+        casos_teste = [caso for caso in map(montar_caso_teste, issues) if caso]
         
         print(f"✅ Total de casos de teste processados: {len(casos_teste)}")
         
@@ -323,7 +1046,8 @@ def buscar_casos_teste(issue_pai):
             "issue_pai": issue_pai,
             "requisito": requisito_info,
             "total_casos": len(casos_teste),
-            "casos_teste": casos_teste
+            "casos_teste": casos_teste,
+            "fonte": "jira"
         })
         
     except Exception as e:
@@ -332,103 +1056,167 @@ def buscar_casos_teste(issue_pai):
         traceback.print_exc()
         return jsonify({"erro": str(e)}), 500
 
-        traceback.print_exc()
+@app.route('/api/casos-teste/<issue_pai>/stream')
+def buscar_casos_teste_stream(issue_pai):
+    """Variante em NDJSON da busca de casos de teste: envia cada página assim que ela chega.
+
+    Linhas emitidas: {"tipo": "requisito"}, uma {"tipo": "casos"} por página,
+    {"tipo": "erro"} em caso de falha no meio da busca e {"tipo": "fim"} ao final.
+    """
+    try:
+        if usar_espelho():
+            requisito_info, response_pai = requisito_do_espelho(issue_pai)
+            if requisito_info is None:
+                return jsonify({"erro": f"Issue pai {issue_pai} não encontrada", "status_code": response_pai.status_code, "resposta": response_pai.text}), 404
+            casos = [caso for caso in map(montar_caso_teste, espelho_casos_teste.casos_do_pai(issue_pai)) if caso]
+            espelho = espelho_casos_teste.frescor()
+            linhas = [
+                {"tipo": "requisito", "issue_pai": issue_pai, "requisito": requisito_info, "fonte": "espelho", "espelho": espelho},
+                {"tipo": "casos", "casos_teste": casos},
+                {"tipo": "fim", "total_casos": len(casos), "fonte": "espelho", "espelho": espelho}
+            ]
+            return Response("".join(json.dumps(linha) + "\n" for linha in linhas), mimetype='application/x-ndjson')
+        
+        response_pai = jira_client.get(f"/rest/api/3/issue/{issue_pai}")
+        if response_pai.status_code != 200:
+            return jsonify({"erro": f"Issue pai {issue_pai} não encontrada", "status_code": response_pai.status_code, "resposta": response_pai.text}), 404
+        requisito_info = montar_requisito_info(issue_pai, response_pai.json().get("fields", {}))
+    except Exception as e:
         return jsonify({"erro": str(e)}), 500
+    
+    def gerar():
+        yield json.dumps({"tipo": "requisito", "issue_pai": issue_pai, "requisito": requisito_info}) + "\n"
+        total_casos = 0
+        try:
+            for pagina in jira_client.iter_search_pages(jql_casos_teste(issue_pai), fields=CAMPOS_CASO_TESTE):
+                casos = [caso for caso in map(montar_caso_teste, pagina) if caso]
+                total_casos += len(casos)
+                yield json.dumps({"tipo": "casos", "casos_teste": casos}) + "\n"
+        except Exception as e:
+            print(f"❌ Erro durante o streaming de casos de teste: {e}")
+            yield json.dumps({"tipo": "erro", "erro": str(e)}) + "\n"
+        yield json.dumps({"tipo": "fim", "total_casos": total_casos}) + "\n"
+    
+    return Response(stream_with_context(gerar()), mimetype='application/x-ndjson')
+
+CABECALHO_EXPORTACAO_CASOS = ["ID", "Título", "Status", "Tipo de Execução", "Tipo de Teste", "Componentes",
+                              "Objetivo", "Pré-condições", "Descrição", "Criado em", "Atualizado em"]
+LARGURA_MAXIMA_COLUNA_EXCEL = 50
+
+def linha_exportacao_caso_teste(issue):
+    """Valores de um caso de teste na ordem de CABECALHO_EXPORTACAO_CASOS"""
+    fields = issue.get("fields", {})
+    valores = [
+        issue.get("key"),
+        fields.get("summary", ""),
+        (fields.get("status") or {}).get("name", ""),
+        (fields.get("customfield_10062") or {}).get("value", ""),
+        (fields.get("customfield_10063") or {}).get("value", ""),
+        ", ".join([c.get("name", "") for c in fields.get("components") or []]),
+        extrair_texto_campo(fields.get("customfield_10066")),
+        extrair_texto_campo(fields.get("customfield_10065")),
+        extrair_texto_descricao(fields.get("description")),
+        fields.get("created", ""),
+        fields.get("updated", "")
+    ]
+    # Caracteres de controle vindos do Jira são rejeitados pelo openpyxl
+    return [ILLEGAL_CHARACTERS_RE.sub("", valor) if isinstance(valor, str) else valor for valor in valores]
 
 @app.route('/api/casos-teste/<issue_pai>/exportar-excel')
 def exportar_casos_teste_excel(issue_pai):
-    """Exporta os casos de teste de uma issue pai em formato Excel"""
+    """Exporta os casos de teste de uma issue pai em formato Excel.
+
+    Pagina todos os casos e grava as linhas em uma planilha write-only do openpyxl (as linhas vão
+    para um arquivo temporário, não para a memória); o .xlsx é enviado em blocos e apagado ao fim.
+    """
+    caminho = None
     try:
+        inicio = time.perf_counter()
         # Busca a issue pai primeiro
-        url_pai = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_pai}"
-        response_pai = requests.get(url_pai, headers=HEADERS, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        response_pai = jira_client.get(f"/rest/api/3/issue/{issue_pai}", params={"fields": "summary"})
         
         if response_pai.status_code != 200:
             return jsonify({"erro": f"Issue pai {issue_pai} não encontrada"}), 404
         
-        # Busca os casos de teste filhos (subtarefas)
+        # Busca os casos de teste filhos (subtarefas), página a página
         jql = f'parent = "{issue_pai}" ORDER BY key DESC'
-        url_filhos = f"{JIRA_BASE_URL}/rest/api/3/search"
-        payload = {
-            "jql": jql,
-            "maxResults": 100,
-            "fields": ["summary", "description", "status", "created", "updated", "customfield_10062", "customfield_10063", "components", "customfield_10066", "customfield_10065"]
-        }
-        
-        response_filhos = requests.post(url_filhos, headers=HEADERS, json=payload, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
-        
-        if response_filhos.status_code != 200:
+        fields = ["summary", "description", "status", "created", "updated", "customfield_10062", "customfield_10063", "components", "customfield_10066", "customfield_10065"]
+        paginas = jira_client.iter_search_pages(jql, fields=fields)
+        try:
+            primeira = [linha_exportacao_caso_teste(issue) for issue in next(paginas)]
+        except JiraError as e:
+            print(f"❌ Erro ao buscar casos de teste para exportação: {e}")
             return jsonify({"erro": "Erro ao buscar casos de teste"}), 500
         
-        issues = response_filhos.json().get("issues", [])
-        
-        # Criar DataFrame
-        dados = []
-        for issue in issues:
-            fields = issue.get("fields", {})
-            dados.append({
-                "ID": issue.get("key"),
-                "Título": fields.get("summary", ""),
-                "Status": fields.get("status", {}).get("name", ""),
-                "Tipo de Execução": fields.get("customfield_10062", {}).get("value", ""),
-                "Tipo de Teste": fields.get("customfield_10063", {}).get("value", ""),
-                "Componentes": ", ".join([c.get("name", "") for c in fields.get("components", [])]),
-                "Objetivo": extrair_texto_campo(fields.get("customfield_10066")),
-                "Pré-condições": extrair_texto_campo(fields.get("customfield_10065")),
-                "Descrição": extrair_texto_descricao(fields.get("description")),
-                "Criado em": fields.get("created", ""),
-                "Atualizado em": fields.get("updated", "")
-            })
-        
-        df = pd.DataFrame(dados)
-        
-        # Criar arquivo Excel
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Casos de Teste', index=False)
-            
-            # Acessar a planilha para formatação
-            workbook = writer.book
-            worksheet = writer.sheets['Casos de Teste']
-            
-            # Formatação do cabeçalho
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            
-            # Aplicar formatação ao cabeçalho
-            for cell in worksheet[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-            
-            # Ajustar largura das colunas
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        output.seek(0)
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Casos de Teste')
+        
+        # Planilhas write-only gravam as larguras antes das linhas: calculadas pelo cabeçalho e pela primeira página
+        for indice, titulo in enumerate(CABECALHO_EXPORTACAO_CASOS):
+            maior = max([len(titulo)] + [len(str(linha[indice])) for linha in primeira if linha[indice] is not None])
+            worksheet.column_dimensions[get_column_letter(indice + 1)].width = min(maior + 2, LARGURA_MAXIMA_COLUNA_EXCEL)
+        
+        # Formatação do cabeçalho
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header_alignment = Alignment(horizontal="center", vertical="center")
+        cabecalho = []
+        for titulo in CABECALHO_EXPORTACAO_CASOS:
+            celula = WriteOnlyCell(worksheet, value=titulo)
+            celula.font = header_font
+            celula.fill = header_fill
+            celula.alignment = header_alignment
+            cabecalho.append(celula)
+        worksheet.append(cabecalho)
+        
+        total = 0
+        for linha in primeira:
+            worksheet.append(linha)
+            total += 1
+        del primeira
+        for pagina in paginas:
+            for issue in pagina:
+                worksheet.append(linha_exportacao_caso_teste(issue))
+                total += 1
+        
+        with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as arquivo:
+            caminho = arquivo.name
+        workbook.save(caminho)
+        tamanho = os.path.getsize(caminho)
+        print(f"📊 Exportação de {issue_pai}: {total} caso(s), {tamanho / 1024:.0f} KB em "
+              f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
+        
+        def enviar(caminho_arquivo):
+            with open(caminho_arquivo, 'rb') as f:
+                while True:
+                    bloco = f.read(64 * 1024)
+                    if not bloco:
+                        break
+                    yield bloco
         
         # Nome do arquivo
         filename = f"casos_teste_{issue_pai}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         
-        return send_file(
-            output,
+        response = Response(
+            enviar(caminho),
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Content-Length": str(tamanho)
+            }
         )
+        arquivo_temporario = caminho
+        response.call_on_close(lambda: os.path.exists(arquivo_temporario) and os.remove(arquivo_temporario))
+        caminho = None
+        return response
         
     except Exception as e:
+        print(f"❌ Erro ao exportar casos de teste de {issue_pai}: {e}")
         return jsonify({"erro": str(e)}), 500
+    finally:
+        # Só sobra caminho aqui se a resposta não chegou a ser montada
+        if caminho and os.path.exists(caminho):
+            os.remove(caminho)
 
 @app.route('/planilha/<issue_pai>')
 def visualizar_planilha(issue_pai):
@@ -441,24 +1229,93 @@ def visualizar_planilha(issue_pai):
 
 
 
+def montar_caso_teste_detalhe(issue_data):
+    """Detalhe de um caso de teste (descrição, objetivo e pré-condições extraídos do ADF da descrição)"""
+    # Extrair dados da issue
+    fields = issue_data.get('fields', {})
+    
+    # Extrair descrição (pode estar em formato Atlassian Document Format)
+    descricao = ""
+    if 'description' in fields and fields['description']:
+        descricao_content = fields['description'].get('content', [])
+        for content in descricao_content:
+            if content.get('type') == 'codeBlock':
+                for code_content in content.get('content', []):
+                    if code_content.get('type') == 'text':
+                        descricao += code_content.get('text', '')
+    
+    # Extrair objetivo e pré-condições da descrição
+    objetivo = ""
+    pre_condicoes = ""
+    if 'description' in fields and fields['description']:
+        descricao_content = fields['description'].get('content', [])
+        current_section = None
+        
+        for content in descricao_content:
+            if content.get('type') == 'paragraph':
+                paragraph_text = ""
+                for para_content in content.get('content', []):
+                    if para_content.get('type') == 'text':
+                        paragraph_text += para_content.get('text', '')
+                
+                # Verificar se é um cabeçalho de seção
+                if 'Objetivo:' in paragraph_text:
+                    current_section = 'objetivo'
+                elif 'Pré Condição:' in paragraph_text:
+                    current_section = 'pre_condicoes'
+                elif paragraph_text.strip() and current_section:
+                    # Se não for cabeçalho e temos uma seção ativa, é o conteúdo
+                    if current_section == 'objetivo':
+                        objetivo = paragraph_text.strip()
+                    elif current_section == 'pre_condicoes':
+                        pre_condicoes = paragraph_text.strip()
+                    current_section = None
+    
+    # Extrair campos customizados
+    tipo_execucao = fields.get('customfield_10062', {}).get('value', 'Manual')
+    tipo_teste = fields.get('customfield_10063', {}).get('value', 'Funcional')
+    
+    # Extrair componentes
+    componentes = []
+    if 'components' in fields:
+        componentes = [comp.get('name', '') for comp in fields['components']]
+    
+    caso_teste = {
+        "id": issue_data.get('key'),
+        "titulo": fields.get('summary', ''),
+        "status": fields.get('status', {}).get('name', ''),
+        "descricao": descricao,
+        "objetivo": objetivo,
+        "pre_condicoes": pre_condicoes,
+        "tipo_execucao": tipo_execucao,
+        "tipo_teste": tipo_teste,
+        "componentes": componentes,
+        "criado_em": fields.get('created', ''),
+        "atualizado_em": fields.get('updated', '')
+    }
+    
+    return caso_teste
+
 @app.route('/api/caso-teste/<issue_key>', methods=['GET'])
 def obter_caso_teste(issue_key):
     """Obtém um caso de teste específico"""
     try:
         print(f"=== OBTENDO CASO DE TESTE: {issue_key} ===")
         
+        if usar_espelho():
+            issue_data = espelho_casos_teste.caso(issue_key)
+            if issue_data:
+                caso_teste = montar_caso_teste_detalhe(issue_data)
+                caso_teste["fonte"] = "espelho"
+                caso_teste["espelho"] = espelho_casos_teste.frescor()
+                return jsonify(caso_teste)
+        
         if not all([JIRA_BASE_URL, JIRA_EMAIL, JIRA_API_TOKEN]):
             print("Erro: Configurações do Jira incompletas")
             return jsonify({"erro": "Configurações do Jira incompletas"}), 500
         
         # Buscar a issue no Jira
-        url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}"
-        headers = {
-            "Accept": "application/json",
-            "Authorization": f"Basic {base64.b64encode(f'{JIRA_EMAIL}:{JIRA_API_TOKEN}'.encode()).decode()}"
-        }
-        
-        response = requests.get(url, headers=headers)
+        response = jira_client.get(f"/rest/api/3/issue/{issue_key}")
         print(f"Status da resposta: {response.status_code}")
         
         if response.status_code == 404:
@@ -469,70 +1326,10 @@ def obter_caso_teste(issue_key):
             return jsonify({"erro": "Erro ao buscar caso de teste no Jira"}), 500
         
         issue_data = response.json()
-        print("Dados da issue obtidos com sucesso")
-        
-        # Extrair dados da issue
-        fields = issue_data.get('fields', {})
-        
-        # Extrair descrição (pode estar em formato Atlassian Document Format)
-        descricao = ""
-        if 'description' in fields and fields['description']:
-            descricao_content = fields['description'].get('content', [])
-            for content in descricao_content:
-                if content.get('type') == 'codeBlock':
-                    for code_content in content.get('content', []):
-                        if code_content.get('type') == 'text':
-                            descricao += code_content.get('text', '')
-        
-        # Extrair objetivo e pré-condições da descrição
-        objetivo = ""
-        pre_condicoes = ""
-        if 'description' in fields and fields['description']:
-            descricao_content = fields['description'].get('content', [])
-            current_section = None
-            
-            for content in descricao_content:
-                if content.get('type') == 'paragraph':
-                    paragraph_text = ""
-                    for para_content in content.get('content', []):
-                        if para_content.get('type') == 'text':
-                            paragraph_text += para_content.get('text', '')
-                    
-                    # Verificar se é um cabeçalho de seção
-                    if 'Objetivo:' in paragraph_text:
-                        current_section = 'objetivo'
-                    elif 'Pré Condição:' in paragraph_text:
-                        current_section = 'pre_condicoes'
-                    elif paragraph_text.strip() and current_section:
-                        # Se não for cabeçalho e temos uma seção ativa, é o conteúdo
-                        if current_section == 'objetivo':
-                            objetivo = paragraph_text.strip()
-                        elif current_section == 'pre_condicoes':
-                            pre_condicoes = paragraph_text.strip()
-                        current_section = None
-        
-        # Extrair campos customizados
-        tipo_execucao = fields.get('customfield_10062', {}).get('value', 'Manual')
-        tipo_teste = fields.get('customfield_10063', {}).get('value', 'Funcional')
-        
-        # Extrair componentes
-        componentes = []
-        if 'components' in fields:
-            componentes = [comp.get('name', '') for comp in fields['components']]
-        
-        caso_teste = {
-            "id": issue_data.get('key'),
-            "titulo": fields.get('summary', ''),
-            "status": fields.get('status', {}).get('name', ''),
-            "descricao": descricao,
-            "objetivo": objetivo,
-            "pre_condicoes": pre_condicoes,
-            "tipo_execucao": tipo_execucao,
-            "tipo_teste": tipo_teste,
-            "componentes": componentes,
-            "criado_em": fields.get('created', ''),
-            "atualizado_em": fields.get('updated', '')
-        }
+        print("Dados da issue obtidos com sucesso")
+        
+        caso_teste = montar_caso_teste_detalhe(issue_data)
+        caso_teste["fonte"] = "jira"
         
         print("Caso de teste processado com sucesso")
         return jsonify(caso_teste)
@@ -655,6 +1452,10 @@ def criar_caso_teste():
         # Não adicionar parent (criar como issue independente)
         print(f"Criando como 'Caso de Teste' independente (sem parent)")
         
+        # Responsável definido já na criação (evita um PUT extra em /assignee)
+        if account_id:
+            payload["fields"]["assignee"] = {"accountId": account_id}
+        
         # Adiciona componentes apenas se forem válidos
         componentes = dados.get("componentes", [])
         if componentes and componentes != ["teste"]:
@@ -665,11 +1466,17 @@ def criar_caso_teste():
         
         print("Payload preparado:", payload)
         
-        url = f"{JIRA_BASE_URL}/rest/api/3/issue"
+        url = jira_client.url("/rest/api/3/issue")
         print("URL da requisição:", url)
-        print("Headers:", HEADERS)
         
-        response = requests.post(url, headers=HEADERS, json=payload, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        response = jira_client.post(url, json=payload)
+        
+        # Se o campo assignee não estiver na tela de criação, cria sem ele e atribui depois
+        atribuir_depois = False
+        if response.status_code == 400 and "assignee" in response.text and "assignee" in payload["fields"]:
+            del payload["fields"]["assignee"]
+            atribuir_depois = True
+            response = jira_client.post(url, json=payload)
         
         print("Status code da resposta:", response.status_code)
         print("Resposta do Jira:", response.text)
@@ -679,8 +1486,7 @@ def criar_caso_teste():
             issue_key = issue_created.get("key")
             print("Issue criada com sucesso:", issue_key)
             
-            # Atribui o responsável
-            if account_id:
+            if atribuir_depois:
                 atribuir_responsavel(issue_key, account_id)
             
             # Criar link entre a issue pai e o caso de teste
@@ -691,6 +1497,7 @@ def criar_caso_teste():
                 print(f"⚠️ Aviso: Não foi possível criar link entre {issue_pai} e {issue_key}")
             
             print(f"✅ Caso de teste {issue_key} criado com sucesso e vinculado a {issue_pai}")
+            atualizar_espelho_apos_escrita([issue_key])
             
             return jsonify({
                 "sucesso": True,
@@ -760,10 +1567,10 @@ def atualizar_caso_teste(issue_key):
             }
         }
         
-        url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}"
-        response = requests.put(url, headers=HEADERS, json=payload, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        response = jira_client.put(f"/rest/api/3/issue/{issue_key}", json=payload)
         
         if response.status_code == 204:
+            atualizar_espelho_apos_escrita([issue_key])
             return jsonify({
                 "sucesso": True,
                 "mensagem": f"Caso de teste {issue_key} atualizado com sucesso"
@@ -776,9 +1583,85 @@ def atualizar_caso_teste(issue_key):
 
 
 
+def atualizar_caso_teste_batch_item(caso):
+    """Atualiza um único caso de teste do lote e mede a latência da linha"""
+    inicio = time.perf_counter()
+    issue_key = caso.get('issue_key')
+    campos_alterados = caso.get('campos', {})
+    
+    def resultado(status, mensagem):
+        return {
+            "issue_key": issue_key,
+            "status": status,
+            "mensagem": mensagem,
+            "latencia_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+    
+    if not issue_key or not campos_alterados:
+        return resultado("erro", "Dados inválidos")
+    
+    try:
+        # Preparar payload para atualização
+        payload = {"fields": {}}
+        
+        # Mapear campos personalizados
+        if 'titulo' in campos_alterados:
+            payload["fields"]["summary"] = campos_alterados['titulo']
+        
+        if 'status' in campos_alterados:
+            payload["fields"]["status"] = {"name": campos_alterados['status']}
+        
+        if 'tipo_execucao' in campos_alterados:
+            payload["fields"]["customfield_10062"] = {"value": campos_alterados['tipo_execucao']}
+        
+        if 'tipo_teste' in campos_alterados:
+            payload["fields"]["customfield_10063"] = {"value": campos_alterados['tipo_teste']}
+        
+        if 'componentes' in campos_alterados:
+            componentes = [{"name": comp.strip()} for comp in campos_alterados['componentes'].split(',') if comp.strip()]
+            payload["fields"]["components"] = componentes
+        
+        # Seções da descrição: objetivo, pré-condições e BDD são compostos em uma única etapa
+        secoes_alteradas = SECOES_DESCRICAO & campos_alterados.keys()
+        if secoes_alteradas:
+            secoes = {}
+            
+            # Só busca a issue quando alguma seção precisa ser preservada (no máximo um GET por linha)
+            if secoes_alteradas != SECOES_DESCRICAO:
+                response_get = jira_client.get(
+                    f"/rest/api/3/issue/{issue_key}",
+                    params={"fields": "description"}
+                )
+                if response_get.status_code != 200:
+                    return resultado("erro", f"Erro {response_get.status_code} ao obter descrição atual: {response_get.text}")
+                secoes = extrair_secoes_descricao(response_get.json().get('fields', {}).get('description'))
+            
+            for secao in secoes_alteradas:
+                secoes[secao] = campos_alterados[secao] or ""
+            
+            payload["fields"]["description"] = montar_descricao_caso_teste(
+                secoes.get('objetivo', ""),
+                secoes.get('pre_condicoes', ""),
+                secoes.get('descricao', "")
+            )
+            if 'objetivo' in secoes_alteradas:
+                payload["fields"]["customfield_10066"] = montar_campo_texto(secoes['objetivo'])
+            if 'pre_condicoes' in secoes_alteradas:
+                payload["fields"]["customfield_10065"] = montar_campo_texto(secoes['pre_condicoes'])
+        
+        # Fazer a requisição para atualizar
+        response = jira_client.put(f"/rest/api/3/issue/{issue_key}", json=payload)
+        
+        if response.status_code == 204:
+            return resultado("sucesso", "Atualizado com sucesso")
+        return resultado("erro", f"Erro {response.status_code}: {response.text}")
+        
+    except Exception as e:
+        return resultado("erro", str(e))
+
 @app.route('/api/casos-teste/batch-update', methods=['PUT'])
 def atualizar_casos_teste_batch():
-    """Atualiza múltiplos casos de teste de uma vez"""
+    """Atualiza múltiplos casos de teste de uma vez, em paralelo e com concorrência limitada"""
     try:
         dados = request.json
         casos_para_atualizar = dados.get('casos', [])
@@ -786,238 +1669,38 @@ def atualizar_casos_teste_batch():
         if not casos_para_atualizar:
             return jsonify({"erro": "Nenhum caso de teste fornecido para atualização"}), 400
         
-        resultados = []
-        sucessos = 0
-        erros = 0
+        # Concorrência configurável, limitada ao tamanho do pool de conexões do Jira
+        try:
+            concorrencia = int(dados.get('concorrencia') or JIRA_BATCH_CONCURRENCY)
+        except (TypeError, ValueError):
+            concorrencia = JIRA_BATCH_CONCURRENCY
+        concorrencia = max(1, min(concorrencia, JIRA_POOL_SIZE, len(casos_para_atualizar)))
         
-        for caso in casos_para_atualizar:
-            issue_key = caso.get('issue_key')
-            campos_alterados = caso.get('campos', {})
-            
-            if not issue_key or not campos_alterados:
-                erros += 1
-                resultados.append({
-                    "issue_key": issue_key,
-                    "status": "erro",
-                    "mensagem": "Dados inválidos"
-                })
-                continue
-            
-            try:
-                # Preparar payload para atualização
-                payload = {"fields": {}}
-                
-                # Mapear campos personalizados
-                if 'titulo' in campos_alterados:
-                    payload["fields"]["summary"] = campos_alterados['titulo']
-                
-                if 'status' in campos_alterados:
-                    payload["fields"]["status"] = {"name": campos_alterados['status']}
-                
-                if 'tipo_execucao' in campos_alterados:
-                    payload["fields"]["customfield_10062"] = {"value": campos_alterados['tipo_execucao']}
-                
-                if 'tipo_teste' in campos_alterados:
-                    payload["fields"]["customfield_10063"] = {"value": campos_alterados['tipo_teste']}
-                
-                if 'componentes' in campos_alterados:
-                    componentes = [{"name": comp.strip()} for comp in campos_alterados['componentes'].split(',') if comp.strip()]
-                    payload["fields"]["components"] = componentes
-                
-                if 'objetivo' in campos_alterados:
-                    # Atualizar campo customizado
-                    payload["fields"]["customfield_10066"] = {
-                        "type": "doc",
-                        "version": 1,
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": campos_alterados['objetivo'] or ""
-                                    }
-                                ]
-                            }
-                        ]
-                    }
-                    
-                    # Também atualizar a descrição principal para manter sincronização
-                    # Primeiro, buscar a descrição atual para preservar outros campos
-                    try:
-                        url_get = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}"
-                        response_get = requests.get(url_get, headers=HEADERS, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
-                        if response_get.status_code == 200:
-                            issue_data = response_get.json()
-                            descricao_atual = issue_data.get('fields', {}).get('description', {})
-                            
-                            # Extrair pré-condições e descrição BDD da descrição atual
-                            pre_condicoes_atual = ""
-                            descricao_bdd_atual = ""
-                            
-                            if descricao_atual and descricao_atual.get('content'):
-                                current_section = None
-                                for content in descricao_atual.get('content', []):
-                                    if content.get('type') == 'paragraph':
-                                        paragraph_text = ""
-                                        for para_content in content.get('content', []):
-                                            if para_content.get('type') == 'text':
-                                                paragraph_text += para_content.get('text', '')
-                                        
-                                        if 'Pré Condição:' in paragraph_text:
-                                            current_section = 'pre_condicoes'
-                                        elif paragraph_text.strip() and current_section == 'pre_condicoes':
-                                            pre_condicoes_atual = paragraph_text.strip()
-                                            current_section = None
-                                    elif content.get('type') == 'codeBlock':
-                                        for code_content in content.get('content', []):
-                                            if code_content.get('type') == 'text':
-                                                descricao_bdd_atual += code_content.get('text', '')
-                            
-                            # Criar nova descrição com objetivo atualizado
-                            payload["fields"]["description"] = {
-                                "type": "doc",
-                                "version": 1,
-                                "content": [
-                                    {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": "Objetivo:", "marks": [{"type": "strong"}]}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": campos_alterados['objetivo'] or ""}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": "Pré Condição:", "marks": [{"type": "strong"}]}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": pre_condicoes_atual}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
-                                    {
-                                        "type": "codeBlock",
-                                        "attrs": {"language": "gherkin"},
-                                        "content": [{"type": "text", "text": descricao_bdd_atual}]
-                                    }
-                                ]
-                            }
-                    except Exception as e:
-                        print(f"Erro ao sincronizar descrição: {e}")
-                        # Se não conseguir sincronizar, pelo menos atualizar o campo customizado
-                
-                if 'pre_condicoes' in campos_alterados:
-                    # Atualizar campo customizado
-                    payload["fields"]["customfield_10065"] = {
-                        "type": "doc",
-                        "version": 1,
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": campos_alterados['pre_condicoes'] or ""
-                                    }
-                                ]
-                            }
-                        ]
-                    }
-                    
-                    # Também atualizar a descrição principal para manter sincronização
-                    # Primeiro, buscar a descrição atual para preservar outros campos
-                    try:
-                        url_get = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}"
-                        response_get = requests.get(url_get, headers=HEADERS, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
-                        if response_get.status_code == 200:
-                            issue_data = response_get.json()
-                            descricao_atual = issue_data.get('fields', {}).get('description', {})
-                            
-                            # Extrair objetivo e descrição BDD da descrição atual
-                            objetivo_atual = ""
-                            descricao_bdd_atual = ""
-                            
-                            if descricao_atual and descricao_atual.get('content'):
-                                current_section = None
-                                for content in descricao_atual.get('content', []):
-                                    if content.get('type') == 'paragraph':
-                                        paragraph_text = ""
-                                        for para_content in content.get('content', []):
-                                            if para_content.get('type') == 'text':
-                                                paragraph_text += para_content.get('text', '')
-                                        
-                                        if 'Objetivo:' in paragraph_text:
-                                            current_section = 'objetivo'
-                                        elif paragraph_text.strip() and current_section == 'objetivo':
-                                            objetivo_atual = paragraph_text.strip()
-                                            current_section = None
-                                    elif content.get('type') == 'codeBlock':
-                                        for code_content in content.get('content', []):
-                                            if code_content.get('type') == 'text':
-                                                descricao_bdd_atual += code_content.get('text', '')
-                            
-                            # Criar nova descrição com pré-condições atualizadas
-                            payload["fields"]["description"] = {
-                                "type": "doc",
-                                "version": 1,
-                                "content": [
-                                    {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": "Objetivo:", "marks": [{"type": "strong"}]}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": objetivo_atual}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": "Pré Condição:", "marks": [{"type": "strong"}]}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": campos_alterados['pre_condicoes'] or ""}]},
-                                    {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
-                                    {
-                                        "type": "codeBlock",
-                                        "attrs": {"language": "gherkin"},
-                                        "content": [{"type": "text", "text": descricao_bdd_atual}]
-                                    }
-                                ]
-                            }
-                    except Exception as e:
-                        print(f"Erro ao sincronizar descrição: {e}")
-                        # Se não conseguir sincronizar, pelo menos atualizar o campo customizado
-                
-                if 'descricao' in campos_alterados:
-                    payload["fields"]["description"] = {
-                        "type": "doc",
-                        "version": 1,
-                        "content": [
-                            {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
-                            {"type": "paragraph", "content": [{"type": "text", "text": "Objetivo:", "marks": [{"type": "strong"}]}]},
-                            {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
-                            {"type": "paragraph", "content": [{"type": "text", "text": "Pré Condição:", "marks": [{"type": "strong"}]}]},
-                            {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
-                            {
-                                "type": "codeBlock",
-                                "attrs": {"language": "gherkin"},
-                                "content": [{"type": "text", "text": campos_alterados['descricao']}]
-                            }
-                        ]
-                    }
-                
-                # Fazer a requisição para atualizar
-                url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}"
-                response = requests.put(url, headers=HEADERS, json=payload, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
-                
-                if response.status_code == 204:
-                    sucessos += 1
-                    resultados.append({
-                        "issue_key": issue_key,
-                        "status": "sucesso",
-                        "mensagem": "Atualizado com sucesso"
-                    })
-                else:
-                    erros += 1
-                    resultados.append({
-                        "issue_key": issue_key,
-                        "status": "erro",
-                        "mensagem": f"Erro {response.status_code}: {response.text}"
-                    })
-                    
-            except Exception as e:
-                erros += 1
-                resultados.append({
-                    "issue_key": issue_key,
-                    "status": "erro",
-                    "mensagem": str(e)
-                })
+        inicio = time.perf_counter()
+        
+        # executor.map preserva a ordem original das linhas nos resultados
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            resultados = list(executor.map(atualizar_caso_teste_batch_item, casos_para_atualizar))
+        
+        tempo_total_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        sucessos = sum(1 for r in resultados if r["status"] == "sucesso")
+        erros = len(resultados) - sucessos
+        latencias = [r["latencia_ms"] for r in resultados]
+        
+        print(f"📦 Batch-update: {len(resultados)} casos em {tempo_total_ms} ms (concorrência {concorrencia})")
+        atualizar_espelho_apos_escrita([r["issue_key"] for r in resultados if r["status"] == "sucesso"])
         
         return jsonify({
             "mensagem": f"Processamento concluído. {sucessos} sucessos, {erros} erros.",
             "resultados": resultados,
             "sucessos": sucessos,
-            "erros": erros
+            "erros": erros,
+            "desempenho": {
+                "concorrencia": concorrencia,
+                "tempo_total_ms": tempo_total_ms,
+                "latencia_media_ms": round(sum(latencias) / len(latencias), 1),
+                "latencia_max_ms": max(latencias)
+            }
         })
         
     except Exception as e:
@@ -1025,10 +1708,9 @@ def atualizar_casos_teste_batch():
 
 def atribuir_responsavel(issue_key, account_id):
     """Atribui um responsável para a issue"""
-    url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}/assignee"
     payload = {"accountId": account_id}
     try:
-        response = requests.put(url, headers=HEADERS, json=payload, auth=(JIRA_EMAIL, JIRA_API_TOKEN))
+        response = jira_client.put(f"/rest/api/3/issue/{issue_key}/assignee", json=payload)
         return response.status_code == 204
     except:
         return False
@@ -1052,6 +1734,69 @@ def extrair_texto_descricao(descricao):
     
     return texto.strip()
 
+SECOES_DESCRICAO = {'objetivo', 'pre_condicoes', 'descricao'}
+
+def extrair_secoes_descricao(descricao):
+    """Extrai objetivo, pré-condições e descrição BDD da descrição ADF de um caso de teste"""
+    secoes = {'objetivo': "", 'pre_condicoes': "", 'descricao': ""}
+    if not descricao or not descricao.get('content'):
+        return secoes
+    
+    current_section = None
+    for content in descricao.get('content', []):
+        if content.get('type') == 'paragraph':
+            paragraph_text = ""
+            for para_content in content.get('content', []):
+                if para_content.get('type') == 'text':
+                    paragraph_text += para_content.get('text', '')
+            
+            if 'Objetivo:' in paragraph_text:
+                current_section = 'objetivo'
+            elif 'Pré Condição:' in paragraph_text:
+                current_section = 'pre_condicoes'
+            elif paragraph_text.strip() and current_section:
+                secoes[current_section] = paragraph_text.strip()
+                current_section = None
+        elif content.get('type') == 'codeBlock':
+            for code_content in content.get('content', []):
+                if code_content.get('type') == 'text':
+                    secoes['descricao'] += code_content.get('text', '')
+    
+    return secoes
+
+def montar_descricao_caso_teste(objetivo, pre_condicoes, descricao_bdd):
+    """Monta a descrição ADF padrão de um caso de teste (objetivo, pré-condição e bloco gherkin)"""
+    return {
+        "type": "doc",
+        "version": 1,
+        "content": [
+            {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
+            {"type": "paragraph", "content": [{"type": "text", "text": "Objetivo:", "marks": [{"type": "strong"}]}]},
+            {"type": "paragraph", "content": [{"type": "text", "text": objetivo}]},
+            {"type": "paragraph", "content": [{"type": "text", "text": "Pré Condição:", "marks": [{"type": "strong"}]}]},
+            {"type": "paragraph", "content": [{"type": "text", "text": pre_condicoes}]},
+            {"type": "paragraph", "content": [{"type": "text", "text": ""}]},
+            {
+                "type": "codeBlock",
+                "attrs": {"language": "gherkin"},
+                "content": [{"type": "text", "text": descricao_bdd}]
+            }
+        ]
+    }
+
+def montar_campo_texto(texto):
+    """Monta um campo customizado ADF de parágrafo único"""
+    return {
+        "type": "doc",
+        "version": 1,
+        "content": [
+            {
+                "type": "paragraph",
+                "content": [{"type": "text", "text": texto}]
+            }
+        ]
+    }
+
 def extrair_texto_campo(campo):
     """Extrai texto simples de campos customizados preservando quebras de linha"""
     if not campo or not campo.get("content"):
@@ -1084,9 +1829,75 @@ def planilha_manual():
 
 
 
+JIRA_BULK_TAMANHO = 50  # Limite de issues por requisição em /rest/api/3/issue/bulk
+COMPONENTES_VALIDOS = ["API", "Frontend", "Backend", "Mobile", "Web"]
+
+def montar_campos_caso_teste_planilha(caso, project_key):
+    """Monta os campos de criação de um caso de teste a partir de uma linha da planilha manual"""
+    campos = {
+        "project": {"key": project_key},
+        "summary": caso.get("titulo", ""),
+        "issuetype": {"name": "Caso de Teste"},
+        "description": montar_descricao_caso_teste(
+            caso.get("objetivo", ""),
+            caso.get("pre_condicoes", ""),
+            caso.get("descricao", "")
+        ),
+        "customfield_10062": {"value": caso.get("tipo_execucao") or "Automatizado"},
+        "customfield_10063": {"value": caso.get("tipo_teste") or "Funcional"},
+        "customfield_10066": montar_campo_texto(caso.get("objetivo", "")),
+        "customfield_10065": montar_campo_texto(caso.get("pre_condicoes", ""))
+    }
+    
+    componentes = caso.get("componentes", "")
+    if isinstance(componentes, str):
+        componentes = [c.strip() for c in componentes.split(',')]
+    componentes_validos = [c for c in componentes if c in COMPONENTES_VALIDOS]
+    if componentes_validos:
+        campos["components"] = [{"name": c} for c in componentes_validos]
+    
+    return campos
+
+def criar_issues_em_lote(lista_campos):
+    """Cria issues via POST /rest/api/3/issue/bulk.
+
+    Retorna uma lista alinhada com a entrada: para cada elemento, {"key": ...}
+    em caso de sucesso ou {"erro": ...} com a mensagem devolvida pelo Jira.
+    """
+    response = jira_client.post(
+        "/rest/api/3/issue/bulk",
+        json={"issueUpdates": [{"fields": campos} for campos in lista_campos]}
+    )
+    
+    try:
+        dados = response.json()
+    except ValueError:
+        dados = {}
+    
+    if response.status_code not in (200, 201, 400) or not dados:
+        erro = f"Erro {response.status_code}: {response.text}"
+        return [{"erro": erro} for _ in lista_campos]
+    
+    # Elementos com falha vêm indexados por failedElementNumber; os criados vêm em ordem
+    falhas = {}
+    for erro in dados.get("errors", []):
+        detalhes = erro.get("elementErrors", {})
+        mensagens = list(detalhes.get("errorMessages", [])) + [f"{campo}: {msg}" for campo, msg in detalhes.get("errors", {}).items()]
+        falhas[erro.get("failedElementNumber")] = "; ".join(mensagens) or f"Erro {erro.get('status')}"
+    
+    criadas = iter(dados.get("issues", []))
+    resultados = []
+    for indice in range(len(lista_campos)):
+        if indice in falhas:
+            resultados.append({"erro": falhas[indice]})
+        else:
+            issue = next(criadas, None)
+            resultados.append({"key": issue["key"]} if issue else {"erro": "Issue não retornada pelo Jira"})
+    return resultados
+
 @app.route('/api/exportar-planilha-manual', methods=['POST'])
 def exportar_planilha_manual():
-    """API para exportar dados da planilha manual para o Jira"""
+    """API para exportar dados da planilha manual para o Jira (criação em lote)"""
     try:
         data = request.get_json()
         issue_pai = data.get('issue_pai')
@@ -1105,38 +1916,69 @@ def exportar_planilha_manual():
             }), 400
         
         print(f"📤 Exportando {len(casos)} casos para issue pai: {issue_pai}")
+        inicio = time.perf_counter()
         
-        resultados = []
-        sucessos = 0
-        erros = 0
+        project_key, _ = obter_informacoes_issue(issue_pai)
+        if not project_key:
+            return jsonify({
+                'sucesso': False,
+                'erro': f'Issue pai {issue_pai} não encontrada ou inválida'
+            }), 400
         
-        for caso in casos:
-            try:
-                # Criar caso de teste no Jira
-                resultado = criar_caso_teste_planilha_manual(caso, issue_pai)
-                
-                if resultado.get('sucesso'):
-                    sucessos += 1
-                    resultados.append({
-                        'titulo': caso.get('titulo'),
-                        'jira_id': resultado.get('jira_id'),
-                        'created_at': resultado.get('created_at'),
-                        'updated_at': resultado.get('updated_at')
-                    })
-                else:
-                    erros += 1
-                    resultados.append({
-                        'titulo': caso.get('titulo'),
-                        'erro': resultado.get('erro', 'Erro desconhecido')
-                    })
-                    
-            except Exception as e:
-                erros += 1
-                print(f"❌ Erro ao criar caso '{caso.get('titulo')}': {e}")
-                resultados.append({
+        todos_tipos, _, _ = obter_tipos_issue_disponiveis(project_key)
+        if "Caso de Teste" not in todos_tipos:
+            return jsonify({
+                'sucesso': False,
+                'erro': f"Tipo 'Caso de Teste' não disponível no projeto {project_key}. Tipos disponíveis: {todos_tipos}"
+            }), 400
+        
+        account_id = obter_account_id()
+        
+        # 1. Criação em lotes de 50 (lotes enviados em paralelo)
+        lista_campos = [montar_campos_caso_teste_planilha(caso, project_key) for caso in casos]
+        lotes = [lista_campos[i:i + JIRA_BULK_TAMANHO] for i in range(0, len(lista_campos), JIRA_BULK_TAMANHO)]
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(JIRA_BATCH_CONCURRENCY, len(lotes)))) as executor:
+            criacoes = [item for resultado_lote in executor.map(criar_issues_em_lote, lotes) for item in resultado_lote]
+        
+        # 2. Links com a issue pai e atribuição do responsável, em paralelo
+        def vincular(issue_key):
+            link_criado = linkar_issue(issue_key, issue_pai)
+            if account_id:
+                atribuir_responsavel(issue_key, account_id)
+            return link_criado
+        
+        chaves_criadas = [criacao["key"] for criacao in criacoes if "key" in criacao]
+        with ThreadPoolExecutor(max_workers=max(1, min(JIRA_BATCH_CONCURRENCY, len(chaves_criadas) or 1))) as executor:
+            links = dict(zip(chaves_criadas, executor.map(vincular, chaves_criadas)))
+        
+        # 3. Resultados mapeados de volta para as linhas da planilha (mesma ordem)
+        agora = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        resultados = []
+        for linha, (caso, criacao) in enumerate(zip(casos, criacoes), start=1):
+            if "key" in criacao:
+                resultado = {
+                    'linha': linha,
                     'titulo': caso.get('titulo'),
-                    'erro': str(e)
-                })
+                    'jira_id': criacao["key"],
+                    'created_at': agora,
+                    'updated_at': agora
+                }
+                if not links.get(criacao["key"]):
+                    resultado['aviso'] = f'Não foi possível vincular a {issue_pai}'
+            else:
+                print(f"❌ Erro ao criar caso '{caso.get('titulo')}' (linha {linha}): {criacao['erro']}")
+                resultado = {
+                    'linha': linha,
+                    'titulo': caso.get('titulo'),
+                    'erro': criacao["erro"]
+                }
+            resultados.append(resultado)
+        
+        sucessos = len(chaves_criadas)
+        erros = len(casos) - sucessos
+        tempo_total_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        print(f"📦 Exportação em lote: {sucessos} criados, {erros} erros em {tempo_total_ms} ms ({len(lotes)} lote(s))")
         
         return jsonify({
             'sucesso': True,
@@ -1144,7 +1986,8 @@ def exportar_planilha_manual():
             'sucessos': sucessos,
             'erros': erros,
             'total': len(casos),
-            'resultados': resultados
+            'resultados': resultados,
+            'tempo_total_ms': tempo_total_ms
         })
         
     except Exception as e:
@@ -1154,81 +1997,437 @@ def exportar_planilha_manual():
             'erro': f'Erro interno: {str(e)}'
         }), 500
 
+CAMPOS_CASO_TESTE_EPICO = ["key", "summary", "status", "assignee", "customfield_10016", "issuelinks", "issuetype"]
 
+def planejar_consultas_jql(tipo, chaves, montar_condicao, filtro=None,
+                           max_chaves=JIRA_JQL_LOTE_CHAVES, max_caracteres=JIRA_JQL_LOTE_CARACTERES):
+    """Divide uma consulta sobre muitas chaves em JQLs limitados em chaves e caracteres.
 
+    `montar_condicao(lote)` gera a condição de um lote de chaves; `filtro` é combinado com AND.
+    """
+    consultas = []
+    lote = []
+    
+    def fechar():
+        condicao = montar_condicao(lote)
+        consultas.append({"tipo": tipo, "chaves": list(lote),
+                          "jql": f"{filtro} AND ({condicao})" if filtro else condicao})
+    
+    for chave in chaves:
+        if lote and (len(lote) >= max_chaves or len(montar_condicao(lote + [chave])) > max_caracteres):
+            fechar()
+            lote = []
+        lote.append(chave)
+    if lote:
+        fechar()
+    return consultas
 
+def executar_consultas_jql(consultas, fields, concorrencia=JIRA_SEARCH_CONCURRENCY, **extra):
+    """Executa os lotes em paralelo (cada um paginado) e junta as issues sem repetir chaves.
 
+    Retorna (issues, lotes) com a latência, o total e o eventual erro de cada lote; um lote com
+    erro não descarta os resultados dos demais.
+    """
+    def executar(consulta):
+        inicio = time.perf_counter()
+        try:
+            issues = jira_client.search_all(consulta["jql"], fields=fields, **extra)
+            erro = None
+        except Exception as e:
+            issues, erro = [], str(e)
+        return issues, {
+            "tipo": consulta["tipo"],
+            "chaves": len(consulta["chaves"]),
+            "issues": len(issues),
+            "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1),
+            "erro": erro
+        }
+    
+    if not consultas:
+        return [], []
+    with ThreadPoolExecutor(max_workers=max(1, min(concorrencia, JIRA_POOL_SIZE, len(consultas)))) as executor:
+        resultados = list(executor.map(executar, consultas))
+    
+    issues = {}
+    lotes = []
+    for indice, (encontradas, lote) in enumerate(resultados, start=1):
+        for issue in encontradas:
+            issues.setdefault(issue["key"], issue)
+        lotes.append({"lote": indice, **lote})
+    return list(issues.values()), lotes
 
+STATUS_CONCLUIDOS = ['Done', 'Resolved', 'Closed', 'CONCLUÍDO', 'Concluído']
+STATUS_EM_PROGRESSO = ['In Progress', 'Em Progresso', 'In Development']
+STATUS_IMPEDIMENTO = ['Blocked', 'Impedimento', 'On Hold']
+# Itens do changelog que (re)ligam uma issue ao épico
+CAMPOS_CHANGELOG_EPICO = ("Epic Link", "Parent", "IssueParentAssociation", "parent")
+FAIXAS_TEMPO_CICLO = (("1-3 dias", 3), ("4-7 dias", 7), ("8-14 dias", 14), ("15+ dias", None))
 
+def data_jira(texto):
+    """Data do Jira (ISO 8601, com fuso) como datetime; None se vazia ou inválida"""
+    if not texto:
+        return None
+    try:
+        return datetime.fromisoformat(texto.replace('Z', '+00:00'))
+    except (ValueError, TypeError):
+        return None
 
+def semana_iso(data):
+    return data.strftime('%G-S%V')
 
+class FatosIssuesEpico:
+    """Fatos derivados do changelog de cada issue de épico, guardados em SQLite.
 
+    Cada linha guarda o `updated` da issue quando foi processada: uma nova análise só busca o
+    changelog das issues cujo `updated` mudou. Issues que somem do épico ficam marcadas com a
+    data em que a saída foi percebida (alimenta os removidos da evolução do escopo).
+    """
+    
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._inicializado = False
+    
+    @contextmanager
+    def _conectar(self):
+        if not self._inicializado:
+            con = sqlite3.connect(self.caminho, timeout=30)
+            try:
+                con.execute("PRAGMA journal_mode=WAL")
+                con.execute("""
+                    CREATE TABLE IF NOT EXISTS fatos_issues (
+                        key TEXT PRIMARY KEY, epico TEXT NOT NULL, atualizado_em TEXT,
+                        fatos TEXT NOT NULL, removido_em TEXT
+                    )
+                """)
+                con.execute("CREATE INDEX IF NOT EXISTS idx_fatos_epico ON fatos_issues (epico)")
+                con.commit()
+            finally:
+                con.close()
+            self._inicializado = True
+        con = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+    
+    def do_epico(self, epico):
+        """{key: (atualizado_em, fatos, removido_em)} de todas as issues já vistas no épico"""
+        with self._conectar() as con:
+            linhas = con.execute("SELECT key, atualizado_em, fatos, removido_em FROM fatos_issues WHERE epico = ?", (epico,))
+            return {key: (atualizado_em, json.loads(fatos), removido_em) for key, atualizado_em, fatos, removido_em in linhas}
+    
+    def gravar(self, epico, itens):
+        """Grava (key, atualizado_em, fatos) das issues reprocessadas"""
+        with self._conectar() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO fatos_issues (key, epico, atualizado_em, fatos, removido_em) VALUES (?, ?, ?, ?, NULL)",
+                [(key, epico, atualizado_em, json.dumps(fatos)) for key, atualizado_em, fatos in itens]
+            )
+    
+    def marcar_removidas(self, epico, keys, quando):
+        with self._conectar() as con:
+            con.executemany("UPDATE fatos_issues SET removido_em = ? WHERE key = ? AND epico = ? AND removido_em IS NULL",
+                            [(quando, key, epico) for key in keys])
 
+fatos_issues_epico = FatosIssuesEpico(METRICAS_EPICO_DB)
 
+def changelog_completo(issue):
+    """Históricos da issue; quando o expand=changelog veio truncado, pagina /issue/{key}/changelog"""
+    changelog = issue.get('changelog') or {}
+    historicos = changelog.get('histories', [])
+    if changelog.get('total', len(historicos)) <= len(historicos):
+        return historicos
+    historicos = []
+    while True:
+        response = jira_client.get(f"/rest/api/3/issue/{issue['key']}/changelog",
+                                   params={"startAt": len(historicos), "maxResults": 100})
+        if response.status_code != 200:
+            raise JiraError(response.status_code, response.text)
+        pagina = response.json()
+        valores = pagina.get('values', [])
+        historicos.extend(valores)
+        if pagina.get('isLast', True) or not valores or len(historicos) >= pagina.get('total', 0):
+            return historicos
 
+def sprint_de_resolucao(sprints, resolvido):
+    """Sprint em que a issue foi resolvida: a que contém a data de resolução, senão a última da issue"""
+    sprints = [s for s in sprints or [] if isinstance(s, dict) and s.get('name')]
+    for sprint in sprints:
+        inicio = data_jira(sprint.get('startDate'))
+        fim = data_jira(sprint.get('completeDate') or sprint.get('endDate'))
+        if inicio and fim and inicio <= resolvido <= fim:
+            return sprint
+    return max(sprints, key=lambda s: s.get('startDate') or '') if sprints else None
 
+def extrair_fatos_issue(issue, historicos, epic_key, epic_id):
+    """Fatos de uma issue a partir do changelog: início do progresso, resolução, entrada no épico e sprint"""
+    fields = issue.get('fields', {})
+    em_progresso = {s.lower() for s in STATUS_EM_PROGRESSO}
+    concluidos = {s.lower() for s in STATUS_CONCLUIDOS}
+    criado = data_jira(fields.get('created'))
+    inicio_progresso = None
+    conclusao = None
+    adicionado = None
+    
+    for historico in sorted(historicos, key=lambda h: h.get('created', '')):
+        quando = data_jira(historico.get('created'))
+        for item in historico.get('items', []):
+            campo = item.get('field')
+            if campo == 'status':
+                destino = (item.get('toString') or '').lower()
+                if destino in em_progresso and inicio_progresso is None:
+                    inicio_progresso = quando
+                # Reaberturas descartam a conclusão anterior
+                conclusao = quando if destino in concluidos else None
+            elif campo in CAMPOS_CHANGELOG_EPICO and (item.get('toString') == epic_key or
+                                                      (epic_id and str(item.get('to')) == str(epic_id))):
+                adicionado = quando
+    
+    status = fields.get('status', {}).get('name')
+    concluida = (status or '').lower() in concluidos
+    resolvido = (data_jira(fields.get('resolutiondate')) or conclusao) if concluida else None
+    
+    periodo = None
+    if resolvido:
+        sprint = sprint_de_resolucao(fields.get(JIRA_CAMPO_SPRINT), resolvido)
+        if sprint:
+            periodo = {"nome": sprint['name'], "ordem": sprint.get('startDate') or resolvido.isoformat()}
+        else:
+            # Sem sprint: agrupa pela semana da resolução
+            periodo = {"nome": semana_iso(resolvido), "ordem": resolvido.isoformat()}
+    
+    def dias(inicio, fim):
+        return round((fim - inicio).total_seconds() / 86400, 2) if inicio and fim and fim >= inicio else None
+    
+    adicionado = adicionado or criado
+    return {
+        "status": status,
+        "concluida": concluida,
+        "story_points": fields.get('storypoints', 0) or 0,
+        "adicionado_em": adicionado.isoformat() if adicionado else None,
+        "inicio_progresso": inicio_progresso.isoformat() if inicio_progresso else None,
+        "resolvido_em": resolvido.isoformat() if resolvido else None,
+        "cycle_time_dias": dias(inicio_progresso, resolvido),
+        "lead_time_dias": dias(criado, resolvido),
+        "periodo_resolucao": periodo
+    }
 
+def atualizar_fatos_epico(epic_key, epic_id, issues):
+    """Reprocessa o changelog só das issues novas ou com `updated` diferente do guardado.
 
+    Retorna (fatos por key das issues atuais, lista de (fatos, removido_em) das que saíram, desempenho).
+    """
+    inicio = time.perf_counter()
+    guardados = fatos_issues_epico.do_epico(epic_key)
+    por_key = {issue['key']: issue for issue in issues}
+    pendentes = [key for key, issue in por_key.items()
+                 if key not in guardados or guardados[key][0] != issue['fields'].get('updated') or guardados[key][2]]
+    
+    lotes = []
+    paginados = 0
+    if pendentes:
+        consultas = planejar_consultas_jql("changelog", pendentes, lambda lote: f"key in ({', '.join(lote)})",
+                                           max_chaves=JIRA_SEARCH_PAGE_SIZE)
+        com_changelog, lotes = executar_consultas_jql(consultas, ["updated"], expand=["changelog"])
+        truncados = sum(1 for issue in com_changelog
+                        if (issue.get('changelog') or {}).get('total', 0) > len((issue.get('changelog') or {}).get('histories', [])))
+        with ThreadPoolExecutor(max_workers=max(1, min(JIRA_SEARCH_CONCURRENCY, JIRA_POOL_SIZE, truncados or 1))) as executor:
+            historicos = dict(zip([issue['key'] for issue in com_changelog], executor.map(changelog_completo, com_changelog)))
+        paginados = truncados
+        
+        # Guarda o `updated` da busca do épico: se a issue mudou no meio, é reprocessada na próxima análise
+        itens = [(key, por_key[key]['fields'].get('updated'), extrair_fatos_issue(por_key[key], historicos[key], epic_key, epic_id))
+                 for key in pendentes if key in historicos]
+        fatos_issues_epico.gravar(epic_key, itens)
+        guardados.update({key: (atualizado_em, fatos, None) for key, atualizado_em, fatos in itens})
+    
+    agora = datetime.now().astimezone().isoformat()
+    saidas = [key for key, (_, _, removido_em) in guardados.items() if key not in por_key and not removido_em]
+    if saidas:
+        fatos_issues_epico.marcar_removidas(epic_key, saidas, agora)
+        guardados.update({key: (guardados[key][0], guardados[key][1], agora) for key in saidas})
+    
+    fatos = {key: guardados[key][1] for key in por_key if key in guardados}
+    removidas = [(fatos_item, removido_em) for key, (_, fatos_item, removido_em) in guardados.items()
+                 if key not in por_key and removido_em]
+    desempenho = {
+        "issues": len(por_key),
+        "reprocessadas": len(pendentes),
+        "reaproveitadas": len(por_key) - len(pendentes),
+        "removidas_detectadas": len(saidas),
+        "consultas": len(lotes),
+        "changelogs_paginados": paginados,
+        "lotes_com_erro": sum(1 for lote in lotes if lote["erro"]),
+        "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+    }
+    return fatos, removidas, desempenho
 
+def agregar_metricas_epico(fatos, removidas):
+    """Evolução do escopo (por semana), velocidade por sprint de resolução e distribuição do cycle time"""
+    adicionados = defaultdict(int)
+    removidos = defaultdict(int)
+    for item in fatos.values():
+        data = data_jira(item.get("adicionado_em"))
+        if data:
+            adicionados[semana_iso(data)] += 1
+    for item, removido_em in removidas:
+        data = data_jira(removido_em)
+        if data:
+            removidos[semana_iso(data)] += 1
+    semanas = sorted(set(adicionados) | set(removidos))
+    
+    periodos = {}
+    for item in fatos.values():
+        periodo = item.get("periodo_resolucao")
+        if not periodo:
+            continue
+        atual = periodos.setdefault(periodo["nome"], {"ordem": periodo["ordem"], "velocidade": 0, "throughput": 0})
+        atual["ordem"] = min(atual["ordem"], periodo["ordem"])
+        atual["velocidade"] += item.get("story_points") or 0
+        atual["throughput"] += 1
+    nomes_periodos = sorted(periodos, key=lambda nome: periodos[nome]["ordem"])
+    
+    tempos_ciclo = [item["cycle_time_dias"] for item in fatos.values() if item.get("cycle_time_dias") is not None]
+    contagem_faixas = {faixa: 0 for faixa, _ in FAIXAS_TEMPO_CICLO}
+    for dias in tempos_ciclo:
+        for faixa, limite in FAIXAS_TEMPO_CICLO:
+            if limite is None or dias <= limite:
+                contagem_faixas[faixa] += 1
+                break
+    
+    return {
+        "evolucao_escopo": {
+            "labels": semanas,
+            "adicionados": [adicionados[semana] for semana in semanas],
+            "removidos": [removidos[semana] for semana in semanas]
+        },
+        "evolucao_velocidade": {
+            "labels": nomes_periodos,
+            "velocidade": [periodos[nome]["velocidade"] for nome in nomes_periodos],
+            "throughput": [periodos[nome]["throughput"] for nome in nomes_periodos]
+        },
+        "distribuicao_tempo": {
+            faixa: round(quantidade / len(tempos_ciclo) * 100, 2) if tempos_ciclo else 0
+            for faixa, quantidade in contagem_faixas.items()
+        },
+        "cycle_time_medio": round(sum(tempos_ciclo) / len(tempos_ciclo), 2) if tempos_ciclo else 0
+    }
 
+# Snapshot por épico: {"analise", "gerado_em", "tempo_ms"}; entradas expiradas continuam servindo
+# (stale-while-revalidate) até o recálculo em segundo plano terminar
+cache_analises_epico = CacheTTL("analises_epico", EPICO_SNAPSHOT_TTL)
+executor_analises_epico = ThreadPoolExecutor(max_workers=EPICO_SNAPSHOT_WORKERS, thread_name_prefix="analise_epico")
+atualizacoes_epico = {}
+erros_atualizacao_epico = {}
+atualizacoes_epico_lock = threading.Lock()
 
+def gerar_analise_epico(epic_key):
+    """Busca o épico e suas issues no Jira e calcula a análise detalhada"""
+    print(f"=== CALCULANDO ANÁLISE DETALHADA DO ÉPICO: {epic_key} ===")
+    
+    # Buscar o épico
+    epic_response = jira_client.get(f"/rest/api/3/issue/{epic_key}")
+    if epic_response.status_code != 200:
+        raise JiraError(404, f"Épico {epic_key} não encontrado")
+    
+    epic_data = epic_response.json()
+    epic_fields = epic_data.get('fields', {})
+    
+    # Buscar todas as issues do épico (incluindo sub-tarefas), com paginação completa
+    jql = f'"Epic Link" = {epic_key} OR parent = {epic_key}'
+    fields = [
+        "key", "summary", "status", "assignee", "reporter", 
+        "created", "updated", "resolutiondate", "timespent", 
+        "timeestimate", "timeoriginalestimate", "storypoints",
+        "issuetype", "priority", "components", "labels",
+        "worklog", "comment", "parent", "subtasks", "issuelinks", JIRA_CAMPO_SPRINT
+    ]
+    
+    try:
+        issues = jira_client.search_all(jql, fields=fields)
+    except JiraError as e:
+        print(f"Erro ao buscar issues do épico: {e}")
+        raise JiraError(500, "Erro ao buscar issues do épico")
+    
+    # Fatos do changelog (só das issues alteradas desde a última análise)
+    fatos, removidas, desempenho_historico = atualizar_fatos_epico(epic_key, epic_data.get('id'), issues)
+    
+    # Calcular análise detalhada
+    analise = calcular_analise_epico_detalhada(epic_fields, issues, fatos, removidas)
+    analise["desempenho"]["historico"] = desempenho_historico
+    return analise
 
+def atualizar_snapshot_epico(epic_key):
+    """Recalcula e guarda o snapshot do épico (executado no executor de análises)"""
+    try:
+        inicio = time.perf_counter()
+        analise = gerar_analise_epico(epic_key)
+        snapshot = {
+            "analise": analise,
+            "gerado_em": time.time(),
+            "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+        cache_analises_epico.definir(epic_key, snapshot)
+        erros_atualizacao_epico.pop(epic_key, None)
+        print(f"📸 Snapshot do épico {epic_key} atualizado em {snapshot['tempo_ms']} ms")
+        return snapshot
+    except Exception as e:
+        print(f"❌ Erro ao atualizar snapshot do épico {epic_key}: {e}")
+        erros_atualizacao_epico[epic_key] = e.texto if isinstance(e, JiraError) else str(e)
+        raise
+    finally:
+        with atualizacoes_epico_lock:
+            atualizacoes_epico.pop(epic_key, None)
 
-
-
-
+def agendar_atualizacao_epico(epic_key):
+    """Agenda o recálculo do snapshot; pedidos simultâneos do mesmo épico recebem o mesmo Future"""
+    with atualizacoes_epico_lock:
+        futuro = atualizacoes_epico.get(epic_key)
+        if futuro is None:
+            futuro = executor_analises_epico.submit(atualizar_snapshot_epico, epic_key)
+            atualizacoes_epico[epic_key] = futuro
+        return futuro
 
 @app.route('/api/analise-epico-detalhada/<epic_key>')
 def obter_analise_epico_detalhada(epic_key):
-    """Obtém análise detalhada de um épico com métricas avançadas"""
+    """Obtém análise detalhada de um épico com métricas avançadas.
+
+    Responde com o snapshot guardado (e sua idade); se passou do EPICO_SNAPSHOT_TTL, dispara o
+    recálculo em segundo plano. Com forcar=true espera um snapshot novo.
+    """
     try:
-        print(f"=== OBTENDO ANÁLISE DETALHADA DO ÉPICO: {epic_key} ===")
-        
         if not all([JIRA_BASE_URL, JIRA_EMAIL, JIRA_API_TOKEN]):
             return jsonify({"erro": "Configurações do Jira incompletas"}), 500
         
-        # Buscar o épico
-        epic_url = f"{JIRA_BASE_URL}/rest/api/3/issue/{epic_key}"
-        headers = {
-            "Accept": "application/json",
-            "Authorization": f"Basic {base64.b64encode(f'{JIRA_EMAIL}:{JIRA_API_TOKEN}'.encode()).decode()}"
-        }
-        
-        epic_response = requests.get(epic_url, headers=headers)
-        if epic_response.status_code != 200:
-            return jsonify({"erro": f"Épico {epic_key} não encontrado"}), 404
-        
-        epic_data = epic_response.json()
-        epic_fields = epic_data.get('fields', {})
-        
-        # Buscar todas as issues do épico (incluindo sub-tarefas)
-        jql = f'"Epic Link" = {epic_key} OR parent = {epic_key}'
-        search_url = f"{JIRA_BASE_URL}/rest/api/3/search"
-        
-        search_payload = {
-            "jql": jql,
-            "maxResults": 1000,
-            "fields": [
-                "key", "summary", "status", "assignee", "reporter", 
-                "created", "updated", "resolutiondate", "timespent", 
-                "timeestimate", "timeoriginalestimate", "storypoints",
-                "issuetype", "priority", "components", "labels",
-                "worklog", "comment", "parent", "subtasks", "issuelinks"
-            ]
+        forcar = request.args.get('forcar', '').lower() in ('1', 'true', 'sim')
+        entrada = cache_analises_epico.obter(epic_key)
+        if entrada is None or forcar:
+            snapshot = agendar_atualizacao_epico(epic_key).result()
+            origem = "calculado"
+        else:
+            snapshot = entrada.valor
+            origem = "cache"
+            if not entrada.fresca():
+                agendar_atualizacao_epico(epic_key)
+                origem = "cache_expirado"
+        
+        with atualizacoes_epico_lock:
+            atualizando = epic_key in atualizacoes_epico
+        analise = dict(snapshot["analise"])
+        analise["snapshot"] = {
+            "origem": origem,
+            "gerado_em": datetime.fromtimestamp(snapshot["gerado_em"]).isoformat(),
+            "idade_segundos": round(time.time() - snapshot["gerado_em"], 1),
+            "ttl_segundos": EPICO_SNAPSHOT_TTL,
+            "tempo_calculo_ms": snapshot["tempo_ms"],
+            "atualizando": atualizando,
+            "erro_ultima_atualizacao": erros_atualizacao_epico.get(epic_key)
         }
-        
-        search_response = requests.post(search_url, headers=headers, json=search_payload)
-        if search_response.status_code != 200:
-            return jsonify({"erro": "Erro ao buscar issues do épico"}), 500
-        
-        issues_data = search_response.json()
-        issues = issues_data.get('issues', [])
-        
-        # Calcular análise detalhada
-        analise = calcular_analise_epico_detalhada(epic_fields, issues)
-        
         return jsonify(analise)
         
+    except JiraError as e:
+        return jsonify({"erro": e.texto}), (404 if e.status_code == 404 else 500)
     except Exception as e:
         print(f"Erro ao obter análise detalhada do épico: {str(e)}")
         import traceback
@@ -1236,8 +2435,8 @@ def obter_analise_epico_detalhada(epic_key):
         traceback.print_exc()
         return jsonify({"erro": str(e)}), 500
 
-def calcular_analise_epico_detalhada(epic_fields, issues):
-    """Calcula análise detalhada do épico com métricas avançadas"""
+def calcular_analise_epico_detalhada(epic_fields, issues, fatos=None, removidas=()):
+    """Calcula análise detalhada do épico com métricas avançadas (históricas a partir dos fatos do changelog)"""
     
     try:
         print(f"Processando análise detalhada de {len(issues)} issues")
@@ -1250,9 +2449,9 @@ def calcular_analise_epico_detalhada(epic_fields, issues):
         
         # 2. Breakdown por status
         status_breakdown = {}
-        status_concluidos = ['Done', 'Resolved', 'Closed', 'CONCLUÍDO', 'Concluído']
-        status_em_progresso = ['In Progress', 'Em Progresso', 'In Development']
-        status_impedimento = ['Blocked', 'Impedimento', 'On Hold']
+        status_concluidos = STATUS_CONCLUIDOS
+        status_em_progresso = STATUS_EM_PROGRESSO
+        status_impedimento = STATUS_IMPEDIMENTO
         
         for issue in issues:
             status = issue['fields'].get('status', {}).get('name')
@@ -1306,10 +2505,6 @@ def calcular_analise_epico_detalhada(epic_fields, issues):
         # 5. Casos de Teste
         casos_teste = []
         casos_teste_keys = set()  # Para evitar duplicações
-        headers = {
-            "Accept": "application/json",
-            "Authorization": f"Basic {base64.b64encode(f'{JIRA_EMAIL}:{JIRA_API_TOKEN}'.encode()).decode()}"
-        }
         
         print(f"Buscando casos de teste para {len(issues)} issues...")
         
@@ -1324,7 +2519,8 @@ def calcular_analise_epico_detalhada(epic_fields, issues):
                     status_geral = test_case['fields'].get('status', {}).get('name', '')
                     
                     # Obter status específico de execução do teste
-                    test_execution_status = test_case['fields'].get('customfield_10016', {}).get('value', '')
+                    campo_execucao = test_case['fields'].get('customfield_10016')
+                    test_execution_status = campo_execucao.get('value', '') if isinstance(campo_execucao, dict) else ''
                     
                     # Determinar status de teste baseado na lógica do Jira
                     if test_execution_status:
@@ -1357,85 +2553,51 @@ def calcular_analise_epico_detalhada(epic_fields, issues):
                     return True
             return False
         
-        # Buscar todos os casos de teste de uma vez - estratégia mais abrangente
-        all_test_cases_jql = f'issuetype = "Test" AND ('
-        issue_conditions = []
-        for issue in issues:
-            issue_key = issue['key']
-            # Buscar casos de teste vinculados, sub-tarefas e relacionados
-            issue_conditions.append(f'issue in linkedIssues({issue_key}) OR parent = {issue_key}')
-        all_test_cases_jql += ' OR '.join(issue_conditions) + ')'
-        
-        test_search_url = f"{JIRA_BASE_URL}/rest/api/3/search"
-        test_payload = {
-            "jql": all_test_cases_jql,
-            "maxResults": 500,  # Aumentado para capturar mais casos
-            "fields": ["key", "summary", "status", "assignee", "customfield_10016", "issuelinks", "issuetype"]
+        # Casos de teste em lotes paralelos: sub-tarefas de teste (parent in) e issues vinculadas,
+        # filtradas depois pelo tipo ou pelo resumo
+        inicio_busca = time.perf_counter()
+        chaves_issues = [issue['key'] for issue in issues]
+        consultas = planejar_consultas_jql("subtarefas", chaves_issues,
+                                           lambda lote: f"parent in ({', '.join(lote)})", filtro='issuetype = "Test"')
+        consultas += planejar_consultas_jql("vinculadas", chaves_issues,
+                                            lambda lote: " OR ".join(f"issue in linkedIssues({key})" for key in lote))
+        test_issues, lotes = executar_consultas_jql(consultas, CAMPOS_CASO_TESTE_EPICO)
+        
+        for test_case in test_issues:
+            if not test_case or not test_case.get('fields'):
+                continue
+            issue_type = test_case['fields'].get('issuetype', {}).get('name', '')
+            summary = test_case['fields'].get('summary', '')
+            
+            # Verificar se é um caso de teste
+            if (issue_type.lower() == 'test' or
+                'test' in summary.lower() or
+                'caso de teste' in summary.lower() or
+                'test case' in summary.lower()):
+                adicionar_caso_teste(test_case)
+        
+        lotes_com_erro = sum(1 for lote in lotes if lote["erro"])
+        if lotes_com_erro:
+            print(f"⚠️ {lotes_com_erro} de {len(lotes)} lote(s) de casos de teste falharam; resultado parcial")
+        desempenho_casos_teste = {
+            "consultas": len(lotes),
+            "lotes_com_erro": lotes_com_erro,
+            "issues_retornadas": len(test_issues),
+            "tempo_total_ms": round((time.perf_counter() - inicio_busca) * 1000, 1),
+            "lotes": lotes
         }
         
-        try:
-            # Busca principal: casos de teste vinculados e sub-tarefas
-            test_response = requests.post(test_search_url, headers=headers, json=test_payload)
-            if test_response.status_code == 200:
-                test_data = test_response.json()
-                test_issues = test_data.get('issues', [])
-                print(f"Encontrados {len(test_issues)} casos de teste na busca principal")
-                
-                # Processar casos de teste encontrados
-                for test_case in test_issues:
-                    adicionar_caso_teste(test_case)
-                
-                # Busca adicional: todos os issues vinculados para filtrar casos de teste
-                print(f"Fazendo busca adicional para capturar todos os casos de teste...")
-                all_linked_conditions = []
-                for issue in issues:
-                    issue_key = issue['key']
-                    all_linked_conditions.append(f'issue in linkedIssues({issue_key})')
-                all_linked_jql = ' OR '.join(all_linked_conditions)
-                all_linked_payload = {
-                    "jql": all_linked_jql,
-                    "maxResults": 200,
-                    "fields": ["key", "summary", "status", "assignee", "issuetype", "customfield_10016"]
-                }
-                
-                all_linked_response = requests.post(test_search_url, headers=headers, json=all_linked_payload)
-                if all_linked_response.status_code == 200:
-                    all_linked_data = all_linked_response.json()
-                    all_linked_issues = all_linked_data.get('issues', [])
-                    print(f"Encontrados {len(all_linked_issues)} issues vinculados na busca adicional")
-                    
-                    # Filtrar apenas issues de teste
-                    for linked_issue in all_linked_issues:
-                        if linked_issue and linked_issue.get('fields'):
-                            issue_type = linked_issue['fields'].get('issuetype', {}).get('name', '')
-                            summary = linked_issue['fields'].get('summary', '')
-                            
-                            # Verificar se é um caso de teste
-                            if (issue_type.lower() == 'test' or 
-                                'test' in summary.lower() or 
-                                'caso de teste' in summary.lower() or
-                                'test case' in summary.lower()):
-                                adicionar_caso_teste(linked_issue)
-                
-                print(f"Total de casos de teste únicos encontrados: {len(casos_teste)}")
-                
-            else:
-                print(f"Erro na busca de casos de teste: {test_response.status_code}")
-        except Exception as e:
-            print(f"Erro ao buscar casos de teste: {e}")
-        
         print(f"Total de casos de teste encontrados: {len(casos_teste)}")
         
-        # 6. Evolução do Escopo (simulado - seria necessário histórico)
-        evolucao_escopo = {
-            'labels': ['Sprint 1', 'Sprint 2', 'Sprint 3', 'Sprint 4'],
-            'adicionados': [5, 3, 2, 1],
-            'removidos': [0, 1, 0, 0]
-        }
+        # 6. Evolução do escopo, velocidade e cycle time a partir do changelog
+        historico = agregar_metricas_epico(fatos or {}, removidas)
+        evolucao_escopo = historico['evolucao_escopo']
+        evolucao_velocidade = historico['evolucao_velocidade']
+        distribuicao_tempo = historico['distribuicao_tempo']
+        cycle_time_medio = historico['cycle_time_medio']
         
-        # 7. Velocidade e Tempo
+        # 7. Lead time
         lead_times = []
-        cycle_times = []
         
         for issue in issues:
             if issue['fields'].get('status', {}).get('name') in status_concluidos:
@@ -1450,22 +2612,7 @@ def calcular_analise_epico_detalhada(epic_fields, issues):
                     continue
         
         lead_time_medio = round(sum(lead_times) / len(lead_times), 2) if lead_times else 0
-        cycle_time_medio = round(sum(cycle_times) / len(cycle_times), 2) if cycle_times else 0
-        
-        # Velocidade simulada
-        evolucao_velocidade = {
-            'labels': ['Sprint 1', 'Sprint 2', 'Sprint 3', 'Sprint 4'],
-            'velocidade': [8, 12, 10, 15],
-            'throughput': [5, 8, 6, 10]
-        }
-        
-        # Distribuição de tempo
-        distribuicao_tempo = {
-            '1-3 dias': 30,
-            '4-7 dias': 45,
-            '8-14 dias': 20,
-            '15+ dias': 5
-        }
+        sprints_resolucao = len(evolucao_velocidade['labels'])
         
         return {
             "resumo": {
@@ -1483,14 +2630,18 @@ def calcular_analise_epico_detalhada(epic_fields, issues):
             },
             "breakdown_status": status_breakdown,
             "casos_teste": casos_teste,
+            "casos_teste_completo": lotes_com_erro == 0,
             "evolucao_escopo": evolucao_escopo,
             "evolucao_velocidade": evolucao_velocidade,
             "distribuicao_tempo": distribuicao_tempo,
             "tempo_analise": {
                 "lead_time_medio": lead_time_medio,
                 "cycle_time_medio": cycle_time_medio,
-                "velocidade_sprint": round(story_points_concluido / 4, 2),  # Assumindo 4 sprints
-                "throughput_sprint": round(concluido_count / 4, 2)
+                "velocidade_sprint": round(sum(evolucao_velocidade['velocidade']) / sprints_resolucao, 2) if sprints_resolucao else 0,
+                "throughput_sprint": round(sum(evolucao_velocidade['throughput']) / sprints_resolucao, 2) if sprints_resolucao else 0
+            },
+            "desempenho": {
+                "casos_teste": desempenho_casos_teste
             }
         }
         
@@ -1514,10 +2665,203 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
 import base64
+import uuid
+
+REGEX_WORKSPACE_ID = re.compile(r'^[0-9a-f]{32}$')
+coletor_workspaces = None
+coletor_workspaces_lock = threading.Lock()
+
+def caminho_workspace(workspace_id):
+    """Diretório de um workspace de evidências (contém o log enviado, falhas/ e sucessos/)"""
+    return os.path.join(os.path.abspath(EVIDENCIAS_WORKSPACES_DIR), workspace_id)
+
+def criar_workspace_evidencias():
+    """Cria um workspace isolado para um upload e retorna (id, diretório)"""
+    workspace_id = uuid.uuid4().hex
+    base_dir = caminho_workspace(workspace_id)
+    os.makedirs(os.path.join(base_dir, 'falhas'))
+    os.makedirs(os.path.join(base_dir, 'sucessos'))
+    iniciar_coletor_workspaces()
+    return workspace_id, base_dir
+
+def resolver_workspace_evidencias(workspace_id):
+    """Diretório base das evidências de um workspace (renovando seu prazo de expiração).
+
+    Sem id, usa o prints_tests/ compartilhado das versões anteriores; retorna None se o id for
+    inválido ou o workspace já tiver sido coletado.
+    """
+    if not workspace_id:
+        return os.path.join(os.getcwd(), 'prints_tests')
+    if not REGEX_WORKSPACE_ID.match(workspace_id):
+        return None
+    base_dir = caminho_workspace(workspace_id)
+    try:
+        os.utime(base_dir)
+    except OSError:
+        return None
+    return base_dir
+
+def workspace_em_uso(workspace_id):
+    """Workspaces com job pendente ou em processamento nunca são coletados nem limpos"""
+    with jobs_evidencias_lock:
+        job = jobs_evidencias.get(workspace_id)
+    return job is not None and job.status in ("pendente", "processando")
+
+def coletar_workspaces_expirados(agora=None):
+    """Remove os workspaces sem acesso há mais de EVIDENCIAS_WORKSPACE_TTL segundos; retorna quantos"""
+    import shutil
+    
+    raiz = os.path.abspath(EVIDENCIAS_WORKSPACES_DIR)
+    limite = (agora or time.time()) - EVIDENCIAS_WORKSPACE_TTL
+    removidos = 0
+    try:
+        entradas = list(os.scandir(raiz))
+    except FileNotFoundError:
+        return 0
+    for entrada in entradas:
+        if not entrada.is_dir() or not REGEX_WORKSPACE_ID.match(entrada.name):
+            continue
+        try:
+            if entrada.stat().st_mtime >= limite or workspace_em_uso(entrada.name):
+                continue
+            shutil.rmtree(entrada.path)
+            removidos += 1
+        except OSError as e:
+            print(f"⚠️ Erro ao remover workspace {entrada.name}: {e}")
+    if removidos:
+        print(f"🧹 {removidos} workspace(s) de evidências expirado(s) removido(s)")
+    return removidos
+
+def iniciar_coletor_workspaces():
+    """Sobe (uma vez por processo) a thread que coleta periodicamente os workspaces expirados"""
+    global coletor_workspaces
+    with coletor_workspaces_lock:
+        if coletor_workspaces is not None:
+            return
+        
+        def executar():
+            while True:
+                try:
+                    coletar_workspaces_expirados()
+                    podar_cache_arquivos(EVIDENCIAS_MINIATURAS_DIR, EVIDENCIAS_MINIATURAS_MAX, ('.webp', '.jpg'))
+                except Exception as e:
+                    print(f"⚠️ Erro na coleta de workspaces: {e}")
+                time.sleep(EVIDENCIAS_WORKSPACE_GC_INTERVALO)
+        
+        coletor_workspaces = threading.Thread(target=executar, name="coletor-workspaces", daemon=True)
+        coletor_workspaces.start()
+
+class JobEvidencias:
+    """Job de processamento de evidências executado em segundo plano, com progresso consultável"""
+
+    def __init__(self, log_path, tipo="log_html", workspace_id=None):
+        # O id do job é o do workspace: status, lista, envio e imagens são consultados por ele
+        self.id = workspace_id or uuid.uuid4().hex
+        self.workspace_id = workspace_id
+        self.base_dir = caminho_workspace(workspace_id) if workspace_id else None
+        self.log_path = log_path
+        self.tipo = tipo
+        self.status = "pendente"
+        self.criado_em = time.time()
+        self.iniciado_em = None
+        self.concluido_em = None
+        self.elementos_encontrados = 0
+        self.elementos_processados = 0
+        self.resultado = None
+        self.erro = None
+        self._lock = threading.Lock()
+
+    def progresso(self, encontrados=None, processados=None):
+        """Callback repassado aos processadores para relatar o avanço"""
+        with self._lock:
+            if encontrados is not None:
+                self.elementos_encontrados = encontrados
+            if processados is not None:
+                self.elementos_processados = processados
+
+    def executar(self):
+        with self._lock:
+            self.status = "processando"
+            self.iniciado_em = time.time()
+        try:
+            # Limpar evidências anteriores antes do processamento
+            limpar_evidencias_anteriores(self.base_dir)
+            if self.tipo == "output_xml":
+                resultado = processar_output_xml(self.log_path, progresso=self.progresso, base_dir=self.base_dir)
+            else:
+                resultado = processar_evidencias_hibrido(self.log_path, progresso=self.progresso, base_dir=self.base_dir)
+            with self._lock:
+                if resultado['sucesso']:
+                    self.status = "concluido"
+                    self.resultado = resultado
+                    self.elementos_processados = self.elementos_encontrados
+                else:
+                    self.status = "erro"
+                    self.erro = resultado.get('erro', 'Erro desconhecido')
+        except Exception as e:
+            print(f"❌ Erro no job de evidências {self.id}: {e}")
+            with self._lock:
+                self.status = "erro"
+                self.erro = str(e)
+        finally:
+            with self._lock:
+                self.concluido_em = time.time()
+            try:
+                os.remove(self.log_path)
+            except OSError:
+                pass
+            if self.base_dir:
+                # O prazo de expiração do workspace conta a partir do fim do processamento
+                try:
+                    os.utime(self.base_dir)
+                except OSError:
+                    pass
+
+    def to_dict(self):
+        with self._lock:
+            dados = {
+                "job_id": self.id,
+                "workspace_id": self.workspace_id,
+                "tipo": self.tipo,
+                "status": self.status,
+                "elementos_encontrados": self.elementos_encontrados,
+                "elementos_processados": self.elementos_processados,
+                "percentual": round(self.elementos_processados / self.elementos_encontrados * 100, 1) if self.elementos_encontrados else 0,
+                "eta_segundos": None,
+                "criado_em": datetime.fromtimestamp(self.criado_em).isoformat()
+            }
+            if self.iniciado_em:
+                fim = self.concluido_em or time.time()
+                dados["tempo_decorrido_segundos"] = round(fim - self.iniciado_em, 1)
+                if self.status == "processando" and self.elementos_processados:
+                    restantes = max(self.elementos_encontrados - self.elementos_processados, 0)
+                    por_elemento = (fim - self.iniciado_em) / self.elementos_processados
+                    dados["eta_segundos"] = round(restantes * por_elemento, 1)
+            if self.status == "concluido":
+                dados["sucesso"] = True
+                dados["estatisticas"] = self.resultado['estatisticas']
+                dados["nomes_evidencias"] = self.resultado['nomes_evidencias']
+            elif self.status == "erro":
+                dados["sucesso"] = False
+                dados["erro"] = self.erro
+            return dados
+
+
+executor_evidencias = ThreadPoolExecutor(max_workers=EVIDENCIAS_WORKERS, thread_name_prefix="evidencias")
+jobs_evidencias = {}
+jobs_evidencias_lock = threading.Lock()
+
+def registrar_job_evidencias(job):
+    """Registra um job e descarta os jobs finalizados há mais tempo que a retenção"""
+    limite = time.time() - EVIDENCIAS_JOBS_RETENCAO
+    with jobs_evidencias_lock:
+        for job_id in [j.id for j in jobs_evidencias.values() if j.concluido_em and j.concluido_em < limite]:
+            del jobs_evidencias[job_id]
+        jobs_evidencias[job.id] = job
 
 @app.route('/api/evidencias/upload', methods=['POST'])
 def upload_evidencias():
-    """Upload de arquivo log.html para processamento de evidências"""
+    """Upload de log.html ou output.xml (opcionalmente .gz): enfileira o processamento e retorna o id do job"""
     try:
         if 'log_file' not in request.files:
             return jsonify({"erro": "Nenhum arquivo enviado"}), 400
@@ -1526,118 +2870,347 @@ def upload_evidencias():
         if file.filename == '':
             return jsonify({"erro": "Nenhum arquivo selecionado"}), 400
         
-        if not file.filename.endswith('.html'):
-            return jsonify({"erro": "Apenas arquivos HTML são aceitos"}), 400
+        nome_arquivo = file.filename.lower()
+        if nome_arquivo.endswith('.html'):
+            tipo, extensao = "log_html", ".html"
+        elif nome_arquivo.endswith(('.xml', '.xml.gz')):
+            tipo, extensao = "output_xml", ".xml.gz" if nome_arquivo.endswith('.gz') else ".xml"
+        else:
+            return jsonify({"erro": "Apenas arquivos log.html ou output.xml (.xml/.xml.gz) são aceitos"}), 400
         
-        # Salvar arquivo temporariamente
-        log_path = os.path.join(os.getcwd(), 'log.html')
+        # Cada upload ganha um workspace próprio (log, falhas/ e sucessos/), isolado dos demais
+        workspace_id, base_dir = criar_workspace_evidencias()
+        log_path = os.path.join(base_dir, f'log{extensao}')
         file.save(log_path)
         
-        # Limpar evidências anteriores antes do processamento
-        limpar_evidencias_anteriores()
+        job = JobEvidencias(log_path, tipo=tipo, workspace_id=workspace_id)
+        registrar_job_evidencias(job)
+        executor_evidencias.submit(job.executar)
+        print(f"📥 Job de evidências {job.id} enfileirado")
         
-        # Processar o arquivo HTML usando método híbrido
-        resultado = processar_evidencias_hibrido(log_path)
-        
-        if resultado['sucesso']:
-            return jsonify({
-                "sucesso": True,
-                "mensagem": "Evidências processadas com sucesso",
-                "estatisticas": resultado['estatisticas'],
-                "nomes_evidencias": resultado['nomes_evidencias']
-            })
-        else:
-            return jsonify({"erro": resultado['erro']}), 500
+        return jsonify({
+            "sucesso": True,
+            "mensagem": "Processamento de evidências iniciado",
+            "tipo": tipo,
+            "job_id": job.id,
+            "workspace_id": workspace_id,
+            "status_url": f"/api/evidencias/jobs/{job.id}"
+        }), 202
             
     except Exception as e:
         print(f"Erro no upload de evidências: {str(e)}")
         return jsonify({"erro": str(e)}), 500
 
+@app.route('/api/evidencias/jobs/<job_id>')
+def status_job_evidencias(job_id):
+    """Progresso de um job de processamento de evidências (e resultado final quando concluído)"""
+    with jobs_evidencias_lock:
+        job = jobs_evidencias.get(job_id)
+    if not job:
+        return jsonify({"erro": "Job não encontrado"}), 404
+    return jsonify(job.to_dict())
+
+class ClassificadorEvidencias:
+    """Extrai código do card e status (sucesso/falha) de um elemento de teste com padrões pré-compilados.
+
+    O código sai de uma única regex com grupos nomeados em ordem de prioridade (prefixos do projeto,
+    PROJ-123, X-1, PROJ123); as palavras-chave e ícones de status viram uma só alternância de literais,
+    varrida uma vez sobre o texto em minúsculas. As regras são as da cascata antiga: classes CSS e
+    ícones decidem antes das palavras, e sucesso prevalece sobre falha.
+    """
+    
+    GRUPOS_CODIGO = ('projeto', 'hifen', 'letra', 'compacto')
+    PALAVRAS_SUCESSO = ['pass', 'success', 'sucesso', 'ok']
+    PALAVRAS_FALHA = ['fail', 'falha', 'erro', 'exception', 'timeout']
+    ICONES_SUCESSO = ['✅', '✓']
+    ICONES_FALHA = ['❌', '✗']
+    
+    def __init__(self, prefixos=(), palavras_sucesso=(), palavras_falha=()):
+        self.prefixos = [p.strip().upper() for p in prefixos if p.strip()]
+        self.palavras_sucesso = self.PALAVRAS_SUCESSO + [p.strip().lower() for p in palavras_sucesso if p.strip()]
+        self.palavras_falha = self.PALAVRAS_FALHA + [p.strip().lower() for p in palavras_falha if p.strip()]
+        
+        def alternativas(itens):
+            # Mais longas primeiro para a alternância não parar num prefixo
+            return '|'.join(re.escape(item) for item in sorted(set(itens), key=len, reverse=True))
+        
+        codigos = []
+        if self.prefixos:
+            codigos.append(rf'(?P<projeto>\b(?:{alternativas(self.prefixos)})-\d+)')
+        codigos += [
+            r'(?P<hifen>[A-Z]{2,7}-\d+)',  # PROJ-123, CREDT-456, FEATURE-202
+            r'(?P<letra>[A-Z]-\d+)',       # X-123
+            r'(?P<compacto>[A-Z]{2,4}\d+)'  # PROJ123, CREDT456 (sem hífen)
+        ]
+        self._regex_codigo = re.compile('|'.join(codigos), re.I)
+        self._regex_projeto = re.compile(codigos[0], re.I) if self.prefixos else None
+        self._regex_hifen = re.compile(r'[A-Z]{2,7}-\d+|[A-Z]-\d+', re.I)
+        self._melhor_grupo = self.GRUPOS_CODIGO[0] if self.prefixos else 'hifen'
+        
+        # Literal -> categoria (sucesso prevalece se a mesma palavra estiver nas duas listas)
+        self._categorias = {}
+        for itens, categoria in ((self.palavras_falha, 'palavra_falha'), (self.palavras_sucesso, 'palavra_sucesso'),
+                                 (self.ICONES_FALHA, 'icone_falha'), (self.ICONES_SUCESSO, 'icone_sucesso')):
+            for item in itens:
+                self._categorias[item] = categoria
+        self._regex_status = re.compile(alternativas(self._categorias))
+    
+    def codigo_projeto(self, texto):
+        """Primeira chave com um dos prefixos configurados para o projeto (ex.: TLD-123)"""
+        if not self._regex_projeto or not texto:
+            return None
+        match = self._regex_projeto.search(texto)
+        return match.group(0).upper() if match else None
+    
+    def extrair_codigo(self, texto, compacto=True, nome_fallback=True):
+        """Código do card no texto, com a mesma prioridade da cascata de padrões"""
+        if not texto:
+            return None
+        if not compacto:
+            codigo = self.codigo_projeto(texto)
+            if codigo:
+                return codigo
+            match = self._regex_hifen.search(texto)
+            return match.group(0).upper() if match else None
+        
+        # Uma varredura: guarda a primeira ocorrência de cada grupo e para no de maior prioridade
+        codigos = {}
+        for match in self._regex_codigo.finditer(texto):
+            grupo = match.lastgroup
+            codigos.setdefault(grupo, match.group(grupo))
+            if grupo == self._melhor_grupo:
+                break
+        for grupo in self.GRUPOS_CODIGO:
+            if grupo in codigos:
+                return codigos[grupo].upper()
+        
+        if not nome_fallback:
+            return None
+        # Sem código: montar um a partir das duas primeiras palavras do texto
+        palavras = re.sub(r'[^\w\s-]', '', texto).split()
+        if len(palavras) >= 2:
+            return f"{palavras[0][:3].upper()}-{palavras[1][:3].upper()}"
+        return None
+    
+    def classificar_status(self, texto, classes=(), icones=()):
+        """(is_sucesso, determinado): classes e ícones decidem antes das palavras; sucesso prevalece"""
+        texto = texto or ''
+        classes_sucesso = classes_falha = False
+        for classe in classes:
+            classe = classe.lower()
+            classes_sucesso = classes_sucesso or 'pass' in classe or 'success' in classe
+            classes_falha = classes_falha or 'fail' in classe or 'error' in classe
+        
+        # Classe de sucesso já decide; classe de falha só perde para um ícone de sucesso
+        if classes_sucesso or any(icone in icones for icone in self.ICONES_SUCESSO):
+            return True, True
+        if classes_falha:
+            return any(icone in texto for icone in self.ICONES_SUCESSO), True
+        
+        encontrados = {self._categorias[literal] for literal in self._regex_status.findall(texto.lower())}
+        if 'icone_sucesso' in encontrados:
+            return True, True
+        if 'icone_falha' in encontrados or any(icone in icones for icone in self.ICONES_FALHA):
+            return False, True
+        if 'palavra_sucesso' in encontrados:
+            return True, True
+        if 'palavra_falha' in encontrados:
+            # Palavras de sucesso sobrepostas a uma de falha (ex.: "errok") não aparecem no findall
+            texto_lower = texto.lower()
+            return any(palavra in texto_lower for palavra in self.palavras_sucesso), True
+        # Padrão mais comum é sucesso
+        return True, False
+    
+    def classificar(self, texto, classes=(), icones=()):
+        """(codigo, is_sucesso, status_determinado) do elemento"""
+        is_sucesso, determinado = self.classificar_status(texto, classes, icones)
+        return self.extrair_codigo(texto or ''), is_sucesso, determinado
+
+def separar_lista_env(nome, padrao=""):
+    """Lista separada por vírgulas vinda de uma variável de ambiente"""
+    return [item.strip() for item in os.getenv(nome, padrao).split(',') if item.strip()]
+
+classificador_evidencias = ClassificadorEvidencias(
+    prefixos=separar_lista_env("EVIDENCIAS_PREFIXOS_CARD", "TLD"),
+    palavras_sucesso=separar_lista_env("EVIDENCIAS_PALAVRAS_SUCESSO"),
+    palavras_falha=separar_lista_env("EVIDENCIAS_PALAVRAS_FALHA")
+)
+
 def extrair_codigo_card(texto):
     """Extrai código de card do texto (formato: PROJ-123, CREDT-456, etc.)"""
-    import re
+    return classificador_evidencias.extrair_codigo(texto)
+
+ARQUIVO_MANIFESTO_EVIDENCIAS = "manifesto.json"
+VERSAO_MANIFESTO_EVIDENCIAS = 1
+DIRETORIOS_EVIDENCIAS = (("falhas", "falha"), ("sucessos", "sucesso"))
+REGEX_CHAVE_ISSUE_EVIDENCIA = re.compile(r'^([A-Z]+-\d+)(?!\d)')
+cache_manifestos = CacheTTL("manifestos", CACHE_TTL_METADADOS)
+
+class ManifestoEvidencias:
+    """Índice das evidências de um diretório (workspace ou prints_tests/), gravado ao fim do processamento.
+
+    Cada entrada descreve um arquivo (diretório, status, nome, chave da issue, bytes); os índices por
+    issue e por status respondem status, lista, envio e limpeza sem varrer os diretórios.
+    """
     
-    # Padrões para códigos de card em ordem de prioridade
-    padroes = [
-        r'([A-Z]{2,7}-\d+)',  # PROJ-123, CREDT-456, FEATURE-202
-        r'([A-Z]+-\d+)',      # QUALQUER-123
-        r'([A-Z]{2,4}\d+)',   # PROJ123, CREDT456 (sem hífen)
-        r'(BC-\d+)',          # Padrão específico BC
-        r'(TEST-\d+)',        # Padrão específico TEST
-        r'(BUG-\d+)',         # Padrão específico BUG
-        r'(FEATURE-\d+)',     # Padrão específico FEATURE
-    ]
+    def __init__(self, base_dir, evidencias, execucao=None, gerado_em=None):
+        self.base_dir = base_dir
+        self.evidencias = sorted(evidencias, key=lambda e: (e["diretorio"] != "falhas", e["arquivo"]))
+        self.execucao = execucao
+        self.gerado_em = gerado_em
+        self.por_issue = {}
+        self.por_status = {"falha": [], "sucesso": []}
+        for evidencia in self.evidencias:
+            self.por_status[evidencia["status"]].append(evidencia)
+            if evidencia["issue_key"]:
+                self.por_issue.setdefault(evidencia["issue_key"], []).append(evidencia)
+    
+    @staticmethod
+    def entrada(diretorio, arquivo, tamanho, sha256=None):
+        status = dict(DIRETORIOS_EVIDENCIAS)[diretorio]
+        match = REGEX_CHAVE_ISSUE_EVIDENCIA.match(arquivo)
+        return {
+            "arquivo": arquivo,
+            "diretorio": diretorio,
+            "status": status,
+            "nome": arquivo.replace(f'_{status}.png', '').replace('.png', ''),
+            "issue_key": match.group(1) if match else None,
+            "bytes": tamanho,
+            "sha256": sha256
+        }
+    
+    @classmethod
+    def de_resultado(cls, base_dir, nomes_evidencias):
+        """Monta o índice a partir das evidências relatadas pelo processador (só as que foram gravadas)"""
+        evidencias = {}
+        for item in nomes_evidencias:
+            diretorio = os.path.basename(os.path.normpath(item["diretorio"]))
+            for arquivo in (item["arquivo"], item["arquivo"].replace('.png', '.txt')):
+                caminho = os.path.join(base_dir, diretorio, arquivo)
+                try:
+                    tamanho = os.path.getsize(caminho)
+                    sha256 = hash_arquivo_evidencia(caminho)
+                except OSError:
+                    continue
+                # O mesmo card processado duas vezes sobrescreve o arquivo: uma entrada só
+                evidencias[(diretorio, arquivo)] = cls.entrada(diretorio, arquivo, tamanho, sha256)
+                break
+        return cls(base_dir, list(evidencias.values()), execucao=uuid.uuid4().hex, gerado_em=datetime.now().isoformat())
     
-    for padrao in padroes:
-        match = re.search(padrao, texto.upper())
-        if match:
-            return match.group(1)
+    @classmethod
+    def varrer(cls, base_dir):
+        """Índice montado listando os diretórios (evidências geradas antes da existência do manifesto)"""
+        evidencias = []
+        for diretorio, _ in DIRETORIOS_EVIDENCIAS:
+            caminho = os.path.join(base_dir, diretorio)
+            if not os.path.isdir(caminho):
+                continue
+            for entrada in os.scandir(caminho):
+                if entrada.name.endswith(('.png', '.txt')):
+                    evidencias.append(cls.entrada(diretorio, entrada.name, entrada.stat().st_size))
+        return cls(base_dir, evidencias)
     
-    # Se não encontrou código específico, tentar extrair nome do teste
-    # Remover caracteres especiais e criar um nome baseado no texto
-    nome_limpo = re.sub(r'[^\w\s-]', '', texto)
-    palavras = nome_limpo.split()
+    def caminho(self, evidencia):
+        return os.path.join(self.base_dir, evidencia["diretorio"], evidencia["arquivo"])
     
-    if len(palavras) >= 2:
-        # Pegar as primeiras duas palavras e criar um código
-        codigo = f"{palavras[0][:3].upper()}-{palavras[1][:3].upper()}"
-        return codigo
+    def contagem(self, status):
+        return len(self.por_status[status])
     
-    return None
+    def imagens(self, status):
+        return [e for e in self.por_status[status] if e["arquivo"].endswith('.png')]
+    
+    def arquivos_por_issue(self, issue_keys):
+        """PNGs de cada issue (falhas antes de sucessos, em ordem de nome), no formato usado pelo envio"""
+        return {
+            key: [
+                {"arquivo": e["arquivo"], "caminho": self.caminho(e), "tipo": e["status"]}
+                for e in self.por_issue.get(key, []) if e["arquivo"].endswith('.png')
+            ]
+            for key in issue_keys
+        }
+    
+    def to_dict(self):
+        return {
+            "versao": VERSAO_MANIFESTO_EVIDENCIAS,
+            "execucao": self.execucao,
+            "gerado_em": self.gerado_em,
+            "evidencias": self.evidencias
+        }
+
+def gravar_manifesto_evidencias(base_dir, nomes_evidencias):
+    """Grava (de forma atômica) o manifesto das evidências recém-processadas em base_dir"""
+    manifesto = ManifestoEvidencias.de_resultado(base_dir, nomes_evidencias)
+    caminho = os.path.join(base_dir, ARQUIVO_MANIFESTO_EVIDENCIAS)
+    temporario = f"{caminho}.{uuid.uuid4().hex}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto.to_dict(), f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+    estado = os.stat(caminho)
+    cache_manifestos.definir(os.path.abspath(caminho), manifesto, etag=(estado.st_mtime_ns, estado.st_size))
+    print(f"🗂️ Manifesto com {len(manifesto.evidencias)} evidência(s) gravado em {caminho}")
+    return manifesto
+
+def carregar_manifesto_evidencias(base_dir):
+    """Manifesto de base_dir, relido do disco apenas quando o arquivo mudou.
 
-def limpar_evidencias_anteriores():
-    """Remove todas as evidências anteriores antes de iniciar novo processamento"""
+    Sem manifesto (evidências antigas ou processamento ainda em andamento), recorre a uma varredura
+    dos diretórios, que não é gravada nem guardada em cache.
+    """
+    caminho = os.path.abspath(os.path.join(base_dir, ARQUIVO_MANIFESTO_EVIDENCIAS))
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return ManifestoEvidencias.varrer(base_dir)
+    assinatura = (estado.st_mtime_ns, estado.st_size)
+    entrada = cache_manifestos.obter(caminho)
+    if entrada is not None and entrada.etag == assinatura:
+        return entrada.valor
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    manifesto = ManifestoEvidencias(base_dir, dados["evidencias"], dados.get("execucao"), dados.get("gerado_em"))
+    cache_manifestos.definir(caminho, manifesto, etag=assinatura)
+    return manifesto
+
+def limpar_evidencias_anteriores(base_dir=None):
+    """Remove todas as evidências anteriores (do workspace informado ou do prints_tests/ compartilhado)"""
     try:
         import shutil
         
         # Diretórios de evidências
-        base_dir = os.path.join(os.getcwd(), 'prints_tests')
+        base_dir = base_dir or os.path.join(os.getcwd(), 'prints_tests')
         falhas_dir = os.path.join(base_dir, 'falhas')
         sucessos_dir = os.path.join(base_dir, 'sucessos')
         
         print("🧹 Iniciando limpeza de evidências anteriores...")
         
-        # Contar arquivos antes da limpeza
-        arquivos_removidos = 0
-        
-        # Remover arquivos de falhas
-        if os.path.exists(falhas_dir):
-            for arquivo in os.listdir(falhas_dir):
-                if arquivo.endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                    arquivo_path = os.path.join(falhas_dir, arquivo)
-                    try:
-                        os.remove(arquivo_path)
-                        arquivos_removidos += 1
-                        print(f"   🗑️ Removido: {arquivo}")
-                    except Exception as e:
-                        print(f"   ⚠️ Erro ao remover {arquivo}: {e}")
-        
-        # Remover arquivos de sucessos
-        if os.path.exists(sucessos_dir):
-            for arquivo in os.listdir(sucessos_dir):
-                if arquivo.endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                    arquivo_path = os.path.join(sucessos_dir, arquivo)
-                    try:
-                        os.remove(arquivo_path)
-                        arquivos_removidos += 1
-                        print(f"   🗑️ Removido: {arquivo}")
-                    except Exception as e:
-                        print(f"   ⚠️ Erro ao remover {arquivo}: {e}")
+        # Com manifesto, remover só os arquivos indexados; sem ele (evidências antigas), varrer os diretórios
+        caminho_manifesto = os.path.join(base_dir, ARQUIVO_MANIFESTO_EVIDENCIAS)
+        if os.path.exists(caminho_manifesto):
+            manifesto = carregar_manifesto_evidencias(base_dir)
+            arquivos = [manifesto.caminho(evidencia) for evidencia in manifesto.evidencias]
+        else:
+            arquivos = [
+                os.path.join(diretorio, arquivo)
+                for diretorio in (falhas_dir, sucessos_dir) if os.path.exists(diretorio)
+                for arquivo in os.listdir(diretorio)
+                if arquivo.endswith(('.png', '.jpg', '.jpeg', '.gif', '.txt'))
+            ]
         
-        # Remover diretórios vazios (opcional)
-        try:
-            if os.path.exists(falhas_dir) and not os.listdir(falhas_dir):
-                os.rmdir(falhas_dir)
-                print("   📁 Diretório de falhas removido (vazio)")
-        except Exception as e:
-            print(f"   ⚠️ Erro ao remover diretório de falhas: {e}")
+        arquivos_removidos = 0
+        for arquivo_path in arquivos:
+            try:
+                os.remove(arquivo_path)
+                arquivos_removidos += 1
+                print(f"   🗑️ Removido: {os.path.basename(arquivo_path)}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"   ⚠️ Erro ao remover {os.path.basename(arquivo_path)}: {e}")
         
         try:
-            if os.path.exists(sucessos_dir) and not os.listdir(sucessos_dir):
-                os.rmdir(sucessos_dir)
-                print("   📁 Diretório de sucessos removido (vazio)")
-        except Exception as e:
-            print(f"   ⚠️ Erro ao remover diretório de sucessos: {e}")
+            os.remove(caminho_manifesto)
+        except FileNotFoundError:
+            pass
         
         print(f"✅ Limpeza concluída: {arquivos_removidos} arquivos removidos")
         
@@ -1686,16 +3259,10 @@ def extrair_nome_teste_especifico(elemento):
     if name_span:
         texto = name_span.get_text().strip()
         
-        # Padrão específico TLD (como no método do usuário)
-        match = re.search(r"TLD-\d+", texto)
-        if match:
-            return match.group(0)
-        
-        # Outros padrões conhecidos
-        for padrao in [r"([A-Z]{2,4}-\d+)", r"([A-Z]+-\d+)"]:
-            match = re.search(padrao, texto)
-            if match:
-                return match.group(1)
+        # Prefixos do projeto (ex.: TLD) e outros padrões conhecidos
+        codigo = classificador_evidencias.extrair_codigo(texto, compacto=False)
+        if codigo:
+            return codigo
         
         # Fallback: texto limpo (como no método do usuário)
         return texto.replace(" ", "_").replace("/", "_")
@@ -1716,164 +3283,345 @@ def detectar_status_especifico(elemento):
         pass
     
     # Fallback para método atual
-    texto_elemento = elemento.get_text().lower()
-    html_elemento = str(elemento).lower()
-    
-    classes_elemento = elemento.get('class', [])
-    is_sucesso = (
-        any('pass' in classe.lower() for classe in classes_elemento) or
-        any('success' in classe.lower() for classe in classes_elemento) or
-        '✅' in html_elemento or
-        '✓' in html_elemento
-    )
-    
-    is_falha = (
-        any('fail' in classe.lower() for classe in classes_elemento) or
-        any('error' in classe.lower() for classe in classes_elemento) or
-        '❌' in html_elemento or
-        '✗' in html_elemento
-    )
-    
-    if is_sucesso:
-        return True
-    elif is_falha:
-        return False
-    else:
-        # Se não determinou, verificar pelo texto
-        sucesso_keywords = ['pass', 'success', 'sucesso', 'passed', '✅', '✓', 'ok', 'successful']
-        falha_keywords = ['fail', 'error', 'falha', 'failed', '❌', '✗', 'erro', 'exception', 'timeout']
+    is_sucesso, _ = classificador_evidencias.classificar_status(elemento.get_text(), elemento.get('class', []))
+    return is_sucesso
+
+class PoolNavegadores:
+    """Pool de navegadores Chrome headless pré-aquecidos e reutilizáveis.
+
+    O binário do chromedriver é resolvido uma única vez; cada driver passa por
+    verificação de saúde ao ser emprestado e é reciclado após max_usos usos.
+    """
+
+    def __init__(self, max_tamanho=BROWSER_POOL_SIZE, max_usos=BROWSER_POOL_MAX_USOS, timeout=BROWSER_POOL_TIMEOUT):
+        self.max_tamanho = max_tamanho
+        self.max_usos = max_usos
+        self.timeout = timeout
+        self._ociosos = []  # pares [driver, usos]
+        self._criados = 0
+        self._condicao = threading.Condition()
+        self._service_path = None
+        self._service_resolvido = False
+
+    def _resolver_chromedriver(self):
+        """Resolve o caminho do chromedriver uma única vez (webdriver-manager ou Selenium Manager)"""
+        if not self._service_resolvido:
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+                self._service_path = ChromeDriverManager().install()
+                print(f"🧭 Chromedriver resolvido: {self._service_path}")
+            except Exception as e:
+                print(f"⚠️ webdriver-manager indisponível ({e}), usando Selenium Manager")
+                self._service_path = None
+            self._service_resolvido = True
+        return self._service_path
+
+    def _criar_driver(self):
+        from selenium.webdriver.chrome.service import Service
         
-        is_sucesso = any(palavra in texto_elemento for palavra in sucesso_keywords)
-        is_falha = any(palavra in texto_elemento for palavra in falha_keywords)
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
         
-        if is_sucesso:
-            return True
-        elif is_falha:
+        service_path = self._resolver_chromedriver()
+        service = Service(service_path) if service_path else Service()
+        return webdriver.Chrome(service=service, options=options)
+
+    @staticmethod
+    def _saudavel(driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
             return False
+
+    @staticmethod
+    def _encerrar_driver(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def aquecer(self, quantidade=None):
+        """Resolve o chromedriver e inicia navegadores ociosos antecipadamente"""
+        quantidade = self.max_tamanho if quantidade is None else quantidade
+        self._resolver_chromedriver()
+        for _ in range(quantidade):
+            with self._condicao:
+                if self._criados >= self.max_tamanho:
+                    return
+                self._criados += 1
+            try:
+                driver = self._criar_driver()
+            except Exception as e:
+                with self._condicao:
+                    self._criados -= 1
+                print(f"⚠️ Não foi possível pré-aquecer navegador: {e}")
+                return
+            with self._condicao:
+                self._ociosos.append([driver, 0])
+                self._condicao.notify()
+
+    def _obter(self):
+        prazo = time.monotonic() + self.timeout
+        with self._condicao:
+            while True:
+                if self._ociosos:
+                    return self._ociosos.pop()
+                if self._criados < self.max_tamanho:
+                    self._criados += 1
+                    break
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    raise TimeoutError("Nenhum navegador disponível no pool")
+                self._condicao.wait(restante)
+        try:
+            return [self._criar_driver(), 0]
+        except Exception:
+            with self._condicao:
+                self._criados -= 1
+                self._condicao.notify()
+            raise
+
+    def _descartar(self, driver):
+        self._encerrar_driver(driver)
+        with self._condicao:
+            self._criados -= 1
+            self._condicao.notify()
+
+    def _devolver(self, item):
+        with self._condicao:
+            self._ociosos.append(item)
+            self._condicao.notify()
+
+    @contextmanager
+    def emprestar(self, largura=1920, altura=1080):
+        """Empresta um driver saudável do pool, devolvendo-o (ou reciclando-o) ao final"""
+        item = self._obter()
+        for _ in range(self.max_tamanho + 1):
+            if self._saudavel(item[0]):
+                break
+            print("♻️ Navegador do pool não respondeu, substituindo")
+            self._descartar(item[0])
+            item = self._obter()
         else:
-            # Padrão mais comum é sucesso
-            return True
+            self._descartar(item[0])
+            raise RuntimeError("Não foi possível obter um navegador saudável do pool")
+
+        driver = item[0]
+        saudavel = True
+        try:
+            driver.set_window_size(largura, altura)
+            yield driver
+        except Exception:
+            saudavel = self._saudavel(driver)
+            raise
+        finally:
+            item[1] += 1
+            if not saudavel or item[1] >= self.max_usos:
+                self._descartar(driver)
+            else:
+                try:
+                    driver.get("about:blank")
+                    self._devolver(item)
+                except Exception:
+                    self._descartar(driver)
+
+    def encerrar(self):
+        with self._condicao:
+            ociosos, self._ociosos = self._ociosos, []
+            self._criados -= len(ociosos)
+        for driver, _ in ociosos:
+            self._encerrar_driver(driver)
+
+
+pool_navegadores = PoolNavegadores()
+atexit.register(pool_navegadores.encerrar)
+
+SELETOR_TESTES_LOG = ".children.populated > div.test"
+
+def capturar_shard_selenium(log_path, shard, total_shards, shard_dir, registrar):
+    """Captura os screenshots de uma fatia dos testes do log (índices com i % total_shards == shard).
+
+    Retorna o mapa de deduplicação do shard: test_code -> {"status", "indice", "caminho"},
+    já aplicando a regra de que falha prevalece sobre sucesso.
+    """
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.common.exceptions import TimeoutException
+    
+    processados = {}
+    
+    with pool_navegadores.emprestar(largura=1920, altura=3000) as driver:
+        driver.get(f"file://{os.path.abspath(log_path)}")
+        
+        # O log.html monta os testes via JavaScript: aguardar os elementos em vez de um sleep fixo
+        try:
+            WebDriverWait(driver, SELENIUM_ESPERA_TIMEOUT * 2).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, SELETOR_TESTES_LOG))
+            )
+        except TimeoutException:
+            pass
+        
+        test_divs = driver.find_elements(By.CSS_SELECTOR, SELETOR_TESTES_LOG)
+        registrar(encontrados=len(test_divs))
+        
+        for i, test_div in enumerate(test_divs, start=1):
+            if (i - 1) % total_shards != shard:
+                continue
+            test_id = None
+            try:
+                test_id = test_div.get_attribute("id")
+                
+                # Detectar status
+                label = test_div.find_element(By.CSS_SELECTOR, ".element-header-left .label")
+                is_fail = "fail" in label.get_attribute("class").lower()
+                
+                # Extrair nome do teste
+                name_span = test_div.find_element(By.CSS_SELECTOR, ".element-header-left .name")
+                test_code = classificador_evidencias.codigo_projeto(name_span.text)
+                if not test_code:
+                    test_code = name_span.text.strip().replace(" ", "_").replace("/", "_")
+                
+                # Verificar duplicidade com prioridade para falha
+                anterior = processados.get(test_code)
+                if anterior:
+                    if anterior["status"] == "fail" or not is_fail:
+                        continue
+                    print(f"⚠️ Atualizando status de {test_code} de sucesso para falha")
+                    if os.path.exists(anterior["caminho"]):
+                        os.remove(anterior["caminho"])
+                
+                # Expander apenas testes de sucesso, aguardando o conteúdo ficar visível
+                if not is_fail:
+                    try:
+                        header = test_div.find_element(By.CLASS_NAME, "element-header")
+                        ActionChains(driver).move_to_element(header).click().perform()
+                        if test_id:
+                            WebDriverWait(driver, SELENIUM_ESPERA_TIMEOUT).until(
+                                EC.visibility_of_element_located((By.ID, f"{test_id}-children"))
+                            )
+                    except Exception as e:
+                        print(f"⚠️ Não foi possível expandir o card de {test_code}: {e}")
+                
+                # O screenshot do elemento já o rola para a área visível
+                caminho = os.path.join(shard_dir, f"{test_code}.png")
+                test_div.screenshot(caminho)
+                
+                processados[test_code] = {
+                    "status": "fail" if is_fail else "pass",
+                    "indice": i,
+                    "caminho": caminho
+                }
+                
+            except Exception as e:
+                print(f"❌ Erro ao capturar screenshot do teste {i} ({test_id}): {e}")
+            finally:
+                registrar(processado=True)
+    
+    return processados
 
-def processar_evidencias_com_selenium(log_path):
-    """Processa evidências usando Selenium (método do usuário)"""
+def processar_evidencias_com_selenium(log_path, progresso=None, base_dir=None):
+    """Processa evidências usando Selenium, dividindo os testes entre vários navegadores em paralelo"""
     try:
         from selenium import webdriver
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.common.action_chains import ActionChains
-        import time
         import shutil
         
-        # Configuração do Chrome
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--window-size=1920,3000")
-        
-        driver = webdriver.Chrome(options=options)
+        # Limpar evidências anteriores
+        limpar_evidencias_anteriores(base_dir)
+        
+        # Criar diretórios
+        base_dir = os.path.abspath(base_dir or os.path.join(os.path.dirname(log_path), "prints_tests"))
+        falhas_dir = os.path.join(base_dir, "falhas")
+        sucessos_dir = os.path.join(base_dir, "sucessos")
+        
+        total_shards = max(1, min(SELENIUM_SHARDS, pool_navegadores.max_tamanho))
+        shard_dirs = [os.path.join(base_dir, f".shard_{n}") for n in range(total_shards)]
+        for diretorio in [falhas_dir, sucessos_dir] + shard_dirs:
+            os.makedirs(diretorio, exist_ok=True)
+        
+        # Progresso agregado entre os shards
+        estado = {"encontrados": 0, "processados": 0}
+        estado_lock = threading.Lock()
+        
+        def registrar(encontrados=None, processado=False):
+            with estado_lock:
+                if encontrados is not None:
+                    estado["encontrados"] = encontrados
+                if processado:
+                    estado["processados"] += 1
+                if progresso:
+                    progresso(encontrados=estado["encontrados"], processados=estado["processados"])
         
         try:
-            log_path_abs = os.path.abspath(log_path)
-            driver.get(f"file://{log_path_abs}")
-            time.sleep(2)
-            
-            # Limpar evidências anteriores
-            limpar_evidencias_anteriores()
-            
-            # Criar diretórios
-            base_dir = os.path.abspath(os.path.join(os.path.dirname(log_path), "prints_tests"))
-            falhas_dir = os.path.join(base_dir, "falhas")
-            sucessos_dir = os.path.join(base_dir, "sucessos")
-            
-            # Buscar elementos usando seletores específicos
-            test_divs = driver.find_elements(By.CSS_SELECTOR, ".children.populated > div.test")
-            print(f"🧪 Total de testes encontrados: {len(test_divs)}")
+            print(f"🧪 Capturando evidências com {total_shards} navegador(es) em paralelo")
+            with ThreadPoolExecutor(max_workers=total_shards) as executor:
+                futuros = [
+                    executor.submit(capturar_shard_selenium, log_path, n, total_shards, shard_dirs[n], registrar)
+                    for n in range(total_shards)
+                ]
+                mapas = [futuro.result() for futuro in futuros]
+            print(f"🧪 Total de testes encontrados: {estado['encontrados']}")
             
+            # Mesclar os mapas dos shards: falha prevalece sobre sucesso; empate fica com a primeira ocorrência
             processados = {}
+            for mapa in mapas:
+                for test_code, entrada in mapa.items():
+                    atual = processados.get(test_code)
+                    if atual is None:
+                        processados[test_code] = entrada
+                        continue
+                    entrada_prevalece = (
+                        (entrada["status"] == "fail" and atual["status"] == "pass") or
+                        (entrada["status"] == atual["status"] and entrada["indice"] < atual["indice"])
+                    )
+                    descartada = atual if entrada_prevalece else entrada
+                    if os.path.exists(descartada["caminho"]):
+                        os.remove(descartada["caminho"])
+                    if entrada_prevalece:
+                        processados[test_code] = entrada
+            
             sucessos = 0
             falhas = 0
             nomes_evidencias = []
             
-            for i, test_div in enumerate(test_divs, start=1):
-                try:
-                    test_id = test_div.get_attribute("id")
-                    
-                    # Detectar status
-                    label = test_div.find_element(By.CSS_SELECTOR, ".element-header-left .label")
-                    is_fail = "fail" in label.get_attribute("class").lower()
-                    
-                    # Extrair nome do teste
-                    name_span = test_div.find_element(By.CSS_SELECTOR, ".element-header-left .name")
-                    match = re.search(r"TLD-\d+", name_span.text)
-                    if match:
-                        test_code = match.group(0)
-                    else:
-                        test_code = name_span.text.strip().replace(" ", "_").replace("/", "_")
-                    
-                    # Verificar duplicidade com prioridade para falha
-                    if test_code in processados:
-                        if processados[test_code] == "fail":
-                            continue
-                        elif processados[test_code] == "pass" and is_fail:
-                            print(f"⚠️ Atualizando status de {test_code} de sucesso para falha")
-                            sucesso_path = os.path.join(sucessos_dir, f"{test_code}.png")
-                            if os.path.exists(sucesso_path):
-                                os.remove(sucesso_path)
-                        else:
-                            continue
-                    
-                    processados[test_code] = "fail" if is_fail else "pass"
-                    
-                    # Expander apenas testes de sucesso
-                    if not is_fail:
-                        try:
-                            header = test_div.find_element(By.CLASS_NAME, "element-header")
-                            ActionChains(driver).move_to_element(header).click().perform()
-                            time.sleep(0.4)
-                        except Exception as e:
-                            print(f"⚠️ Não foi possível expandir o card de {test_code}: {e}")
-                    
-                    # Scroll para o elemento
-                    driver.execute_script("arguments[0].scrollIntoView(true);", test_div)
-                    time.sleep(0.2)
-                    
-                    # Capturar screenshot
-                    target_dir = falhas_dir if is_fail else sucessos_dir
-                    screenshot_path = os.path.join(target_dir, f"{test_code}.png")
-                    test_div.screenshot(screenshot_path)
-                    print(f"📸 Screenshot salvo: {screenshot_path}")
-                    
-                    # Contar estatísticas
-                    if is_fail:
-                        falhas += 1
-                    else:
-                        sucessos += 1
-                    
-                    nomes_evidencias.append({
-                        "nome": test_code,
-                        "arquivo": f"{test_code}.png",
-                        "status": "falha" if is_fail else "sucesso",
-                        "diretorio": target_dir,
-                        "elemento_index": i
-                    })
-                    
-                except Exception as e:
-                    print(f"❌ Erro ao capturar screenshot do teste {i} ({test_id}): {e}")
-                    continue
-            
-            return {
-                "sucesso": True,
-                "estatisticas": {
-                    "sucessos": sucessos,
-                    "falhas": falhas,
-                    "total": sucessos + falhas,
-                    "elementos_processados": len(test_divs)
-                },
-                "nomes_evidencias": nomes_evidencias,
-                "metodo": "selenium_especifico"
-            }
-            
+            for test_code, entrada in sorted(processados.items(), key=lambda item: item[1]["indice"]):
+                is_fail = entrada["status"] == "fail"
+                target_dir = falhas_dir if is_fail else sucessos_dir
+                screenshot_path = os.path.join(target_dir, f"{test_code}.png")
+                os.replace(entrada["caminho"], screenshot_path)
+                print(f"📸 Screenshot salvo: {screenshot_path}")
+                
+                # Contar estatísticas
+                if is_fail:
+                    falhas += 1
+                else:
+                    sucessos += 1
+                
+                nomes_evidencias.append({
+                    "nome": test_code,
+                    "arquivo": f"{test_code}.png",
+                    "status": "falha" if is_fail else "sucesso",
+                    "diretorio": target_dir,
+                    "elemento_index": entrada["indice"]
+                })
         finally:
-            driver.quit()
+            for shard_dir in shard_dirs:
+                shutil.rmtree(shard_dir, ignore_errors=True)
+        
+        gravar_manifesto_evidencias(base_dir, nomes_evidencias)
+        
+        return {
+            "sucesso": True,
+            "estatisticas": {
+                "sucessos": sucessos,
+                "falhas": falhas,
+                "total": sucessos + falhas,
+                "elementos_processados": estado["encontrados"]
+            },
+            "nomes_evidencias": nomes_evidencias,
+            "metodo": "selenium_especifico",
+            "shards": total_shards
+        }
             
     except ImportError:
         print("❌ Selenium não disponível, usando método genérico")
@@ -1882,12 +3630,12 @@ def processar_evidencias_com_selenium(log_path):
         print(f"❌ Erro no método Selenium: {e}")
         return None
 
-def processar_evidencias_hibrido(log_path):
+def processar_evidencias_hibrido(log_path, progresso=None, base_dir=None):
     """Método híbrido combinando precisão e flexibilidade"""
     print("🔄 Iniciando processamento híbrido de evidências...")
     
     # 1. Tentar método específico com Selenium primeiro
-    resultado_selenium = processar_evidencias_com_selenium(log_path)
+    resultado_selenium = processar_evidencias_com_selenium(log_path, progresso=progresso, base_dir=base_dir)
     
     if resultado_selenium and resultado_selenium['sucesso']:
         print("✅ Método específico (Selenium) executado com sucesso")
@@ -1895,9 +3643,256 @@ def processar_evidencias_hibrido(log_path):
     
     # 2. Fallback para método genérico atual
     print("🔄 Fallback para método genérico...")
-    return processar_arquivo_log(log_path)
+    return processar_arquivo_log(log_path, progresso=progresso, base_dir=base_dir)
+
+# Estratégias de busca de testes no log, em ordem de prioridade (a primeira que encontrar algo vence)
+CODIGOS_TESTE_LOG = ['BC-', 'PROJ-', 'TEST-', 'BUG-', 'FEATURE-']
+REGEX_CODIGOS_TESTE_LOG = [re.compile(re.escape(codigo), re.I) for codigo in CODIGOS_TESTE_LOG]
+REGEX_ICONES_SUCESSO_LOG = re.compile(r'✅|✓|PASS|SUCCESS|SUCESSO', re.I)
+REGEX_ICONES_FALHA_LOG = re.compile(r'❌|✗|FAIL|ERROR|FALHA', re.I)
+REGEX_PADROES_TESTE_LOG = [re.compile(padrao, re.I) for padrao in [
+    r'teste.*passed|test.*passed|teste.*failed|test.*failed',
+    r'test.*success|test.*error|teste.*sucesso|teste.*falha',
+    r'execution.*passed|execution.*failed',
+    r'result.*passed|result.*failed'
+]]
+REGEX_HEADER_TESTE_LOG = re.compile(r'test|teste', re.I)
+REGEX_CLASSE_TEST_PASS_FAIL = re.compile(r'test-pass|test-fail', re.I)
+PALAVRAS_TESTE_LOG = ['test', 'teste', 'passed', 'failed', 'sucesso', 'falha']
+ICONES_LOG = ['✅', '✓', '❌', '✗']
+TAGS_VAZIAS_HTML = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+                    'meta', 'param', 'source', 'track', 'wbr'}
+TAGS_HEADER_HTML = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+class ElementoLog:
+    """Elemento de teste encontrado no log: apenas classes, texto (limitado) e ícones presentes no HTML"""
+    
+    __slots__ = ('tag', 'classes', 'texto', 'icones')
+    
+    def __init__(self, tag, classes, texto, icones):
+        self.tag = tag
+        self.classes = classes
+        self.texto = texto
+        self.icones = icones
+    
+    def get_text(self):
+        return self.texto
+
+class ParserLogEvidencias(HTMLParser):
+    """Parser incremental do log.html: localiza os elementos de teste numa única passada.
+
+    Aplica as mesmas estratégias em cascata da busca com BeautifulSoup (níveis 1 a 7), mas sem
+    montar a árvore: cada elemento aberto guarda só o próprio texto (até LOG_TEXTO_MAX_ELEMENTO
+    caracteres) e, ao fechar, vira candidato no menor nível em que se qualificou. Candidatos de
+    níveis piores que o melhor já encontrado são descartados na hora.
+    """
+    
+    def __init__(self, texto_max=LOG_TEXTO_MAX_ELEMENTO):
+        super().__init__(convert_charrefs=True)
+        self.texto_max = texto_max
+        self.pilha = []
+        self.ordem = 0
+        self.dados_pendentes = []
+        self.melhor_nivel = None
+        self.candidatos = []
+    
+    # --- Eventos do HTMLParser ---
+    
+    def handle_starttag(self, tag, attrs):
+        self._descarregar_texto()
+        self.ordem += 1
+        classes = []
+        icones = set()
+        for nome, valor in attrs:
+            if not valor:
+                continue
+            if nome == 'class':
+                classes = valor.split()
+            icones.update(icone for icone in ICONES_LOG if icone in valor)
+        
+        pai = self.pilha[-1] if self.pilha else None
+        
+        if tag in TAGS_VAZIAS_HTML:
+            if pai is not None:
+                pai['icones'].update(icones)
+                self._verificar_irmao_header(pai, tag, classes, icones)
+            return
+        
+        frame = {
+            'tag': tag,
+            'classes': classes,
+            'ordem': self.ordem,
+            'texto': [],
+            'tamanho': 0,
+            'icones': icones,
+            'niveis': {},
+            'textos_diretos': 0,
+            'filhos': 0,
+            'irmao_pendente': None
+        }
+        
+        if tag == 'div':
+            if 'test-result' in classes:
+                frame['niveis'][1] = (self.ordem,)
+            if any(REGEX_CLASSE_TEST_PASS_FAIL.search(classe) for classe in classes):
+                frame['niveis'][2] = (self.ordem,)
+        
+        if pai is not None:
+            pai['filhos'] += 1
+            if pai['irmao_pendente'] is not None:
+                frame['niveis'].setdefault(6, (pai['irmao_pendente'],))
+                pai['irmao_pendente'] = None
+        
+        self.pilha.append(frame)
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in TAGS_VAZIAS_HTML:
+            self.handle_endtag(tag)
+    
+    def handle_endtag(self, tag):
+        self._descarregar_texto()
+        # Fechar até a tag correspondente (tags não fechadas no HTML são fechadas junto)
+        for posicao in range(len(self.pilha) - 1, -1, -1):
+            if self.pilha[posicao]['tag'] == tag:
+                break
+        else:
+            return
+        while len(self.pilha) > posicao:
+            self._fechar(self.pilha.pop())
+    
+    def handle_data(self, data):
+        self.dados_pendentes.append(data)
+    
+    def handle_comment(self, data):
+        self._descarregar_texto()
+        if self.pilha:
+            frame = self.pilha[-1]
+            frame['icones'].update(icone for icone in ICONES_LOG if icone in data)
+            self._marcar_texto(frame, data)
+    
+    def close(self):
+        super().close()
+        self._descarregar_texto()
+        while self.pilha:
+            self._fechar(self.pilha.pop())
+    
+    # --- Internos ---
+    
+    def _verificar_irmao_header(self, pai, tag, classes, icones):
+        """Tags vazias também contam como próximo irmão de um header de teste"""
+        if pai['irmao_pendente'] is None:
+            return
+        ordem_header = pai['irmao_pendente']
+        pai['irmao_pendente'] = None
+        self._registrar({'tag': tag, 'classes': classes, 'ordem': self.ordem, 'texto': [],
+                         'icones': icones, 'niveis': {6: (ordem_header,)}})
+    
+    def _descarregar_texto(self):
+        """Junta os pedaços de um mesmo nó de texto antes de avaliá-lo"""
+        if not self.dados_pendentes:
+            return
+        data = ''.join(self.dados_pendentes)
+        self.dados_pendentes = []
+        if not self.pilha:
+            return
+        frame = self.pilha[-1]
+        self.ordem += 1
+        frame['textos_diretos'] += 1
+        frame['icones'].update(icone for icone in ICONES_LOG if icone in data)
+        if frame['tamanho'] < self.texto_max:
+            pedaco = data[:self.texto_max - frame['tamanho']]
+            frame['texto'].append(pedaco)
+            frame['tamanho'] += len(pedaco)
+        self._marcar_texto(frame, data)
+    
+    def _marcar_texto(self, frame, data):
+        """Níveis 3 a 5: nós de texto (inclusive scripts e comentários) marcam o elemento pai"""
+        if self.melhor_nivel is not None and self.melhor_nivel < 3:
+            return
+        ordem = self.ordem
+        for indice, regex in enumerate(REGEX_CODIGOS_TESTE_LOG):
+            if regex.search(data):
+                self._marcar_nivel(frame, 3, (indice, ordem))
+                break
+        if self.melhor_nivel is not None and self.melhor_nivel < 4:
+            return
+        if REGEX_ICONES_SUCESSO_LOG.search(data):
+            self._marcar_nivel(frame, 4, (0, ordem))
+        elif REGEX_ICONES_FALHA_LOG.search(data):
+            self._marcar_nivel(frame, 4, (1, ordem))
+        if self.melhor_nivel is not None and self.melhor_nivel < 5:
+            return
+        for indice, regex in enumerate(REGEX_PADROES_TESTE_LOG):
+            if regex.search(data):
+                self._marcar_nivel(frame, 5, (indice, ordem))
+                break
+    
+    def _marcar_nivel(self, frame, nivel, chave):
+        atual = frame['niveis'].get(nivel)
+        if atual is None or chave < atual:
+            frame['niveis'][nivel] = chave
+    
+    def _fechar(self, frame):
+        tag = frame['tag']
+        texto = ''.join(frame['texto'])
+        
+        # Nível 6: header cujo único conteúdo é um texto de teste marca o próximo irmão
+        if (tag in TAGS_HEADER_HTML and frame['filhos'] == 0 and frame['textos_diretos'] == 1
+                and REGEX_HEADER_TESTE_LOG.search(texto) and self.pilha):
+            self.pilha[-1]['irmao_pendente'] = frame['ordem']
+        
+        # Nível 7: qualquer div com palavras de teste no texto
+        if tag == 'div':
+            texto_lower = texto.lower()
+            if any(palavra in texto_lower for palavra in PALAVRAS_TESTE_LOG):
+                frame['niveis'][7] = (frame['ordem'],)
+        
+        frame['texto'] = [texto]
+        self._registrar(frame)
+        
+        # Propagar texto (como o get_text, sem scripts e estilos) e ícones para o pai
+        if self.pilha:
+            pai = self.pilha[-1]
+            pai['icones'].update(frame['icones'])
+            if tag not in ('script', 'style') and pai['tamanho'] < self.texto_max and texto:
+                pedaco = texto[:self.texto_max - pai['tamanho']]
+                pai['texto'].append(pedaco)
+                pai['tamanho'] += len(pedaco)
+    
+    def _registrar(self, frame):
+        if not frame['niveis']:
+            return
+        nivel = min(frame['niveis'])
+        if self.melhor_nivel is not None and nivel > self.melhor_nivel:
+            return
+        if self.melhor_nivel is None or nivel < self.melhor_nivel:
+            self.melhor_nivel = nivel
+            self.candidatos = []
+        elemento = ElementoLog(frame['tag'], frame['classes'], ''.join(frame['texto']), frame['icones'])
+        self.candidatos.append((frame['niveis'][nivel], elemento))
+    
+    def elementos(self):
+        """Elementos de teste na mesma ordem em que a busca em cascata os encontraria"""
+        return [elemento for _, elemento in sorted(self.candidatos, key=lambda candidato: candidato[0])]
 
-def processar_arquivo_log(log_path):
+def localizar_elementos_teste_log(log_path, logger=None):
+    """Lê o log em blocos e retorna (elementos de teste, nível da estratégia usada, caracteres lidos)"""
+    parser = ParserLogEvidencias()
+    caracteres = 0
+    with open(log_path, 'r', encoding='utf-8') as f:
+        while True:
+            bloco = f.read(LOG_CHUNK_LEITURA)
+            if not bloco:
+                break
+            caracteres += len(bloco)
+            parser.feed(bloco)
+    parser.close()
+    if logger:
+        logger.info(f"Conteúdo lido: {caracteres} caracteres")
+    return parser.elementos(), parser.melhor_nivel, caracteres
+
+def processar_arquivo_log(log_path, progresso=None, base_dir=None):
     """Processa o arquivo log.html e extrai evidências com logs detalhados"""
     # Importar logger se disponível
     try:
@@ -1935,13 +3930,6 @@ def processar_arquivo_log(log_path):
                 "erro": "Arquivo está vazio"
             }
         
-        # Ler o arquivo HTML
-        logger.info("Lendo arquivo HTML...")
-        with open(log_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        logger.info(f"Conteúdo lido: {len(html_content)} caracteres")
-        
         # Validar formato do log (simplificado)
         validacao = {
             'valido': True,
@@ -1950,100 +3938,26 @@ def processar_arquivo_log(log_path):
             'criterios_atingidos': ['Formato básico']
         }
         
-        # Parsear o HTML
-        logger.info("Parseando HTML com BeautifulSoup...")
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Localizar os testes numa única passada pelo arquivo, sem montar a árvore HTML
+        logger.info("Lendo e analisando o HTML em blocos...")
+        test_elements, nivel_estrategia, _ = localizar_elementos_teste_log(log_path, logger)
+        if nivel_estrategia and nivel_estrategia >= 7:
+            logger.warning("Nenhum elemento de teste encontrado com métodos específicos, usando todas as divs...")
+        logger.debug(f"Estratégia de busca utilizada: {nivel_estrategia}")
         
         # Limpar evidências anteriores
         logger.info("Limpando evidências anteriores...")
-        limpar_evidencias_anteriores()
+        limpar_evidencias_anteriores(base_dir)
         
         # Criar diretórios se não existirem
-        os.makedirs('prints_tests/falhas', exist_ok=True)
-        os.makedirs('prints_tests/sucessos', exist_ok=True)
+        base_dir = base_dir or 'prints_tests'
+        os.makedirs(os.path.join(base_dir, 'falhas'), exist_ok=True)
+        os.makedirs(os.path.join(base_dir, 'sucessos'), exist_ok=True)
         logger.info("Diretórios de evidências criados/verificados")
         
-        # Encontrar todos os testes com algoritmo melhorado
-        logger.info("Iniciando busca por elementos de teste...")
-        test_elements = []
-        
-        # 1. Buscar especificamente por divs com classe 'test-result' (método principal)
-        logger.debug("Buscando por divs com classe test-result...")
-        test_divs = soup.find_all('div', class_='test-result')
-        test_elements.extend(test_divs)
-        logger.debug(f"Encontrados {len(test_divs)} divs com classe test-result")
-        
-        # 2. Se não encontrou nada, buscar por divs com classes test-pass ou test-fail
-        if not test_divs:
-            logger.debug("Buscando por divs com classes test-pass/test-fail...")
-            test_divs = soup.find_all('div', class_=re.compile(r'test-pass|test-fail', re.I))
-            test_elements.extend(test_divs)
-            logger.debug(f"Encontrados {len(test_divs)} divs com classes test-pass/test-fail")
-        
-        # 3. Se ainda não encontrou nada, buscar por elementos que contenham códigos de teste específicos
-        if not test_elements:
-            logger.debug("Buscando por elementos com códigos de teste...")
-            codigos_teste = ['BC-', 'PROJ-', 'TEST-', 'BUG-', 'FEATURE-']
-            for codigo in codigos_teste:
-                elementos = soup.find_all(string=re.compile(codigo, re.I))
-                for elemento in elementos:
-                    parent = elemento.parent
-                    if parent and parent not in test_elements:
-                        test_elements.append(parent)
-            logger.debug(f"Encontrados {len(test_elements)} elementos com códigos de teste")
-        
-        # 4. Se ainda não encontrou nada, buscar por elementos com ícones de sucesso/falha
-        if not test_elements:
-            logger.debug("Buscando por ícones de sucesso/falha...")
-            success_elements = soup.find_all(string=re.compile(r'✅|✓|PASS|SUCCESS|SUCESSO', re.I))
-            fail_elements = soup.find_all(string=re.compile(r'❌|✗|FAIL|ERROR|FALHA', re.I))
-            
-            # Encontrar os elementos pai dos textos encontrados
-            for text in success_elements + fail_elements:
-                parent = text.parent
-                if parent and parent not in test_elements:
-                    test_elements.append(parent)
-            
-            logger.debug(f"Encontrados {len(success_elements)} elementos de sucesso e {len(fail_elements)} de falha")
-        
-        # 5. Se ainda não encontrou nada, buscar por elementos que contenham padrões de teste
-        if not test_elements:
-            logger.debug("Buscando por padrões de teste...")
-            test_patterns = [
-                r'teste.*passed|test.*passed|teste.*failed|test.*failed',
-                r'test.*success|test.*error|teste.*sucesso|teste.*falha',
-                r'execution.*passed|execution.*failed',
-                r'result.*passed|result.*failed'
-            ]
-            
-            for pattern in test_patterns:
-                elements = soup.find_all(string=re.compile(pattern, re.I))
-                for element in elements:
-                    parent = element.parent
-                    if parent and parent not in test_elements:
-                        test_elements.append(parent)
-        
-        # 6. Se ainda não encontrou nada, buscar por elementos com estrutura específica de teste
-        if not test_elements:
-            logger.debug("Buscando por headers de teste...")
-            test_headers = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'], 
-                                       string=re.compile(r'test|teste', re.I))
-            for header in test_headers:
-                # Pegar o próximo elemento irmão que pode conter o resultado
-                next_sibling = header.find_next_sibling()
-                if next_sibling and next_sibling not in test_elements:
-                    test_elements.append(next_sibling)
-        
-        # 7. Se ainda não encontrou nada, buscar por qualquer div com texto de teste
-        if not test_elements:
-            logger.warning("Nenhum elemento de teste encontrado com métodos específicos, buscando em todas as divs...")
-            all_divs = soup.find_all('div')
-            for div in all_divs:
-                text = div.get_text().lower()
-                if any(keyword in text for keyword in ['test', 'teste', 'passed', 'failed', 'sucesso', 'falha']):
-                    test_elements.append(div)
-        
         logger.info(f"Total de elementos de teste encontrados: {len(test_elements)}")
+        if progresso:
+            progresso(encontrados=len(test_elements), processados=0)
         
         if not test_elements:
             logger.warning("Nenhum elemento de teste encontrado no arquivo")
@@ -2060,63 +3974,22 @@ def processar_arquivo_log(log_path):
         nomes_evidencias = []
         erros_processamento = []
         
+        capturar_reais = os.getenv('CAPTURE_REAL_SCREENSHOTS', 'false').lower() == 'true'
+        tarefas_simuladas = []
+        
         for i, elemento in enumerate(test_elements):
+            if progresso and capturar_reais:
+                progresso(processados=i)
             try:
                 logger.debug(f"Processando elemento {i+1}/{len(test_elements)}")
                 
-                # Determinar se é sucesso ou falha com lógica melhorada
-                texto_elemento = elemento.get_text().lower()
-                html_elemento = str(elemento).lower()
-                
-                # Verificar por classes CSS
-                classes_elemento = elemento.get('class', [])
-                is_sucesso = (
-                    any('pass' in classe.lower() for classe in classes_elemento) or
-                    any('success' in classe.lower() for classe in classes_elemento) or
-                    '✅' in html_elemento or
-                    '✓' in html_elemento
-                )
-                
-                is_falha = (
-                    any('fail' in classe.lower() for classe in classes_elemento) or
-                    any('error' in classe.lower() for classe in classes_elemento) or
-                    '❌' in html_elemento or
-                    '✗' in html_elemento
+                # Código do card e status numa única varredura (classes e ícones têm prioridade sobre o texto)
+                codigo_card, is_sucesso, status_determinado = classificador_evidencias.classificar(
+                    elemento.get_text(), elemento.classes, elemento.icones
                 )
-                
-                # Se não determinou pelas classes, verificar pelo texto
-                if not is_sucesso and not is_falha:
-                    sucesso_keywords = ['pass', 'success', 'sucesso', 'passed', '✅', '✓', 'ok', 'successful']
-                    falha_keywords = ['fail', 'error', 'falha', 'failed', '❌', '✗', 'erro', 'exception', 'timeout']
-                    
-                    is_sucesso = any(palavra in texto_elemento for palavra in sucesso_keywords)
-                    is_falha = any(palavra in texto_elemento for palavra in falha_keywords)
-                
-                # Se ainda não determinou, verificar por padrões mais específicos
-                if not is_sucesso and not is_falha:
-                    # Verificar por padrões como "Status: PASSED" ou "Status: FAILED"
-                    status_patterns = {
-                        'sucesso': [r'status.*pass', r'result.*pass', r'execution.*pass'],
-                        'falha': [r'status.*fail', r'result.*fail', r'execution.*fail', r'error.*occurred']
-                    }
-                    
-                    for status, patterns in status_patterns.items():
-                        for pattern in patterns:
-                            if re.search(pattern, texto_elemento, re.I):
-                                if status == 'sucesso':
-                                    is_sucesso = True
-                                else:
-                                    is_falha = True
-                                break
-                
-                # Se não conseguiu determinar, assumir como sucesso (padrão mais comum)
-                if not is_sucesso and not is_falha:
-                    is_sucesso = True
+                if not status_determinado:
                     logger.debug(f"Status não determinado para elemento {i+1}, assumindo sucesso")
                 
-                # Extrair código do card do texto do elemento
-                codigo_card = extrair_codigo_card(elemento.get_text())
-                
                 # Se não encontrou código, usar nome genérico
                 if not codigo_card:
                     codigo_card = f"TESTE_{i+1:03d}"
@@ -2125,24 +3998,24 @@ def processar_arquivo_log(log_path):
                 # Gerar nome da evidência com código do card
                 if is_sucesso:
                     nome_arquivo = f"{codigo_card}_sucesso.png"
-                    diretorio = "prints_tests/sucessos"
+                    diretorio = os.path.join(base_dir, "sucessos")
                     sucessos += 1
                     logger.debug(f"Elemento {i+1} classificado como SUCESSO: {codigo_card}")
                 else:
                     nome_arquivo = f"{codigo_card}_falha.png"
-                    diretorio = "prints_tests/falhas"
+                    diretorio = os.path.join(base_dir, "falhas")
                     falhas += 1
                     logger.debug(f"Elemento {i+1} classificado como FALHA: {codigo_card}")
                 
                 # Criar screenshot real ou simulado
                 caminho_completo = os.path.join(diretorio, nome_arquivo)
                 
-                if os.getenv('CAPTURE_REAL_SCREENSHOTS', 'false').lower() == 'true':
+                if capturar_reais:
                     logger.debug(f"Criando screenshot real: {caminho_completo}")
                     criar_screenshot_real(caminho_completo, codigo_card, is_sucesso, elemento.get_text())
                 else:
-                    logger.debug(f"Criando screenshot simulado: {caminho_completo}")
-                    criar_screenshot_simulado(caminho_completo, codigo_card, is_sucesso)
+                    # Simulados são gerados em lote depois do loop
+                    tarefas_simuladas.append((caminho_completo, codigo_card, is_sucesso))
                 
                 nomes_evidencias.append({
                     "nome": codigo_card,
@@ -2160,10 +4033,190 @@ def processar_arquivo_log(log_path):
                 })
                 continue
         
-        logger.info(f"Processamento concluído: {sucessos} sucessos, {falhas} falhas")
+        if tarefas_simuladas:
+            logger.info(f"Gerando {len(tarefas_simuladas)} screenshots simulados...")
+            try:
+                gerar_screenshots_simulados(tarefas_simuladas, progresso=progresso)
+            except ImportError:
+                for caminho_completo, codigo_card, is_sucesso in tarefas_simuladas:
+                    criar_screenshot_simulado(caminho_completo, codigo_card, is_sucesso)
+        
+        logger.info(f"Processamento concluído: {sucessos} sucessos, {falhas} falhas")
+        
+        if erros_processamento:
+            logger.warning(f"Erros durante processamento: {len(erros_processamento)} elementos com erro")
+        
+        gravar_manifesto_evidencias(base_dir, nomes_evidencias)
+        
+        return {
+            "sucesso": True,
+            "estatisticas": {
+                "sucessos": sucessos,
+                "falhas": falhas,
+                "total": sucessos + falhas,
+                "elementos_processados": len(test_elements),
+                "erros_processamento": len(erros_processamento)
+            },
+            "nomes_evidencias": nomes_evidencias,
+            "erros_detalhados": erros_processamento,
+            "detalhes_validacao": validacao
+        }
+        
+    except Exception as e:
+        logger.error(f"Erro ao processar arquivo log: {e}", exc_info=True)
+        return {
+            "sucesso": False,
+            "erro": str(e)
+        }
+
+def abrir_output_xml(caminho):
+    """Abre o output.xml do Robot Framework, descompactando se vier em gzip"""
+    import gzip
+    with open(caminho, 'rb') as f:
+        compactado = f.read(2) == b'\x1f\x8b'
+    return gzip.open(caminho, 'rb') if compactado else open(caminho, 'rb')
+
+def duracao_status_robot(status):
+    """Duração em ms de um <status> do Robot (RF 7 usa 'elapsed'; versões anteriores, starttime/endtime)"""
+    elapsed = status.get('elapsed')
+    if elapsed is not None:
+        try:
+            return int(round(float(elapsed) * 1000))
+        except ValueError:
+            return None
+    inicio, fim = status.get('starttime'), status.get('endtime')
+    if not inicio or not fim or 'N/A' in (inicio, fim):
+        return None
+    try:
+        formato = '%Y%m%d %H:%M:%S.%f'
+        return int(round((datetime.strptime(fim, formato) - datetime.strptime(inicio, formato)).total_seconds() * 1000))
+    except ValueError:
+        return None
+
+def ler_testes_output_xml(caminho):
+    """Lê os testes do output.xml em streaming (iterparse), liberando cada elemento já processado.
+
+    Gera dicionários com nome, nome completo (suítes + teste), status, tags e duração em ms.
+    """
+    import xml.etree.ElementTree as ET
+    
+    suites = []
+    teste = None
+    profundidade_teste = None
+    pilha = []
+    
+    with abrir_output_xml(caminho) as f:
+        for evento, elem in ET.iterparse(f, events=('start', 'end')):
+            if evento == 'start':
+                pilha.append(elem.tag)
+                if elem.tag == 'suite':
+                    suites.append(elem.get('name', ''))
+                elif elem.tag == 'test' and teste is None:
+                    teste = {"nome": elem.get('name', ''), "tags": [], "status": None, "duracao_ms": None}
+                    profundidade_teste = len(pilha)
+                continue
+            
+            pilha.pop()
+            if teste is not None:
+                pai_direto = len(pilha) == profundidade_teste
+                if elem.tag == 'tag' and elem.text and (pai_direto or (pilha[-1] == 'tags' and len(pilha) == profundidade_teste + 1)):
+                    teste["tags"].append(elem.text.strip())
+                elif elem.tag == 'status' and pai_direto:
+                    teste["status"] = elem.get('status')
+                    teste["duracao_ms"] = duracao_status_robot(elem)
+                elif elem.tag == 'test' and len(pilha) == profundidade_teste - 1:
+                    teste["nome_completo"] = '.'.join(suites + [teste["nome"]])
+                    yield teste
+                    teste = None
+                    profundidade_teste = None
+                    elem.clear()
+                    continue
+            
+            if elem.tag == 'suite':
+                suites.pop()
+            # Keywords, mensagens e demais nós não são mais necessários depois de fechados
+            if elem.tag in ('kw', 'msg', 'doc', 'arg', 'arguments', 'for', 'if', 'try', 'while', 'iter', 'branch', 'suite', 'statistics', 'errors'):
+                elem.clear()
+
+def codigo_card_teste_robot(teste):
+    """Chave Jira do teste: primeiro pelas [Tags], depois pelo nome; senão, o nome normalizado"""
+    for texto in teste["tags"] + [teste["nome"]]:
+        codigo = classificador_evidencias.extrair_codigo(texto, compacto=False)
+        if codigo:
+            return codigo
+    return re.sub(r'[^\w-]', '_', teste["nome"].strip()) or "TESTE"
+
+def processar_output_xml(caminho, progresso=None, base_dir=None):
+    """Processa o output.xml do Robot Framework sem navegador: status, chaves Jira e tempos vêm direto do XML"""
+    try:
+        inicio = time.perf_counter()
+        print(f"🤖 Lendo output.xml: {caminho}")
+        
+        # Deduplicação por chave: falha prevalece sobre sucesso; empate fica com a primeira ocorrência
+        processados = {}
+        total_testes = 0
+        ignorados = 0
+        for indice, teste in enumerate(ler_testes_output_xml(caminho), start=1):
+            total_testes += 1
+            status = (teste["status"] or "").upper()
+            if status not in ("PASS", "FAIL"):
+                ignorados += 1
+                continue
+            codigo = codigo_card_teste_robot(teste)
+            is_fail = status == "FAIL"
+            anterior = processados.get(codigo)
+            if anterior and (anterior["is_fail"] or not is_fail):
+                continue
+            processados[codigo] = dict(teste, codigo=codigo, is_fail=is_fail, indice=indice)
+        
+        tempo_leitura_ms = int((time.perf_counter() - inicio) * 1000)
+        print(f"🤖 {total_testes} testes lidos em {tempo_leitura_ms} ms")
         
-        if erros_processamento:
-            logger.warning(f"Erros durante processamento: {len(erros_processamento)} elementos com erro")
+        if not total_testes:
+            return {
+                "sucesso": False,
+                "erro": "Nenhum teste encontrado no output.xml"
+            }
+        
+        if progresso:
+            progresso(encontrados=len(processados), processados=0)
+        
+        # Limpar evidências anteriores e gerar as imagens dos testes
+        limpar_evidencias_anteriores(base_dir)
+        base_dir = base_dir or os.path.join(os.getcwd(), 'prints_tests')
+        falhas_dir = os.path.join(base_dir, 'falhas')
+        sucessos_dir = os.path.join(base_dir, 'sucessos')
+        os.makedirs(falhas_dir, exist_ok=True)
+        os.makedirs(sucessos_dir, exist_ok=True)
+        
+        sucessos = 0
+        falhas = 0
+        nomes_evidencias = []
+        tarefas_simuladas = []
+        for teste in sorted(processados.values(), key=lambda t: t["indice"]):
+            is_fail = teste["is_fail"]
+            diretorio = falhas_dir if is_fail else sucessos_dir
+            arquivo = f"{teste['codigo']}.png"
+            tarefas_simuladas.append((os.path.join(diretorio, arquivo), teste['codigo'], not is_fail))
+            
+            if is_fail:
+                falhas += 1
+            else:
+                sucessos += 1
+            
+            nomes_evidencias.append({
+                "nome": teste["codigo"],
+                "arquivo": arquivo,
+                "status": "falha" if is_fail else "sucesso",
+                "diretorio": diretorio,
+                "elemento_index": teste["indice"],
+                "teste": teste["nome_completo"],
+                "tags": teste["tags"],
+                "duracao_ms": teste["duracao_ms"]
+            })
+        
+        gerar_screenshots_simulados(tarefas_simuladas, progresso=progresso)
+        gravar_manifesto_evidencias(base_dir, nomes_evidencias)
         
         return {
             "sucesso": True,
@@ -2171,44 +4224,29 @@ def processar_arquivo_log(log_path):
                 "sucessos": sucessos,
                 "falhas": falhas,
                 "total": sucessos + falhas,
-                "elementos_processados": len(test_elements),
-                "erros_processamento": len(erros_processamento)
+                "elementos_processados": total_testes,
+                "ignorados": ignorados
             },
             "nomes_evidencias": nomes_evidencias,
-            "erros_detalhados": erros_processamento,
-            "detalhes_validacao": validacao
+            "metodo": "output_xml",
+            "tempo_total_ms": int((time.perf_counter() - inicio) * 1000)
         }
-        
+    
     except Exception as e:
-        logger.error(f"Erro ao processar arquivo log: {e}", exc_info=True)
+        print(f"❌ Erro ao processar output.xml: {e}")
         return {
             "sucesso": False,
-            "erro": str(e)
+            "erro": f"output.xml inválido: {e}"
         }
 
-def criar_screenshot_real(caminho_arquivo, nome_teste, is_sucesso):
-    """Cria um screenshot real usando Selenium"""
+def criar_screenshot_real(caminho_arquivo, nome_teste, is_sucesso, detalhes=None):
+    """Cria um screenshot real usando um navegador do pool"""
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
-        from webdriver_manager.chrome import ChromeDriverManager
-        from selenium.webdriver.chrome.service import Service
-        
-        # Configurar Chrome em modo headless
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1024,768")
         
-        # Inicializar driver
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        try:
+        with pool_navegadores.emprestar(largura=1024, altura=768) as driver:
             # Criar uma página HTML simples para o screenshot
             html_content = f"""
             <!DOCTYPE html>
@@ -2275,83 +4313,287 @@ def criar_screenshot_real(caminho_arquivo, nome_teste, is_sucesso):
             
             print(f"Screenshot real criado: {caminho_arquivo}")
             
-        finally:
-            driver.quit()
-            
     except Exception as e:
         print(f"Erro ao criar screenshot real: {e}")
         # Fallback para screenshot simulado
         criar_screenshot_simulado(caminho_arquivo, nome_teste, is_sucesso)
 
-def criar_screenshot_simulado(caminho_arquivo, nome_teste, is_sucesso):
-    """Cria um screenshot simulado para demonstração"""
-    try:
-        # Criar uma imagem simples usando PIL ou gerar um arquivo de texto como placeholder
-        from PIL import Image, ImageDraw, ImageFont
+VERSAO_TEMPLATE_SIMULADO = "3"
+AMBIENTES_SIMULADOS = ['Chrome', 'Firefox', 'Safari', 'Edge']
+SISTEMAS_SIMULADOS = ['Windows 10', 'macOS', 'Ubuntu']
+COR_SUCESSO_SIMULADO = (34, 139, 34)  # Verde mais escuro
+COR_FALHA_SIMULADO = (220, 20, 60)    # Vermelho mais escuro
+
+_templates_simulados = {}
+_paletas_simulados = {}
+_fontes_simulado = {}
+
+def fonte_screenshot_simulado(tamanho):
+    """Fonte TrueType (DejaVu) quando disponível; senão a fonte bitmap padrão do PIL"""
+    if tamanho not in _fontes_simulado:
+        from PIL import ImageFont
+        try:
+            _fontes_simulado[tamanho] = ImageFont.truetype("DejaVuSans.ttf", tamanho)
+        except OSError:
+            _fontes_simulado[tamanho] = ImageFont.load_default()
+    return _fontes_simulado[tamanho]
+
+def _escrever_simulado(draw, posicao, texto, fonte, cor, centralizado=False):
+    from PIL import ImageFont
+    # A fonte bitmap só desenha latin-1
+    if not isinstance(fonte, ImageFont.FreeTypeFont):
+        texto = texto.encode('latin-1', 'replace').decode('latin-1')
+    x, y = posicao
+    if centralizado:
+        x -= draw.textlength(texto, font=fonte) / 2
+    draw.text((x, y), texto, fill=cor, font=fonte)
+
+def template_screenshot_simulado(is_sucesso):
+    """Base pré-renderizada por status (cabeçalho em degradê, borda e textos fixos), cacheada em memória"""
+    chave = bool(is_sucesso)
+    if chave not in _templates_simulados:
+        from PIL import Image, ImageDraw
+        cor = COR_SUCESSO_SIMULADO if is_sucesso else COR_FALHA_SIMULADO
         
-        # Criar imagem 1024x768 (resolução mais comum)
         img = Image.new('RGB', (1024, 768), color='white')
-        draw = ImageDraw.Draw(img)
+        # Degradê do cabeçalho: uma coluna de 100 px esticada na largura
+        coluna = Image.new('RGB', (1, 100))
+        coluna.putdata([tuple(int(c * (1 - y / 100)) for c in cor) for y in range(100)])
+        img.paste(coluna.resize((1024, 100)), (0, 0))
         
-        # Adicionar texto
-        try:
-            # Tentar usar fonte padrão
-            font = ImageFont.load_default()
-            font_large = ImageFont.load_default()
-        except:
-            font = None
-            font_large = None
-        
-        # Definir cores
-        cor_sucesso = (34, 139, 34)  # Verde mais escuro
-        cor_falha = (220, 20, 60)    # Vermelho mais escuro
-        cor = cor_sucesso if is_sucesso else cor_falha
-        
-        # Desenhar cabeçalho com gradiente
-        for y in range(0, 100):
-            alpha = int(255 * (1 - y / 100))
-            cor_gradiente = tuple(int(c * alpha / 255) for c in cor)
-            draw.rectangle([(0, y), (1024, y+1)], fill=cor_gradiente)
-        
-        # Desenhar borda
+        draw = ImageDraw.Draw(img)
         draw.rectangle([(10, 10), (1014, 758)], outline=cor, width=3)
         
-        # Adicionar título principal
-        titulo = f"Evidência de Teste: {nome_teste}"
-        draw.text((512, 60), titulo, fill='white', anchor='mm', font=font_large)
-        
-        # Adicionar status com ícone
-        status = "✅ SUCESSO" if is_sucesso else "❌ FALHA"
-        draw.text((512, 120), status, fill='white', anchor='mm', font=font_large)
-        
-        # Adicionar informações detalhadas
-        info_texto = [
-            f"📋 Teste: {nome_teste}",
-            f"📊 Status: {'PASSED' if is_sucesso else 'FAILED'}",
-            f"📅 Data: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}",
-            f"⏱️  Tempo de execução: {random.randint(1, 15)}.{random.randint(0, 9)}s",
-            f"🖥️  Ambiente: {random.choice(['Chrome', 'Firefox', 'Safari', 'Edge'])} v{random.randint(90, 120)}",
-            f"💻 Sistema: {random.choice(['Windows 10', 'macOS', 'Ubuntu'])}",
-            "",
-            "📸 Esta é uma evidência simulada gerada automaticamente",
-            "pelo sistema de extração de evidências de testes.",
-            "",
-            f"🔍 Detalhes do teste:",
-            f"   • Nome: {nome_teste}",
-            f"   • Resultado: {'Sucesso' if is_sucesso else 'Falha'}",
-            f"   • Timestamp: {datetime.now().isoformat()}",
-            f"   • ID da sessão: {random.randint(10000, 99999)}"
-        ]
+        fonte = fonte_screenshot_simulado(16)
+        fixos = {
+            360: "Esta é uma evidência simulada gerada automaticamente",
+            390: "pelo sistema de extração de evidências de testes.",
+            450: "Detalhes do teste:"
+        }
+        for y_pos, linha in fixos.items():
+            _escrever_simulado(draw, (50, y_pos), linha, fonte, 'black')
+        _templates_simulados[chave] = img
+    return _templates_simulados[chave]
+
+def conteudo_screenshot_simulado(nome_teste, is_sucesso, data=None):
+    """Campos variáveis da evidência simulada, determinísticos por teste: mesmo conteúdo gera a mesma imagem"""
+    aleatorio = random.Random(f"{nome_teste}|{bool(is_sucesso)}")
+    return {
+        "nome": nome_teste,
+        "sucesso": bool(is_sucesso),
+        "data": data or datetime.now().strftime('%d/%m/%Y'),
+        "tempo": f"{aleatorio.randint(1, 15)}.{aleatorio.randint(0, 9)}s",
+        "ambiente": f"{aleatorio.choice(AMBIENTES_SIMULADOS)} v{aleatorio.randint(90, 120)}",
+        "sistema": aleatorio.choice(SISTEMAS_SIMULADOS),
+        "sessao": aleatorio.randint(10000, 99999)
+    }
+
+def chave_screenshot_simulado(conteudo):
+    """Endereço da imagem no cache: hash do conteúdo e da versão do template"""
+    import hashlib
+    dados = json.dumps(conteudo, sort_keys=True, ensure_ascii=False) + VERSAO_TEMPLATE_SIMULADO
+    return hashlib.sha256(dados.encode('utf-8')).hexdigest()
+
+def paleta_screenshot_simulado(is_sucesso):
+    """Paleta fixa por status (calculada uma vez sobre uma evidência de exemplo) para gravar PNG indexado"""
+    chave = bool(is_sucesso)
+    if chave not in _paletas_simulados:
+        from PIL import Image
+        exemplo = compor_screenshot_simulado(conteudo_screenshot_simulado("EXEMPLO-123 Cenário de exemplo", is_sucesso))
+        paleta = exemplo.convert('P', palette=Image.ADAPTIVE, colors=128)
+        # O median cut tira a média das cores e a busca da paleta é aproximada: tons quase brancos ou
+        # quase pretos viram branco/preto exatos para o fundo e o texto não saírem acinzentados
+        cores = paleta.getpalette()[:128 * 3]
+        for indice in range(len(cores) // 3):
+            cor = cores[indice * 3:indice * 3 + 3]
+            for alvo in ((255, 255, 255), (0, 0, 0)):
+                if sum(abs(cor[c] - alvo[c]) for c in range(3)) <= 24:
+                    cores[indice * 3:indice * 3 + 3] = alvo
+        paleta.putpalette(cores)
+        _paletas_simulados[chave] = paleta
+    return _paletas_simulados[chave]
+
+def renderizar_screenshot_simulado(conteudo, caminho_saida):
+    """Renderiza a evidência e grava o PNG indexado na paleta do status (também roda nos processos do pool)"""
+    from PIL import Image
+    img = compor_screenshot_simulado(conteudo)
+    # Quantizar numa paleta já conhecida é bem mais barato que comprimir o RGB inteiro e gera arquivos menores
+    img = img.quantize(palette=paleta_screenshot_simulado(conteudo["sucesso"]), dither=Image.Dither.NONE)
+    
+    # Gravar em arquivo temporário e renomear: leitores nunca veem um PNG pela metade
+    temporario = f"{caminho_saida}.{os.getpid()}.{threading.get_ident()}.tmp"
+    img.save(temporario, format='PNG', compress_level=1)
+    os.replace(temporario, caminho_saida)
+    return caminho_saida
+
+def compor_screenshot_simulado(conteudo):
+    """Compõe o texto variável sobre uma cópia do template do status"""
+    from PIL import ImageDraw
+    is_sucesso = conteudo["sucesso"]
+    img = template_screenshot_simulado(is_sucesso).copy()
+    draw = ImageDraw.Draw(img)
+    
+    fonte_titulo = fonte_screenshot_simulado(22)
+    fonte = fonte_screenshot_simulado(16)
+    _escrever_simulado(draw, (512, 35), f"Evidência de Teste: {conteudo['nome']}", fonte_titulo, 'white', centralizado=True)
+    _escrever_simulado(draw, (512, 108), "SUCESSO" if is_sucesso else "FALHA",
+                       fonte_titulo, COR_SUCESSO_SIMULADO if is_sucesso else COR_FALHA_SIMULADO, centralizado=True)
+    
+    linhas = {
+        150: f"Teste: {conteudo['nome']}",
+        180: f"Status: {'PASSED' if is_sucesso else 'FAILED'}",
+        210: f"Data: {conteudo['data']}",
+        240: f"Tempo de execução: {conteudo['tempo']}",
+        270: f"Ambiente: {conteudo['ambiente']}",
+        300: f"Sistema: {conteudo['sistema']}",
+        480: f"   • Nome: {conteudo['nome']}",
+        510: f"   • Resultado: {'Sucesso' if is_sucesso else 'Falha'}",
+        540: f"   • ID da sessão: {conteudo['sessao']}"
+    }
+    for y_pos, linha in linhas.items():
+        _escrever_simulado(draw, (50, y_pos), linha, fonte, 'black')
+    return img
+
+_pool_render_simulados = None
+_pool_render_lock = threading.Lock()
+
+def obter_pool_render_simulados():
+    """Pool de processos para renderizar evidências simuladas (criado sob demanda e reaproveitado)"""
+    global _pool_render_simulados
+    with _pool_render_lock:
+        if _pool_render_simulados is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: o processo pai tem threads (jobs, pool de navegadores) e fork as copiaria no meio do trabalho
+            _pool_render_simulados = ProcessPoolExecutor(
+                max_workers=EVIDENCIAS_RENDER_PROCESSOS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_pool_render_simulados.shutdown, wait=False, cancel_futures=True)
+        return _pool_render_simulados
+
+def entregar_screenshot_cache(caminho_cache, destino):
+    """Coloca a imagem do cache no destino (hard link; cópia quando o link não é possível)"""
+    import shutil
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    if os.path.exists(destino):
+        os.remove(destino)
+    try:
+        os.link(caminho_cache, destino)
+    except OSError:
+        shutil.copyfile(caminho_cache, destino)
+
+def podar_cache_arquivos(diretorio, maximo, extensoes):
+    """Mantém um diretório de cache com no máximo `maximo` arquivos (remove os menos usados)"""
+    try:
+        with os.scandir(diretorio) as entradas:
+            arquivos = [(entrada.stat().st_mtime, entrada.path) for entrada in entradas if entrada.name.endswith(extensoes)]
+    except OSError:
+        return 0
+    excedente = len(arquivos) - maximo
+    if excedente <= 0:
+        return 0
+    for _, caminho in sorted(arquivos)[:excedente]:
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+    return excedente
+
+def podar_cache_screenshots_simulados():
+    """Mantém o cache de imagens simuladas dentro de EVIDENCIAS_CACHE_IMAGENS_MAX (remove as menos usadas)"""
+    return podar_cache_arquivos(EVIDENCIAS_CACHE_IMAGENS_DIR, EVIDENCIAS_CACHE_IMAGENS_MAX, ('.png',))
+
+def gerar_screenshots_simulados(tarefas, progresso=None):
+    """Gera evidências simuladas em lote a partir de (caminho_arquivo, nome_teste, is_sucesso).
+
+    Imagens de mesmo conteúdo são reaproveitadas do cache endereçado por conteúdo; as que faltam são
+    renderizadas uma única vez cada, em paralelo no pool de processos quando o lote é grande.
+    """
+    inicio = time.perf_counter()
+    os.makedirs(EVIDENCIAS_CACHE_IMAGENS_DIR, exist_ok=True)
+    data = datetime.now().strftime('%d/%m/%Y')
+    
+    pendentes = {}  # chave -> (conteudo, caminho_cache, destinos)
+    estado = {"entregues": 0, "reaproveitados": 0, "erros": 0}
+    
+    def entregar(caminho_cache, destinos):
+        for destino in destinos:
+            try:
+                entregar_screenshot_cache(caminho_cache, destino)
+            except OSError as e:
+                print(f"Erro ao criar screenshot: {e}")
+                estado["erros"] += 1
+            estado["entregues"] += 1
+            if progresso:
+                progresso(processados=estado["entregues"])
+    
+    for caminho_arquivo, nome_teste, is_sucesso in tarefas:
+        conteudo = conteudo_screenshot_simulado(nome_teste, is_sucesso, data)
+        chave = chave_screenshot_simulado(conteudo)
+        if chave in pendentes:
+            pendentes[chave][2].append(caminho_arquivo)
+            estado["reaproveitados"] += 1
+            continue
+        caminho_cache = os.path.join(EVIDENCIAS_CACHE_IMAGENS_DIR, f"{chave}.png")
+        if os.path.exists(caminho_cache):
+            # Marca o uso para a poda manter as imagens mais recentes
+            os.utime(caminho_cache)
+            estado["reaproveitados"] += 1
+            entregar(caminho_cache, [caminho_arquivo])
+            continue
+        pendentes[chave] = (conteudo, caminho_cache, [caminho_arquivo])
+    
+    renderizados = 0
+    if pendentes:
+        executor = None
+        if len(pendentes) >= EVIDENCIAS_RENDER_MIN_PARALELO and EVIDENCIAS_RENDER_PROCESSOS > 1:
+            try:
+                executor = obter_pool_render_simulados()
+            except Exception as e:
+                print(f"⚠️ Pool de renderização indisponível, renderizando no processo atual: {e}")
         
-        y_pos = 150
-        for linha in info_texto:
-            draw.text((50, y_pos), linha, fill='black', font=font)
-            y_pos += 30
+        if executor:
+            from concurrent.futures import as_completed
+            futuros = {
+                executor.submit(renderizar_screenshot_simulado, conteudo, caminho_cache): chave
+                for chave, (conteudo, caminho_cache, _) in pendentes.items()
+            }
+            for futuro in as_completed(futuros):
+                _, caminho_cache, destinos = pendentes[futuros[futuro]]
+                try:
+                    futuro.result()
+                    renderizados += 1
+                    entregar(caminho_cache, destinos)
+                except Exception as e:
+                    print(f"Erro ao criar screenshot: {e}")
+                    estado["erros"] += len(destinos)
+        else:
+            for conteudo, caminho_cache, destinos in pendentes.values():
+                try:
+                    renderizar_screenshot_simulado(conteudo, caminho_cache)
+                    renderizados += 1
+                    entregar(caminho_cache, destinos)
+                except Exception as e:
+                    print(f"Erro ao criar screenshot: {e}")
+                    estado["erros"] += len(destinos)
         
-        # Salvar imagem
-        img.save(caminho_arquivo)
+        podar_cache_screenshots_simulados()
+    
+    tempo_ms = int((time.perf_counter() - inicio) * 1000)
+    print(f"🖼️ Evidências simuladas: {renderizados} renderizadas, {estado['reaproveitados']} reaproveitadas do cache em {tempo_ms} ms")
+    return {
+        "renderizados": renderizados,
+        "reaproveitados": estado["reaproveitados"],
+        "erros": estado["erros"],
+        "tempo_ms": tempo_ms
+    }
+
+def criar_screenshot_simulado(caminho_arquivo, nome_teste, is_sucesso):
+    """Cria um screenshot simulado para demonstração"""
+    try:
+        gerar_screenshots_simulados([(caminho_arquivo, nome_teste, is_sucesso)])
         print(f"Screenshot criado: {caminho_arquivo}")
-        
     except ImportError:
         # Se PIL não estiver disponível, criar arquivo de texto
         with open(caminho_arquivo.replace('.png', '.txt'), 'w') as f:
@@ -2362,8 +4604,6 @@ def criar_screenshot_simulado(caminho_arquivo, nome_teste, is_sucesso):
     except Exception as e:
         print(f"Erro ao criar screenshot: {e}")
 
-
-
 @app.route('/api/evidencias/enviar', methods=['POST'])
 def enviar_evidencias_jira():
     """Envia evidências processadas para o Jira"""
@@ -2388,125 +4628,71 @@ def enviar_evidencias_jira():
         if not all([JIRA_BASE_URL, JIRA_EMAIL, JIRA_API_TOKEN]):
             return jsonify({"erro": "Configurações do Jira incompletas"}), 500
         
-        # Contar arquivos processados
-        falhas_dir = os.path.join('prints_tests', 'falhas')
-        sucessos_dir = os.path.join('prints_tests', 'sucessos')
-        
-        falhas_count = len([f for f in os.listdir(falhas_dir) if f.endswith(('.png', '.txt'))]) if os.path.exists(falhas_dir) else 0
-        sucessos_count = len([f for f in os.listdir(sucessos_dir) if f.endswith(('.png', '.txt'))]) if os.path.exists(sucessos_dir) else 0
+        # Contar arquivos processados (no workspace do upload)
+        base_dir = resolver_workspace_evidencias(data.get('workspace_id'))
+        if not base_dir:
+            return jsonify({"erro": "Workspace de evidências não encontrado ou expirado"}), 404
+        manifesto = carregar_manifesto_evidencias(base_dir)
         
-        total_enviados = falhas_count + sucessos_count
+        total_enviados = manifesto.contagem("falha") + manifesto.contagem("sucesso")
         
         if total_enviados == 0:
             return jsonify({"erro": "Nenhuma evidência encontrada para envio"}), 400
         
-        # Verificar se as issues existem
-        headers = {
-            "Accept": "application/json",
-            "Authorization": f"Basic {base64.b64encode(f'{JIRA_EMAIL}:{JIRA_API_TOKEN}'.encode()).decode()}"
-        }
+        # Concorrência configurável, limitada ao tamanho do pool de conexões do Jira
+        try:
+            concorrencia = int(data.get('concorrencia') or EVIDENCIAS_ENVIO_CONCORRENCIA)
+        except (TypeError, ValueError):
+            concorrencia = EVIDENCIAS_ENVIO_CONCORRENCIA
+        concorrencia = max(1, min(concorrencia, JIRA_POOL_SIZE))
         
-        issues_validas = []
-        for key in issue_keys:
-            issue_url = f"{JIRA_BASE_URL}/rest/api/3/issue/{key}"
-            issue_response = requests.get(issue_url, headers=headers)
-            if issue_response.status_code == 200:
-                issues_validas.append(key)
-            else:
-                print(f"Issue {key} não encontrada (status: {issue_response.status_code})")
+        # Consolidado: um upload multipart e um comentário por issue, em vez de 2 chamadas por arquivo
+        consolidado = data.get('consolidado')
+        consolidado = EVIDENCIAS_ENVIO_CONSOLIDADO if consolidado is None else bool(consolidado)
+        
+        inicio = time.perf_counter()
+        
+        # Verificar se as issues existem (uma única busca JQL)
+        issue_keys = list(dict.fromkeys(issue_keys))
+        issues_validas, issues_nao_encontradas = validar_issues_existentes(issue_keys)
+        for key in issues_nao_encontradas:
+            print(f"Issue {key} não encontrada")
+        tempo_validacao_ms = int((time.perf_counter() - inicio) * 1000)
         
         if not issues_validas:
             return jsonify({"erro": "Nenhuma issue válida encontrada"}), 404
         
-        # Preparar dados para upload
-        detalhes_upload = []
-        total_processados = 0
-        total_enviados = 0
-        
-        # Processar cada issue válida
-        for issue_key in issues_validas:
-            print(f"Processando issue: {issue_key}")
-            
-            # Encontrar arquivos específicos para esta issue
-            arquivos_issue = []
-            
-            # Buscar em falhas
-            if os.path.exists(falhas_dir):
-                for arquivo in os.listdir(falhas_dir):
-                    if arquivo.startswith(issue_key) and arquivo.endswith('.png'):
-                        arquivos_issue.append({
-                            "arquivo": arquivo,
-                            "caminho": os.path.join(falhas_dir, arquivo),
-                            "tipo": "falha"
-                        })
-            
-            # Buscar em sucessos
-            if os.path.exists(sucessos_dir):
-                for arquivo in os.listdir(sucessos_dir):
-                    if arquivo.startswith(issue_key) and arquivo.endswith('.png'):
-                        arquivos_issue.append({
-                            "arquivo": arquivo,
-                            "caminho": os.path.join(sucessos_dir, arquivo),
-                            "tipo": "sucesso"
-                        })
+        # Arquivos de cada issue direto do índice do manifesto
+        arquivos_por_issue = manifesto.arquivos_por_issue(issues_validas)
+        
+        if consolidado:
+            # Uma tarefa por issue: anexos num único multipart e um comentário com todas as imagens
+            issues_com_arquivos = [key for key in issues_validas if arquivos_por_issue[key]]
+            with ThreadPoolExecutor(max_workers=max(1, min(concorrencia, len(issues_com_arquivos) or 1))) as executor:
+                resultados = list(executor.map(
+                    lambda key: enviar_evidencias_consolidadas_issue(key, arquivos_por_issue[key]), issues_com_arquivos
+                ))
+            detalhes_upload = [detalhe for detalhes, _ in resultados for detalhe in detalhes]
+            operacoes = [operacao for _, operacoes_issue in resultados for operacao in operacoes_issue]
+        else:
+            itens = []
+            for issue_key in issues_validas:
+                print(f"Processando issue: {issue_key}")
+                for ordem, arquivo_info in enumerate(arquivos_por_issue[issue_key]):
+                    itens.append(dict(arquivo_info, issue_key=issue_key, ordem=ordem))
             
-            # Upload dos arquivos para esta issue
-            for arquivo_info in arquivos_issue:
-                try:
-                    # Upload do arquivo para o Jira
-                    image_meta = upload_arquivo_jira(issue_key, arquivo_info["caminho"], headers)
-                    
-                    if image_meta:
-                        # Definir mensagem e tipo de painel baseado no tipo de evidência
-                        if arquivo_info["tipo"] == "sucessos":
-                            mensagem = [
-                                {"type": "text", "text": "TESTE AUTOMAÇÃO ", "marks": [{"type": "strong"}]},
-                                {"type": "text", "text": "APROVADO", "marks": [{"type": "strong"}]}
-                            ]
-                            tipo_painel = "success"
-                        else:  # falhas
-                            mensagem = [
-                                {"type": "text", "text": "TESTE AUTOMAÇÃO ", "marks": [{"type": "strong"}]},
-                                {"type": "text", "text": "REPROVADO", "marks": [{"type": "strong"}]}
-                            ]
-                            tipo_painel = "error"
-                        
-                        # Adicionar comentário com imagem
-                        comentario_success = comentar_com_imagem(issue_key, mensagem, tipo_painel, image_meta, headers)
-                        
-                        detalhes_upload.append({
-                            "issue_key": issue_key,
-                            "arquivo": arquivo_info["arquivo"],
-                            "tipo": arquivo_info["tipo"],
-                            "sucesso": comentario_success,
-                            "anexo_id": image_meta["id"]
-                        })
-                        total_processados += 1
-                        if comentario_success:
-                            total_enviados += 1
-                    else:
-                        detalhes_upload.append({
-                            "issue_key": issue_key,
-                            "arquivo": arquivo_info["arquivo"],
-                            "tipo": arquivo_info["tipo"],
-                            "sucesso": False,
-                            "erro": "Falha no upload do anexo"
-                        })
-                        total_processados += 1
-                        
-                except Exception as e:
-                    detalhes_upload.append({
-                        "issue_key": issue_key,
-                        "arquivo": arquivo_info["arquivo"],
-                        "tipo": arquivo_info["tipo"],
-                        "sucesso": False,
-                        "erro": str(e)
-                    })
-                    total_processados += 1
+            # Uploads em paralelo; comentários de cada issue na ordem dos arquivos
+            turnos = {issue_key: TurnoIssue() for issue_key in issues_validas}
+            with ThreadPoolExecutor(max_workers=max(1, min(concorrencia, len(itens) or 1))) as executor:
+                detalhes_upload = list(executor.map(lambda item: enviar_evidencia_issue(item, turnos[item["issue_key"]]), itens))
+            operacoes = operacoes_envio_individual(detalhes_upload)
+        
+        tempo_total_ms = int((time.perf_counter() - inicio) * 1000)
+        total_processados = len(detalhes_upload)
+        total_enviados = len([d for d in detalhes_upload if d['sucesso']])
         
         # Resumo do processamento
-        sucessos_upload = len([d for d in detalhes_upload if d['sucesso']])
-        issues_processadas = list(set([d['issue_key'] for d in detalhes_upload]))
+        issues_processadas = list(dict.fromkeys(d['issue_key'] for d in detalhes_upload))
         
         print(f"\n📊 RESUMO DO ENVIO:")
         print(f"   📋 Issues processadas: {len(issues_processadas)}")
@@ -2519,24 +4705,150 @@ def enviar_evidencias_jira():
             sucessos_issue = len([d for d in arquivos_issue if d['sucesso']])
             print(f"   🎯 {issue_key}: {sucessos_issue}/{len(arquivos_issue)} evidências enviadas")
         
+        desempenho = resumir_desempenho_envio(detalhes_upload, operacoes, concorrencia, tempo_total_ms, tempo_validacao_ms)
+        desempenho["modo"] = "consolidado" if consolidado else "individual"
+        print(f"   ⏱️ {tempo_total_ms} ms, {desempenho['arquivos_por_segundo']} arquivos/s com concorrência {concorrencia}")
+        
         return jsonify({
             "sucesso": True,
             "mensagem": f"Evidências enviadas com sucesso para {len(issues_processadas)} card(s)",
             "enviados": total_enviados,
             "total_processados": total_processados,
             "issues_processadas": issues_processadas,
+            "issues_nao_encontradas": issues_nao_encontradas,
             "estatisticas": {
-                "falhas": falhas_count,
-                "sucessos": sucessos_count
+                "falhas": manifesto.contagem("falha"),
+                "sucessos": manifesto.contagem("sucesso")
             },
-            "detalhes": detalhes_upload
+            "detalhes": detalhes_upload,
+            "desempenho": desempenho
         })
             
     except Exception as e:
         print(f"Erro no envio de evidências: {str(e)}")
         return jsonify({"erro": str(e)}), 500
 
-def upload_arquivo_jira(issue_key, caminho_arquivo, headers):
+MENSAGENS_EVIDENCIA = {
+    "sucesso": ("APROVADO", "success"),
+    "falha": ("REPROVADO", "error")
+}
+
+def mensagem_evidencia(tipo):
+    """Texto em negrito e tipo de painel do comentário conforme o resultado da evidência"""
+    resultado, tipo_painel = MENSAGENS_EVIDENCIA.get(tipo, MENSAGENS_EVIDENCIA["falha"])
+    mensagem = [
+        {"type": "text", "text": "TESTE AUTOMAÇÃO ", "marks": [{"type": "strong"}]},
+        {"type": "text", "text": resultado, "marks": [{"type": "strong"}]}
+    ]
+    return mensagem, tipo_painel
+
+def validar_issues_existentes(issue_keys):
+    """Valida as chaves com uma busca `key in (...)` por lote; retorna (válidas, não encontradas) na ordem recebida"""
+    encontradas = set()
+    for inicio in range(0, len(issue_keys), JIRA_SEARCH_PAGE_SIZE):
+        lote = issue_keys[inicio:inicio + JIRA_SEARCH_PAGE_SIZE]
+        # validateQuery=warn: chaves inexistentes viram aviso em vez de invalidar a busca inteira
+        response = jira_client.search(f"key in ({', '.join(lote)})", fields=["key"],
+                                      max_results=len(lote), validateQuery="warn")
+        if response.status_code == 200:
+            encontradas.update(issue["key"] for issue in response.json().get("issues", []))
+            continue
+        
+        print(f"⚠️ Busca de validação falhou ({response.status_code}), validando as issues individualmente")
+        with ThreadPoolExecutor(max_workers=max(1, min(JIRA_BATCH_CONCURRENCY, len(lote)))) as executor:
+            status = list(executor.map(
+                lambda key: jira_client.get(f"/rest/api/3/issue/{key}", params={"fields": "key"}).status_code, lote
+            ))
+        encontradas.update(key for key, status_code in zip(lote, status) if status_code == 200)
+    
+    validas = [key for key in issue_keys if key in encontradas]
+    return validas, [key for key in issue_keys if key not in encontradas]
+
+class TurnoIssue:
+    """Garante que os comentários de uma issue sejam publicados na ordem dos arquivos"""
+    
+    def __init__(self):
+        self.proximo = 0
+        self.condicao = threading.Condition()
+    
+    @contextmanager
+    def vez(self, ordem):
+        with self.condicao:
+            self.condicao.wait_for(lambda: self.proximo == ordem)
+        try:
+            yield
+        finally:
+            with self.condicao:
+                self.proximo += 1
+                self.condicao.notify_all()
+
+def enviar_evidencia_issue(item, turno):
+    """Anexa uma evidência e comenta na issue (o upload corre em paralelo; o comentário espera a sua vez)"""
+    issue_key = item["issue_key"]
+    detalhe = {
+        "issue_key": issue_key,
+        "arquivo": item["arquivo"],
+        "tipo": item["tipo"],
+        "sucesso": False
+    }
+    image_meta = None
+    try:
+        inicio = time.perf_counter()
+        detalhe["bytes"] = os.path.getsize(item["caminho"]) if os.path.exists(item["caminho"]) else 0
+        image_meta = upload_arquivo_jira(issue_key, item["caminho"])
+        detalhe["latencia_upload_ms"] = int((time.perf_counter() - inicio) * 1000)
+    except Exception as e:
+        detalhe["erro"] = str(e)
+    
+    # Os itens são enfileirados em ordem, então o anterior desta issue já está em andamento
+    with turno.vez(item["ordem"]):
+        if "erro" in detalhe:
+            return detalhe
+        if not image_meta:
+            detalhe["erro"] = "Falha no upload do anexo"
+            return detalhe
+        detalhe["anexo_id"] = image_meta["id"]
+        try:
+            inicio = time.perf_counter()
+            mensagem, tipo_painel = mensagem_evidencia(item["tipo"])
+            detalhe["sucesso"] = comentar_com_imagem(issue_key, mensagem, tipo_painel, image_meta)
+            detalhe["latencia_comentario_ms"] = int((time.perf_counter() - inicio) * 1000)
+        except Exception as e:
+            detalhe["erro"] = str(e)
+    return detalhe
+
+def operacoes_envio_individual(detalhes):
+    """Operações (tipo, latência, chamadas) do envio arquivo a arquivo, para o resumo de desempenho"""
+    operacoes = []
+    for detalhe in detalhes:
+        if "latencia_upload_ms" in detalhe:
+            operacoes.append({"tipo": "upload", "latencia_ms": detalhe["latencia_upload_ms"], "chamadas": 1})
+        if "latencia_comentario_ms" in detalhe:
+            operacoes.append({"tipo": "comentario", "latencia_ms": detalhe["latencia_comentario_ms"], "chamadas": 1})
+    return operacoes
+
+def resumir_desempenho_envio(detalhes, operacoes, concorrencia, tempo_total_ms, tempo_validacao_ms):
+    """Vazão e latências do envio, para dimensionar a concorrência"""
+    segundos = max(tempo_total_ms, 1) / 1000
+    uploads = [op["latencia_ms"] for op in operacoes if op["tipo"] == "upload"]
+    comentarios = [op["latencia_ms"] for op in operacoes if op["tipo"] == "comentario"]
+    total_bytes = sum(d.get("bytes", 0) for d in detalhes)
+    return {
+        "concorrencia": concorrencia,
+        "tempo_total_ms": tempo_total_ms,
+        "tempo_validacao_ms": tempo_validacao_ms,
+        "arquivos": len(detalhes),
+        "bytes_enviados": total_bytes,
+        "arquivos_por_segundo": round(len(detalhes) / segundos, 2),
+        "kb_por_segundo": round(total_bytes / 1024 / segundos, 1),
+        "chamadas_api": 1 + sum(op["chamadas"] for op in operacoes),
+        "latencia_media_upload_ms": round(sum(uploads) / len(uploads), 1) if uploads else None,
+        "latencia_max_upload_ms": max(uploads) if uploads else None,
+        "latencia_media_comentario_ms": round(sum(comentarios) / len(comentarios), 1) if comentarios else None,
+        "latencia_max_comentario_ms": max(comentarios) if comentarios else None
+    }
+
+def upload_arquivo_jira(issue_key, caminho_arquivo):
     """Faz upload de um arquivo para uma issue do Jira e retorna os metadados"""
     try:
         # Verificar se o arquivo existe
@@ -2550,16 +4862,14 @@ def upload_arquivo_jira(issue_key, caminho_arquivo, headers):
             return None
         
         # Preparar upload
-        upload_url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}/attachments"
-        
         with open(caminho_arquivo, 'rb') as f:
             files = {'file': (os.path.basename(caminho_arquivo), f, 'image/png')}
-            upload_headers = {
-                "X-Atlassian-Token": "no-check",
-                "Authorization": headers["Authorization"]
-            }
             
-            response = requests.post(upload_url, headers=upload_headers, files=files)
+            response = jira_client.post(
+                f"/rest/api/3/issue/{issue_key}/attachments",
+                headers={"X-Atlassian-Token": "no-check"},
+                files=files
+            )
             
             if response.status_code in [200, 201]:
                 result = response.json()[0]
@@ -2577,14 +4887,26 @@ def upload_arquivo_jira(issue_key, caminho_arquivo, headers):
         print(f"Erro ao fazer upload de {caminho_arquivo}: {e}")
         return None
 
-def comentar_com_imagem(issue_key, mensagem, tipo_painel, image_meta, headers):
+def bloco_midia_anexo(image_meta):
+    """Nó ADF mediaSingle apontando para o conteúdo de um anexo"""
+    image_url = f"{JIRA_BASE_URL}/rest/api/3/attachment/content/{image_meta['id']}"
+    return {
+        "type": "mediaSingle",
+        "attrs": {"layout": "center"},
+        "content": [
+            {
+                "type": "media",
+                "attrs": {
+                    "type": "external",
+                    "url": image_url
+                }
+            }
+        ]
+    }
+
+def comentar_com_imagem(issue_key, mensagem, tipo_painel, image_meta):
     """Adiciona comentário no Jira com imagem formatada"""
     try:
-        url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}/comment"
-        comment_headers = {"Content-Type": "application/json", "Authorization": headers["Authorization"]}
-
-        image_url = f"{JIRA_BASE_URL}/rest/api/3/attachment/content/{image_meta['id']}"
-
         body = {
             "type": "doc",
             "version": 1,
@@ -2596,23 +4918,11 @@ def comentar_com_imagem(issue_key, mensagem, tipo_painel, image_meta, headers):
                         {"type": "paragraph", "content": mensagem}
                     ]
                 },
-                {
-                    "type": "mediaSingle",
-                    "attrs": {"layout": "center"},
-                    "content": [
-                        {
-                            "type": "media",
-                            "attrs": {
-                                "type": "external",
-                                "url": image_url
-                            }
-                        }
-                    ]
-                }
+                bloco_midia_anexo(image_meta)
             ]
         }
 
-        response = requests.post(url, json={"body": body}, headers=comment_headers)
+        response = jira_client.post(f"/rest/api/3/issue/{issue_key}/comment", json={"body": body})
         
         if response.status_code in [200, 201]:
             print(f"[COMENTÁRIO] 🖼️ Adicionado em {issue_key}")
@@ -2626,6 +4936,130 @@ def comentar_com_imagem(issue_key, mensagem, tipo_painel, image_meta, headers):
         print(f"Erro ao adicionar comentário em {issue_key}: {e}")
         return False
 
+def upload_arquivos_jira(issue_key, caminhos):
+    """Anexa vários arquivos numa única requisição multipart (em lotes de até EVIDENCIAS_UPLOAD_LOTE_MB).
+
+    Retorna (metadados na ordem dos caminhos, com None para os que falharam; número de chamadas feitas).
+    """
+    from contextlib import ExitStack
+    from collections import defaultdict, deque
+    
+    metas = [None] * len(caminhos)
+    limite = EVIDENCIAS_UPLOAD_LOTE_MB * 1024 * 1024
+    lotes, lote_atual, tamanho_lote = [], [], 0
+    for indice, caminho in enumerate(caminhos):
+        if not os.path.exists(caminho):
+            continue
+        tamanho = os.path.getsize(caminho)
+        if tamanho > 10 * 1024 * 1024:  # 10MB
+            print(f"Arquivo {caminho} muito grande: {tamanho} bytes")
+            continue
+        if lote_atual and tamanho_lote + tamanho > limite:
+            lotes.append(lote_atual)
+            lote_atual, tamanho_lote = [], 0
+        lote_atual.append(indice)
+        tamanho_lote += tamanho
+    if lote_atual:
+        lotes.append(lote_atual)
+    
+    chamadas = 0
+    for lote in lotes:
+        try:
+            with ExitStack() as pilha:
+                files = [
+                    ('file', (os.path.basename(caminhos[i]), pilha.enter_context(open(caminhos[i], 'rb')), 'image/png'))
+                    for i in lote
+                ]
+                chamadas += 1
+                response = jira_client.post(
+                    f"/rest/api/3/issue/{issue_key}/attachments",
+                    headers={"X-Atlassian-Token": "no-check"},
+                    files=files
+                )
+            if response.status_code not in [200, 201]:
+                print(f"[ERRO] ❌ Erro ao anexar em {issue_key}: {response.status_code}")
+                print(f"[RESPOSTA] {response.text}")
+                continue
+            
+            # Associar cada anexo devolvido ao arquivo de mesmo nome (na ordem, para nomes repetidos)
+            por_nome = defaultdict(deque)
+            for i in lote:
+                por_nome[os.path.basename(caminhos[i])].append(i)
+            for anexo in response.json():
+                fila = por_nome.get(anexo["filename"])
+                if fila:
+                    metas[fila.popleft()] = {"filename": anexo["filename"], "id": anexo["id"]}
+            print(f"[ANEXO] 📎 {len(lote)} arquivo(s) enviados para {issue_key} numa requisição")
+        except Exception as e:
+            print(f"Erro ao fazer upload em lote para {issue_key}: {e}")
+    return metas, chamadas
+
+def comentar_com_imagens(issue_key, grupos):
+    """Um único comentário com um painel por resultado (falhas, sucessos) seguido das respectivas imagens"""
+    try:
+        content = []
+        for tipo, image_metas in grupos:
+            if not image_metas:
+                continue
+            mensagem, tipo_painel = mensagem_evidencia(tipo)
+            mensagem = mensagem + [{"type": "text", "text": f" ({len(image_metas)} evidência(s))"}]
+            content.append({
+                "type": "panel",
+                "attrs": {"panelType": tipo_painel},
+                "content": [{"type": "paragraph", "content": mensagem}]
+            })
+            content.extend(bloco_midia_anexo(image_meta) for image_meta in image_metas)
+        
+        body = {"type": "doc", "version": 1, "content": content}
+        response = jira_client.post(f"/rest/api/3/issue/{issue_key}/comment", json={"body": body})
+        
+        if response.status_code in [200, 201]:
+            print(f"[COMENTÁRIO] 🖼️ Resumo com {sum(len(m) for _, m in grupos)} imagem(ns) adicionado em {issue_key}")
+            return True
+        print(f"[ERRO] ⚠️ Erro ao adicionar comentário em {issue_key}: {response.status_code}")
+        print(f"[RESPOSTA] {response.text}")
+        return False
+    
+    except Exception as e:
+        print(f"Erro ao adicionar comentário em {issue_key}: {e}")
+        return False
+
+def enviar_evidencias_consolidadas_issue(issue_key, arquivos):
+    """Envia todas as evidências de uma issue com um upload multipart e um comentário-resumo"""
+    print(f"Processando issue (consolidado): {issue_key}")
+    detalhes = [{
+        "issue_key": issue_key,
+        "arquivo": arquivo["arquivo"],
+        "tipo": arquivo["tipo"],
+        "sucesso": False,
+        "bytes": os.path.getsize(arquivo["caminho"]) if os.path.exists(arquivo["caminho"]) else 0
+    } for arquivo in arquivos]
+    operacoes = []
+    
+    inicio = time.perf_counter()
+    metas, chamadas = upload_arquivos_jira(issue_key, [arquivo["caminho"] for arquivo in arquivos])
+    operacoes.append({"tipo": "upload", "latencia_ms": int((time.perf_counter() - inicio) * 1000), "chamadas": chamadas})
+    
+    grupos = [
+        (tipo, [meta for arquivo, meta in zip(arquivos, metas) if meta and arquivo["tipo"] == tipo])
+        for tipo in ("falha", "sucesso")
+    ]
+    comentado = False
+    if any(image_metas for _, image_metas in grupos):
+        inicio = time.perf_counter()
+        comentado = comentar_com_imagens(issue_key, grupos)
+        operacoes.append({"tipo": "comentario", "latencia_ms": int((time.perf_counter() - inicio) * 1000), "chamadas": 1})
+    
+    for detalhe, meta in zip(detalhes, metas):
+        if not meta:
+            detalhe["erro"] = "Falha no upload do anexo"
+            continue
+        detalhe["anexo_id"] = meta["id"]
+        detalhe["sucesso"] = comentado
+        if not comentado:
+            detalhe["erro"] = "Falha ao adicionar o comentário-resumo"
+    return detalhes, operacoes
+
 @app.route('/evidencias')
 def evidencias_page():
     """Página dedicada para extração de evidências"""
@@ -2633,19 +5067,22 @@ def evidencias_page():
 
 @app.route('/api/evidencias/status')
 def status_evidencias():
-    """Retorna status das evidências processadas"""
+    """Retorna status das evidências processadas (do workspace_id informado)"""
     try:
-        falhas_dir = os.path.join('prints_tests', 'falhas')
-        sucessos_dir = os.path.join('prints_tests', 'sucessos')
-        
-        falhas_count = len([f for f in os.listdir(falhas_dir) if f.endswith(('.png', '.txt'))]) if os.path.exists(falhas_dir) else 0
-        sucessos_count = len([f for f in os.listdir(sucessos_dir) if f.endswith(('.png', '.txt'))]) if os.path.exists(sucessos_dir) else 0
+        base_dir = resolver_workspace_evidencias(request.args.get('workspace_id'))
+        if not base_dir:
+            return jsonify({"erro": "Workspace de evidências não encontrado ou expirado"}), 404
+        manifesto = carregar_manifesto_evidencias(base_dir)
+        falhas_count = manifesto.contagem("falha")
+        sucessos_count = manifesto.contagem("sucesso")
         
         return jsonify({
             "falhas": falhas_count,
             "sucessos": sucessos_count,
             "total": falhas_count + sucessos_count,
-            "processado": (falhas_count + sucessos_count) > 0
+            "processado": (falhas_count + sucessos_count) > 0,
+            "execucao": manifesto.execucao,
+            "gerado_em": manifesto.gerado_em
         })
         
     except Exception as e:
@@ -2659,36 +5096,25 @@ def status_evidencias():
 
 @app.route('/api/evidencias/lista')
 def lista_evidencias():
-    """Retorna lista das evidências processadas"""
+    """Retorna lista das evidências processadas (do workspace_id informado)"""
     try:
-        falhas_dir = os.path.join('prints_tests', 'falhas')
-        sucessos_dir = os.path.join('prints_tests', 'sucessos')
-        
-        evidencias = []
-        
-        # Adicionar evidências de sucesso
-        if os.path.exists(sucessos_dir):
-            for arquivo in os.listdir(sucessos_dir):
-                if arquivo.endswith('.png'):
-                    nome = arquivo.replace('_sucesso.png', '').replace('.png', '')
-                    evidencias.append({
-                        "nome": nome,
-                        "arquivo": arquivo,
-                        "status": "sucesso",
-                        "diretorio": "sucessos"
-                    })
-        
-        # Adicionar evidências de falha
-        if os.path.exists(falhas_dir):
-            for arquivo in os.listdir(falhas_dir):
-                if arquivo.endswith('.png'):
-                    nome = arquivo.replace('_falha.png', '').replace('.png', '')
-                    evidencias.append({
-                        "nome": nome,
-                        "arquivo": arquivo,
-                        "status": "falha",
-                        "diretorio": "falhas"
-                    })
+        base_dir = resolver_workspace_evidencias(request.args.get('workspace_id'))
+        if not base_dir:
+            return jsonify({"erro": "Workspace de evidências não encontrado ou expirado"}), 404
+        manifesto = carregar_manifesto_evidencias(base_dir)
+        
+        # Sucessos e depois falhas, como na listagem dos diretórios
+        evidencias = [
+            {
+                "nome": evidencia["nome"],
+                "arquivo": evidencia["arquivo"],
+                "status": evidencia["status"],
+                "diretorio": evidencia["diretorio"],
+                # Versão do conteúdo: URLs com ?v= podem ficar em cache no navegador indefinidamente
+                "versao": evidencia["sha256"][:16] if evidencia.get("sha256") else None
+            }
+            for status in ("sucesso", "falha") for evidencia in manifesto.imagens(status)
+        ]
         
         return jsonify({
             "sucesso": True,
@@ -2707,9 +5133,21 @@ def lista_evidencias():
 
 @app.route('/api/evidencias/limpar', methods=['POST'])
 def limpar_evidencias():
-    """Limpa todas as evidências processadas"""
+    """Limpa as evidências processadas; com workspace_id, remove o workspace inteiro"""
     try:
-        arquivos_removidos = limpar_evidencias_anteriores()
+        import shutil
+        
+        workspace_id = (request.get_json(silent=True) or {}).get('workspace_id')
+        base_dir = resolver_workspace_evidencias(workspace_id)
+        if not base_dir:
+            # Workspace já coletado: nada a limpar
+            return jsonify({"sucesso": True, "mensagem": "Workspace já removido", "arquivos_removidos": 0})
+        if workspace_id and workspace_em_uso(workspace_id):
+            return jsonify({"erro": "Workspace ainda em processamento"}), 409
+        
+        arquivos_removidos = limpar_evidencias_anteriores(base_dir)
+        if workspace_id:
+            shutil.rmtree(base_dir, ignore_errors=True)
         
         return jsonify({
             "sucesso": True,
@@ -2724,16 +5162,70 @@ def limpar_evidencias():
             "erro": str(e)
         }), 500
 
+cache_hashes_evidencias = CacheTTL("hashes_evidencias", CACHE_TTL_METADADOS, max_itens=EVIDENCIAS_CACHE_IMAGENS_MAX)
+
+def hash_arquivo_evidencia(caminho):
+    """sha256 do conteúdo da imagem (ETag forte e versão nas URLs), recalculado só quando o arquivo muda"""
+    import hashlib
+    
+    estado = os.stat(caminho)
+    assinatura = (estado.st_mtime_ns, estado.st_size, estado.st_ino)
+    chave = os.path.abspath(caminho)
+    entrada = cache_hashes_evidencias.obter(chave)
+    if entrada is not None and entrada.etag == assinatura:
+        return entrada.valor
+    digest = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(bloco)
+    sha256 = digest.hexdigest()
+    cache_hashes_evidencias.definir(chave, sha256, etag=assinatura)
+    return sha256
+
+def formato_miniatura_padrao():
+    """WebP quando o Pillow tiver suporte; senão JPEG"""
+    from PIL import features
+    return "webp" if features.check("webp") else "jpeg"
+
+def miniatura_evidencia(caminho, sha256, largura, formato):
+    """Miniatura (WebP/JPEG) da imagem, gerada sob demanda e guardada em disco pelo hash do conteúdo"""
+    from PIL import Image
+    
+    extensao = "webp" if formato == "webp" else "jpg"
+    destino = os.path.abspath(os.path.join(EVIDENCIAS_MINIATURAS_DIR, f"{sha256}_{largura}.{extensao}"))
+    if os.path.exists(destino):
+        return destino
+    
+    os.makedirs(EVIDENCIAS_MINIATURAS_DIR, exist_ok=True)
+    with Image.open(caminho) as imagem:
+        imagem = imagem.convert('RGB')
+        imagem.thumbnail((largura, imagem.height), Image.LANCZOS)
+        temporario = f"{destino}.{uuid.uuid4().hex}.tmp"
+        imagem.save(temporario, format="WEBP" if extensao == "webp" else "JPEG",
+                    quality=EVIDENCIAS_MINIATURA_QUALIDADE, optimize=True)
+    os.replace(temporario, destino)
+    return destino
+
 @app.route('/api/evidencias/imagem/<diretorio>/<arquivo>')
 def servir_imagem_evidencia(diretorio, arquivo):
-    """Serve as imagens das evidências processadas"""
+    """Serve as imagens das evidências (ou uma miniatura, com ?largura=) com ETag forte, 304 e Range.
+
+    URLs com ?v=<versão do conteúdo> (vinda da lista) recebem cache longo e imutável; as demais são
+    revalidadas a cada uso.
+    """
     try:
         # Validar diretório
         if diretorio not in ['sucessos', 'falhas']:
             return jsonify({"erro": "Diretório inválido"}), 400
         
-        # Construir caminho do arquivo
-        caminho_arquivo = os.path.join('prints_tests', diretorio, arquivo)
+        base_dir = resolver_workspace_evidencias(request.args.get('workspace_id'))
+        if not base_dir:
+            return jsonify({"erro": "Workspace de evidências não encontrado ou expirado"}), 404
+        
+        # Construir caminho do arquivo (sem sair do diretório de evidências)
+        if os.path.basename(arquivo) != arquivo:
+            return jsonify({"erro": "Nome de arquivo inválido"}), 400
+        caminho_arquivo = os.path.join(base_dir, diretorio, arquivo)
         
         # Verificar se o arquivo existe
         if not os.path.exists(caminho_arquivo):
@@ -2743,8 +5235,42 @@ def servir_imagem_evidencia(diretorio, arquivo):
         if not arquivo.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
             return jsonify({"erro": "Tipo de arquivo não permitido"}), 400
         
-        # Servir o arquivo
-        return send_file(caminho_arquivo, mimetype='image/png')
+        import mimetypes
+        
+        sha256 = hash_arquivo_evidencia(caminho_arquivo)
+        versao = request.args.get('v')
+        largura = request.args.get('largura', type=int)
+        if largura:
+            # Larguras em degraus de 80px para limitar as variações guardadas em disco
+            largura = max(80, min(1280, round(largura / 80) * 80))
+            formato = (request.args.get('formato') or formato_miniatura_padrao()).lower()
+            if formato not in ('webp', 'jpeg', 'jpg'):
+                return jsonify({"erro": "Formato de miniatura inválido (use webp ou jpeg)"}), 400
+            formato = 'jpeg' if formato == 'jpg' else formato
+            etag = f"{sha256}-{largura}-{formato}"
+            mimetype = f"image/{formato}"
+        else:
+            etag = sha256
+            mimetype = mimetypes.guess_type(arquivo)[0] or 'image/png'
+        
+        # Revalidação: responde 304 sem abrir (nem gerar) o arquivo
+        if request.if_none_match.contains_weak(etag):
+            resposta = Response(status=304)
+            resposta.set_etag(etag)
+        else:
+            caminho_envio = miniatura_evidencia(caminho_arquivo, sha256, largura, formato) if largura else caminho_arquivo
+            # conditional=True trata If-None-Match/If-Range e pedidos com Range (206)
+            resposta = send_file(caminho_envio, mimetype=mimetype, etag=etag, conditional=True)
+        
+        resposta.cache_control.private = True
+        if versao and len(versao) >= 8 and sha256.startswith(versao):
+            resposta.cache_control.no_cache = None
+            resposta.cache_control.max_age = EVIDENCIAS_IMAGEM_MAX_AGE
+            resposta.cache_control.immutable = True
+        else:
+            resposta.cache_control.no_cache = True
+            resposta.cache_control.max_age = None
+        return resposta
         
     except Exception as e:
         print(f"Erro ao servir imagem: {e}")
@@ -2881,81 +5407,69 @@ def salvar_configuracoes():
 
 
 
-def buscar_casos_teste_para_issue(issue_key, headers, issues_processadas=None):
-    """Busca casos de teste relacionados a uma issue específica de forma recursiva"""
-    if issues_processadas is None:
-        issues_processadas = set()
-    
-    if issue_key in issues_processadas:
-        return []
-    
-    issues_processadas.add(issue_key)
-    
+def buscar_casos_teste_para_issue(issue_key, max_profundidade=CASOS_TESTE_MAX_PROFUNDIDADE, max_nos=CASOS_TESTE_MAX_NOS):
+    """Busca casos de teste relacionados a uma issue em toda a sua hierarquia (filhos, netos, ...).
+
+    Percorre a árvore em largura: cada nível é consultado de uma vez (sub-tarefas com `parent in`,
+    links com `linkedIssues` e menções com `text ~`), em lotes executados em paralelo. Para em
+    max_profundidade níveis ou max_nos issues exploradas.
+    """
     try:
-        casos_teste = []
-        casos_teste_keys = set()
-        
-        # Estratégia 1: Buscar sub-tarefas (filhos diretos)
-        jql_filhos = f'parent = {issue_key}'
-        search_url = f"{JIRA_BASE_URL}/rest/api/3/search"
-        
-        search_payload = {
-            "jql": jql_filhos,
-            "maxResults": 500,
-            "fields": [
-                "key", "summary", "status", "assignee", "reporter", 
-                "created", "updated", "resolutiondate", "issuetype",
-                "priority", "components", "labels", "worklog", "comment"
-            ]
-        }
-        
-        response = requests.post(search_url, headers=headers, json=search_payload)
-        if response.status_code == 200:
-            data = response.json()
-            for issue in data.get('issues', []):
-                issue_type = issue['fields'].get('issuetype', {}).get('name', '')
-                
-                # Se é um caso de teste, adicionar à lista
-                if issue_type == "Casos de Teste":
-                    if issue['key'] not in casos_teste_keys:
-                        casos_teste_keys.add(issue['key'])
-                        casos_teste.append(processar_caso_teste(issue))
-                
-                # Se não é caso de teste, fazer busca recursiva (filhos, netos, bisnetos)
-                else:
-                    print(f"  Buscando recursivamente em {issue['key']} ({issue_type})")
-                    casos_filhos = buscar_casos_teste_para_issue(issue['key'], headers, issues_processadas)
-                    for caso in casos_filhos:
-                        if caso['key'] not in casos_teste_keys:
-                            casos_teste_keys.add(caso['key'])
-                            casos_teste.append(caso)
-        
-        # Estratégia 2: Buscar casos de teste vinculados por links
-        jql_links = f'issue in linkedIssues({issue_key}) AND issuetype = "Casos de Teste"'
-        search_payload["jql"] = jql_links
-        
-        response = requests.post(search_url, headers=headers, json=search_payload)
-        if response.status_code == 200:
-            data = response.json()
-            for issue in data.get('issues', []):
-                if issue['key'] not in casos_teste_keys:
-                    casos_teste_keys.add(issue['key'])
-                    casos_teste.append(processar_caso_teste(issue))
-        
-        # Estratégia 3: Buscar casos de teste que mencionam esta issue
-        jql_mentions = f'issuetype = "Casos de Teste" AND text ~ "{issue_key}"'
-        search_payload["jql"] = jql_mentions
+        inicio = time.perf_counter()
+        casos_teste = {}
+        visitadas = {issue_key}
+        nivel = [issue_key]
+        profundidade = 0
+        consultas_feitas = 0
+        truncado = False
+        fields = [
+            "key", "summary", "status", "assignee", "reporter", 
+            "created", "updated", "resolutiondate", "issuetype",
+            "priority", "components", "labels", "worklog", "comment"
+        ]
         
-        response = requests.post(search_url, headers=headers, json=search_payload)
-        if response.status_code == 200:
-            data = response.json()
-            for issue in data.get('issues', []):
-                if issue['key'] not in casos_teste_keys:
-                    casos_teste_keys.add(issue['key'])
-                    casos_teste.append(processar_caso_teste(issue))
+        while nivel and profundidade < max_profundidade:
+            consultas = (
+                # Estratégia 1: sub-tarefas (filhos diretos) de todo o nível
+                planejar_consultas_jql("filhos", nivel, lambda lote: f"parent in ({', '.join(lote)})") +
+                # Estratégia 2: casos de teste vinculados por links
+                planejar_consultas_jql("vinculados", nivel,
+                                       lambda lote: " OR ".join(f"issue in linkedIssues({key})" for key in lote),
+                                       filtro='issuetype = "Casos de Teste"') +
+                # Estratégia 3: casos de teste que mencionam as issues do nível
+                planejar_consultas_jql("mencoes", nivel,
+                                       lambda lote: " OR ".join(f'text ~ "{key}"' for key in lote),
+                                       filtro='issuetype = "Casos de Teste"')
+            )
+            encontradas, lotes = executar_consultas_jql(consultas, fields)
+            consultas_feitas += len(lotes)
+            for lote in lotes:
+                if lote["erro"]:
+                    print(f"⚠️ Lote {lote['tipo']} do nível {profundidade} falhou: {lote['erro']}")
+            
+            proximo = []
+            for issue in encontradas:
+                if issue['fields'].get('issuetype', {}).get('name', '') == "Casos de Teste":
+                    if issue['key'] not in casos_teste:
+                        casos_teste[issue['key']] = processar_caso_teste(issue)
+                # Só as sub-tarefas chegam sem filtro de tipo: as que não são casos de teste são
+                # exploradas no próximo nível (netos, bisnetos...)
+                elif issue['key'] not in visitadas:
+                    if len(visitadas) >= max_nos:
+                        truncado = True
+                        continue
+                    visitadas.add(issue['key'])
+                    proximo.append(issue['key'])
+            
+            profundidade += 1
+            nivel = proximo
         
-        print(f"Encontrados {len(casos_teste)} casos de teste para {issue_key} (incluindo hierarquia)")
-        return casos_teste
+        if nivel:
+            truncado = True
+        print(f"Encontrados {len(casos_teste)} casos de teste para {issue_key} (incluindo hierarquia): "
+              f"{profundidade} nível(is), {len(visitadas)} issue(s), {consultas_feitas} consulta(s) em "
+              f"{round((time.perf_counter() - inicio) * 1000)} ms{' (busca truncada)' if truncado else ''}")
+        return list(casos_teste.values())
         
     except Exception as e:
         print(f"Erro ao buscar casos de teste para {issue_key}: {e}")
@@ -3046,23 +5560,20 @@ def testar_conexao_jira():
                 'erro': 'Configurações incompletas. Preencha URL, email e token.'
             })
         
-        # Configurar headers de autenticação
-        headers = {
-            "Accept": "application/json",
-            "Authorization": f"Basic {base64.b64encode(f'{jira_email}:{jira_token}'.encode()).decode()}"
-        }
-        
-        # Testar conexão básica
-        test_url = f"{jira_url}/rest/api/3/myself"
-        response = requests.get(test_url, headers=headers, timeout=30)
+        # Cliente temporário com as credenciais atuais do ambiente
+        with JiraClient(jira_url, jira_email, jira_token, pool_size=1) as cliente_teste:
+            # Testar conexão básica
+            response = cliente_teste.get("/rest/api/3/myself")
+            
+            if response.status_code == 200:
+                # Buscar projetos para mostrar mais informações
+                projects_response = cliente_teste.get("/rest/api/3/project")
+            else:
+                projects_response = None
         
         if response.status_code == 200:
             user_data = response.json()
             
-            # Buscar projetos para mostrar mais informações
-            projects_url = f"{jira_url}/rest/api/3/project"
-            projects_response = requests.get(projects_url, headers=headers, timeout=30)
-            
             projects_count = 0
             if projects_response.status_code == 200:
                 projects_data = projects_response.json()
@@ -3145,4 +5656,10 @@ def validar_configuracoes():
 
 
 if __name__ == '__main__':
+    # Resolver o chromedriver e pré-aquecer os navegadores sem atrasar a subida do servidor
+    # (apenas no processo filho do reloader, que é o que atende as requisições)
+    if os.getenv('BROWSER_POOL_PREAQUECER', 'true').lower() == 'true' and os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+        threading.Thread(target=pool_navegadores.aquecer, daemon=True).start()
+    if ESPELHO_ATIVO and os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+        espelho_casos_teste.iniciar()
     app.run(debug=True, host='0.0.0.0', port=8081)
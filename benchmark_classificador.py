@@ -0,0 +1,143 @@
+"""Micro-benchmark do classificador de evidências (código do card + status).
+
+Gera um log sintético com N testes, localiza os elementos com o parser do app e mede o custo
+por elemento da classificação antiga (várias buscas por substring e sete regexes sobre
+get_text().lower() / str(elemento).lower()) contra o ClassificadorEvidencias compilado.
+
+Uso:
+    python benchmark_classificador.py [--testes 10000] [--repeticoes 5]
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+# O app exige as variáveis do Jira na importação; valores fictícios bastam para o benchmark
+os.environ.setdefault("JIRA_URL", "https://exemplo.atlassian.net")
+os.environ.setdefault("JIRA_EMAIL", "benchmark@exemplo.com")
+os.environ.setdefault("JIRA_API_TOKEN", "benchmark")
+
+import app  # noqa: E402
+
+
+def extrair_codigo_antigo(texto):
+    """Cascata original: sete regexes sobre texto.upper(), uma após a outra"""
+    padroes = [
+        r'([A-Z]{2,7}-\d+)',
+        r'([A-Z]+-\d+)',
+        r'([A-Z]{2,4}\d+)',
+        r'(BC-\d+)',
+        r'(TEST-\d+)',
+        r'(BUG-\d+)',
+        r'(FEATURE-\d+)',
+    ]
+    for padrao in padroes:
+        match = re.search(padrao, texto.upper())
+        if match:
+            return match.group(1)
+    palavras = re.sub(r'[^\w\s-]', '', texto).split()
+    if len(palavras) >= 2:
+        return f"{palavras[0][:3].upper()}-{palavras[1][:3].upper()}"
+    return None
+
+
+def classificar_antigo(texto, classes, html):
+    """Classificação original do loop de processar_arquivo_log"""
+    texto_elemento = texto.lower()
+    html_elemento = html.lower()
+    is_sucesso = (
+        any('pass' in classe.lower() for classe in classes) or
+        any('success' in classe.lower() for classe in classes) or
+        '✅' in html_elemento or
+        '✓' in html_elemento
+    )
+    is_falha = (
+        any('fail' in classe.lower() for classe in classes) or
+        any('error' in classe.lower() for classe in classes) or
+        '❌' in html_elemento or
+        '✗' in html_elemento
+    )
+    if not is_sucesso and not is_falha:
+        sucesso_keywords = ['pass', 'success', 'sucesso', 'passed', '✅', '✓', 'ok', 'successful']
+        falha_keywords = ['fail', 'error', 'falha', 'failed', '❌', '✗', 'erro', 'exception', 'timeout']
+        is_sucesso = any(palavra in texto_elemento for palavra in sucesso_keywords)
+        is_falha = any(palavra in texto_elemento for palavra in falha_keywords)
+    if not is_sucesso and not is_falha:
+        for pattern in [r'status.*pass', r'result.*pass', r'execution.*pass',
+                        r'status.*fail', r'result.*fail', r'execution.*fail', r'error.*occurred']:
+            if re.search(pattern, texto_elemento, re.I):
+                break
+    if not is_sucesso and not is_falha:
+        is_sucesso = True
+    return extrair_codigo_antigo(texto), bool(is_sucesso)
+
+
+def gerar_log(caminho, quantidade):
+    """Log com divs test-result, status variados e um trecho de log em cada teste"""
+    random.seed(42)
+    passos = ["Abrir navegador", "Preencher formulário", "Validar mensagem", "Clicar em salvar", "Consultar API"]
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write("<html><body>\n")
+        for i in range(quantidade):
+            classe = random.choice(["test-result pass", "test-result fail", "test-result"])
+            status = random.choice(["PASSED", "FAILED", "executado", "Status: ok"])
+            linhas = "".join(f"<li>{random.choice(passos)} #{n}</li>" for n in range(random.randint(3, 12)))
+            f.write(
+                f'<div class="{classe}"><h3>TLD-{i} Cenário de login {i}</h3>'
+                f'<span>{status}</span><ul>{linhas}</ul></div>\n'
+            )
+        f.write("</body></html>\n")
+
+
+def medir(funcao, elementos, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for elemento in elementos:
+            funcao(elemento)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--testes", type=int, default=10000, help="quantidade de testes no log sintético")
+    parser.add_argument("--repeticoes", type=int, default=5, help="repetições de cada medição (usa a mediana)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "log.html")
+        gerar_log(caminho, args.testes)
+        tamanho_mb = os.path.getsize(caminho) / 1024 / 1024
+
+        inicio = time.perf_counter()
+        elementos, nivel, _ = app.localizar_elementos_teste_log(caminho)
+        tempo_parser = time.perf_counter() - inicio
+
+    classificador = app.classificador_evidencias
+    # O caminho antigo também serializava o elemento (str(elemento)); aproximado pelo próprio texto
+    antigo = medir(lambda e: classificar_antigo(e.texto, e.classes, e.texto), elementos, args.repeticoes)
+    novo = medir(lambda e: classificador.classificar(e.texto, e.classes, e.icones), elementos, args.repeticoes)
+
+    divergencias = 0
+    for elemento in elementos:
+        codigo, is_sucesso, _ = classificador.classificar(elemento.texto, elemento.classes, elemento.icones)
+        if (codigo, is_sucesso) != classificar_antigo(elemento.texto, elemento.classes, elemento.texto):
+            divergencias += 1
+
+    quantidade = len(elementos)
+    print(f"📄 Log sintético: {args.testes} testes, {tamanho_mb:.1f} MB")
+    print(f"🔎 Parser: {quantidade} elementos (estratégia {nivel}) em {tempo_parser * 1000:.0f} ms")
+    print(f"🐢 Classificação antiga: {antigo * 1000:.1f} ms no total, {antigo / quantidade * 1e6:.2f} µs por elemento")
+    print(f"🚀 Classificador compilado: {novo * 1000:.1f} ms no total, {novo / quantidade * 1e6:.2f} µs por elemento")
+    print(f"📈 Ganho: {antigo / novo:.1f}x")
+    print(f"✅ Divergências de resultado: {divergencias}")
+    return 0 if divergencias == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Reenvia eventos de webhook do Jira gravados em JSON para o endpoint /webhooks/jira.
+
+Assina cada corpo com HMAC-SHA256 (cabeçalho X-Hub-Signature, como o Jira Cloud faz) usando
+JIRA_WEBHOOK_SECRET e envia os arquivos em ordem alfabética. Com --local os eventos passam pelo
+test client do Flask no próprio processo, sem precisar subir o servidor.
+
+Uso:
+    python replay_webhooks_jira.py [arquivos ou diretórios ...] [--url http://localhost:8081/webhooks/jira]
+    python replay_webhooks_jira.py fixtures/webhooks_jira --local
+"""
+import argparse
+import glob
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+
+DIRETORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "webhooks_jira")
+
+
+def listar_eventos(caminhos):
+    """Expande diretórios em seus *.json (ordem alfabética) mantendo a ordem dos argumentos"""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos.extend(sorted(glob.glob(os.path.join(caminho, "*.json"))))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+
+def assinar(corpo, segredo):
+    return "sha256=" + hmac.new(segredo.encode(), corpo, hashlib.sha256).hexdigest()
+
+
+def enviador_http(url):
+    import requests
+
+    def enviar(corpo, cabecalhos):
+        response = requests.post(url, data=corpo, headers=cabecalhos, timeout=30)
+        return response.status_code, response.text
+    return enviar
+
+
+def enviador_local():
+    import app
+
+    cliente = app.app.test_client()
+
+    def enviar(corpo, cabecalhos):
+        response = cliente.post("/webhooks/jira", data=corpo, headers=cabecalhos)
+        return response.status_code, response.get_data(as_text=True)
+    return enviar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("caminhos", nargs="*", default=[DIRETORIO_FIXTURES], help="arquivos JSON ou diretórios de eventos")
+    parser.add_argument("--url", default="http://localhost:8081/webhooks/jira", help="endpoint do webhook")
+    parser.add_argument("--segredo", default=os.getenv("JIRA_WEBHOOK_SECRET", ""), help="segredo (padrão: JIRA_WEBHOOK_SECRET)")
+    parser.add_argument("--local", action="store_true", help="usar o test client do Flask em vez de HTTP")
+    parser.add_argument("--intervalo", type=float, default=0, help="pausa em segundos entre eventos")
+    args = parser.parse_args()
+
+    if not args.segredo:
+        print("❌ Informe --segredo ou defina JIRA_WEBHOOK_SECRET")
+        return 2
+    if args.local:
+        # O app lê o segredo na importação
+        os.environ["JIRA_WEBHOOK_SECRET"] = args.segredo
+    enviar = enviador_local() if args.local else enviador_http(args.url)
+
+    falhas = 0
+    for arquivo in listar_eventos(args.caminhos):
+        with open(arquivo, "rb") as f:
+            corpo = f.read()
+        evento = json.loads(corpo).get("webhookEvent", "?")
+        cabecalhos = {"Content-Type": "application/json", "X-Hub-Signature": assinar(corpo, args.segredo)}
+        inicio = time.perf_counter()
+        status, texto = enviar(corpo, cabecalhos)
+        tempo_ms = (time.perf_counter() - inicio) * 1000
+        icone = "✅" if status == 200 else "❌"
+        print(f"{icone} {os.path.basename(arquivo)} ({evento}): {status} em {tempo_ms:.0f} ms")
+        print(f"   {texto.strip()}")
+        if status != 200:
+            falhas += 1
+        if args.intervalo:
+            time.sleep(args.intervalo)
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
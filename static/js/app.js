@@ -116,14 +116,28 @@ async function carregarCasosTeste(requisitoPai) {
     try {
         console.log('📡 Buscando requisito:', requisitoPai);
         
-        const response = await fetch(`http://127.0.0.1:8081/api/casos-teste/${requisitoPai}`);
+        // Variante em streaming: cada página de casos é exibida assim que chega
+        const response = await fetch(`http://127.0.0.1:8081/api/casos-teste/${requisitoPai}/stream`);
         console.log('📡 Resposta recebida:', response.status, response.statusText);
         
-        const data = await response.json();
-        console.log('📡 Dados recebidos:', data);
-        
         if (response.ok) {
             console.log('✅ Requisito encontrado, exibindo casos de teste');
+            const data = { issue_pai: requisitoPai, requisito: null, total_casos: 0, casos_teste: [] };
+            
+            await lerNdjson(response, linha => {
+                if (linha.tipo === 'requisito') {
+                    data.requisito = linha.requisito;
+                } else if (linha.tipo === 'casos') {
+                    data.casos_teste.push(...linha.casos_teste);
+                    data.total_casos = data.casos_teste.length;
+                    exibirCasosTeste(data);
+                    if (loadingElement) loadingElement.style.display = 'none';
+                } else if (linha.tipo === 'erro') {
+                    mostrarNotificacao(linha.erro, 'error');
+                }
+            });
+            
+            console.log('📡 Dados recebidos:', data);
             exibirCasosTeste(data);
             // Mostrar botão de criar novo caso quando requisito é encontrado
             const btnNovoCasoElement = document.getElementById('btnNovoCaso');
@@ -131,6 +145,7 @@ async function carregarCasosTeste(requisitoPai) {
                 btnNovoCasoElement.style.display = 'inline-block';
             }
         } else {
+            const data = await response.json();
             console.error('❌ Erro na resposta:', data);
             mostrarNotificacao(data.erro || 'Requisito não encontrado', 'error');
             const resultadosElement = document.getElementById('resultados');
@@ -155,6 +170,24 @@ async function carregarCasosTeste(requisitoPai) {
     }
 }
 
+// Lê uma resposta NDJSON linha a linha, chamando onLinha para cada objeto recebido
+async function lerNdjson(response, onLinha) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const linhas = buffer.split('\n');
+        buffer = linhas.pop();
+        linhas.filter(linha => linha.trim()).forEach(linha => onLinha(JSON.parse(linha)));
+    }
+    
+    if (buffer.trim()) onLinha(JSON.parse(buffer));
+}
+
 // Função para verificar se há um requisito na URL
 function verificarRequisitoNaURL() {
     const pathname = window.location.pathname;
@@ -1835,14 +1868,17 @@ function handleFileSelect(e) {
 
 // Função para processar arquivo selecionado
 function processarArquivo(file) {
-    // Validar arquivo
-    if (!file.name.endsWith('.html')) {
-        mostrarNotificacao('Apenas arquivos HTML são aceitos', 'error');
+    // Validar arquivo (log.html ou output.xml do Robot, opcionalmente compactado)
+    const nome = file.name.toLowerCase();
+    const isOutputXml = nome.endsWith('.xml') || nome.endsWith('.xml.gz');
+    if (!nome.endsWith('.html') && !isOutputXml) {
+        mostrarNotificacao('Apenas arquivos log.html ou output.xml (.xml/.xml.gz) são aceitos', 'error');
         return;
     }
     
-    if (file.size > 10 * 1024 * 1024) { // 10MB
-        mostrarNotificacao('Arquivo muito grande. Máximo 10MB', 'error');
+    const tamanhoMaximoMb = isOutputXml ? 100 : 10;
+    if (file.size > tamanhoMaximoMb * 1024 * 1024) {
+        mostrarNotificacao(`Arquivo muito grande. Máximo ${tamanhoMaximoMb}MB`, 'error');
         return;
     }
     
@@ -2016,7 +2052,10 @@ async function fazerUploadArquivo() {
         throw new Error(error.erro || 'Erro no upload do arquivo');
     }
     
-    const resultado = await response.json();
+    // O upload apenas enfileira o processamento; acompanhar o job até o fim
+    const job = await response.json();
+    definirWorkspaceEvidencias(job.workspace_id);
+    const resultado = await acompanharJobEvidencias(job.status_url);
     
     if (!resultado.sucesso) {
         throw new Error(resultado.erro || 'Erro no processamento');
@@ -2029,6 +2068,62 @@ async function fazerUploadArquivo() {
     return resultado;
 }
 
+// Workspace de evidências do último upload: cada upload é processado num diretório próprio no servidor
+function definirWorkspaceEvidencias(workspaceId) {
+    if (workspaceId) {
+        localStorage.setItem('evidenciasWorkspaceId', workspaceId);
+    } else {
+        localStorage.removeItem('evidenciasWorkspaceId');
+    }
+}
+
+// Acrescenta o workspace_id às URLs de status, lista e imagens das evidências
+function urlEvidencias(caminho) {
+    const workspaceId = localStorage.getItem('evidenciasWorkspaceId');
+    if (!workspaceId) return caminho;
+    const separador = caminho.includes('?') ? '&' : '?';
+    return `${caminho}${separador}workspace_id=${encodeURIComponent(workspaceId)}`;
+}
+
+// URL da imagem de uma evidência da lista: com largura, uma miniatura WebP; a versão (hash do
+// conteúdo) deixa o navegador guardar a imagem em cache sem revalidar
+function urlImagemEvidencia(evidencia, largura) {
+    const params = new URLSearchParams();
+    if (evidencia.versao) params.set('v', evidencia.versao);
+    if (largura) {
+        params.set('largura', largura);
+        params.set('formato', 'webp');
+    }
+    const consulta = params.toString();
+    return urlEvidencias(`/api/evidencias/imagem/${evidencia.diretorio}/${evidencia.arquivo}${consulta ? '?' + consulta : ''}`);
+}
+
+// Consulta o job de evidências periodicamente até ele terminar, refletindo o avanço na barra de progresso
+async function acompanharJobEvidencias(statusUrl, intervaloMs = 1000) {
+    while (true) {
+        const response = await fetch(statusUrl);
+        const job = await response.json();
+        
+        if (!response.ok) {
+            throw new Error(job.erro || 'Erro ao consultar o processamento');
+        }
+        
+        if (job.status === 'concluido' || job.status === 'erro') {
+            return job;
+        }
+        
+        // Faixa de 25% a 50% da barra reservada para o processamento no servidor
+        atualizarProgresso(25 + (job.percentual || 0) / 4);
+        const progressText = document.getElementById('progressText');
+        if (progressText && job.elementos_encontrados) {
+            const eta = job.eta_segundos != null ? ` - ~${Math.ceil(job.eta_segundos)}s restantes` : '';
+            progressText.textContent = `${job.elementos_processados}/${job.elementos_encontrados}${eta}`;
+        }
+        
+        await new Promise(resolve => setTimeout(resolve, intervaloMs));
+    }
+}
+
 // Função para atualizar status dos steps
 function atualizarStepStatus(stepId, status) {
     const step = document.getElementById(stepId);
@@ -2123,9 +2218,15 @@ function atualizarEstatisticas(estatisticas) {
 // Função para verificar status das evidências
 async function verificarStatusEvidencias() {
     try {
-        const response = await fetch('/api/evidencias/status');
+        const response = await fetch(urlEvidencias('/api/evidencias/status'));
         const status = await response.json();
         
+        // Workspace expirado (coletado no servidor): voltar ao estado inicial
+        if (response.status === 404) {
+            definirWorkspaceEvidencias(null);
+            return;
+        }
+        
         atualizarEstatisticas(status);
         
         // Atualizar interface baseada no status
@@ -2145,7 +2246,7 @@ async function verificarStatusEvidencias() {
 // Função para carregar evidências processadas
 async function carregarEvidenciasProcessadas() {
     try {
-        const response = await fetch('/api/evidencias/lista');
+        const response = await fetch(urlEvidencias('/api/evidencias/lista'));
         const resultado = await response.json();
         
         if (resultado.sucesso) {
@@ -2208,7 +2309,9 @@ async function enviarEvidenciasJira() {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
-                issue_keys: Array.from(cardIds)
+                issue_keys: Array.from(cardIds),
+                workspace_id: localStorage.getItem('evidenciasWorkspaceId'),
+                consolidado: document.getElementById('chkEnvioConsolidado')?.checked
             })
         });
         
@@ -2366,7 +2469,7 @@ async function visualizarEvidencias() {
         mostrarNotificacao('Carregando evidências...', 'info');
         
         // Fazer requisição para listar evidências
-        const response = await fetch('/api/evidencias/lista');
+        const response = await fetch(urlEvidencias('/api/evidencias/lista'));
         const data = await response.json();
         
         if (!data.sucesso) {
@@ -2424,17 +2527,18 @@ function criarModalVisualizacaoEvidencias(evidencias) {
                                             </div>
                                         </div>
                                         <div class="card-body p-2">
-                                            <img src="/api/evidencias/imagem/${evidencia.diretorio}/${evidencia.arquivo}" 
+                                            <img src="${urlImagemEvidencia(evidencia, 480)}" 
                                                  class="img-fluid rounded" 
                                                  alt="Evidência ${evidencia.nome}"
+                                                 loading="lazy"
                                                  style="cursor: pointer;"
-                                                 onclick="ampliarImagem(this.src, '${evidencia.nome}')"
+                                                 onclick="ampliarImagem('${urlImagemEvidencia(evidencia)}', '${evidencia.nome}')"
                                                  title="Clique para ampliar">
                                         </div>
                                         <div class="card-footer p-2">
                                             <div class="btn-group btn-group-sm w-100" role="group">
                                                 <button type="button" class="btn btn-outline-primary btn-sm" 
-                                                        onclick="ampliarImagem('/api/evidencias/imagem/${evidencia.diretorio}/${evidencia.arquivo}', '${evidencia.nome}')">
+                                                        onclick="ampliarImagem('${urlImagemEvidencia(evidencia)}', '${evidencia.nome}')">
                                                     <i class="fas fa-expand"></i>
                                                 </button>
                                                 <button type="button" class="btn btn-outline-info btn-sm" 
@@ -2524,7 +2628,7 @@ function copiarNomeEvidencia(nome) {
 // Função para baixar evidência
 function baixarEvidencia(caminho, nome) {
     const link = document.createElement('a');
-    link.href = `/api/evidencias/imagem/${caminho}`;
+    link.href = urlEvidencias(`/api/evidencias/imagem/${caminho.split('?')[0]}`);
     link.download = `${nome}.png`;
     document.body.appendChild(link);
     link.click();
@@ -2565,7 +2669,10 @@ async function limparEvidencias() {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
-            }
+            },
+            body: JSON.stringify({
+                workspace_id: localStorage.getItem('evidenciasWorkspaceId')
+            })
         });
         
         const data = await response.json();
@@ -2573,6 +2680,7 @@ async function limparEvidencias() {
         if (!data.sucesso) {
             throw new Error(data.erro || 'Erro ao limpar evidências');
         }
+        definirWorkspaceEvidencias(null);
         
         console.log(`✅ Limpeza concluída: ${data.arquivos_removidos} arquivos removidos`);
         